@@ -0,0 +1,182 @@
+"""
+Event bus between the ingestion/scanner process and API workers.
+
+Messages are small JSON-able dicts with a "type" ("signal", "candle", ...).
+Handlers may be called from any thread.
+
+Backends:
+  memory    single process (default, tests)
+  postgres  LISTEN/NOTIFY, for app.ingest + RUN_MODE=api workers
+"""
+import json
+import queue
+import select
+import time
+from threading import Thread
+from typing import Callable, List, Optional
+
+from logzero import logger
+
+from app.config import settings
+
+CHANNEL = "nse_fno_events"
+
+Handler = Callable[[dict], None]
+
+
+class SignalBus:
+    def __init__(self):
+        self._handlers: List[Handler] = []
+
+    def subscribe(self, handler: Handler):
+        self._handlers.append(handler)
+
+    def unsubscribe(self, handler: Handler):
+        if handler in self._handlers:
+            self._handlers.remove(handler)
+
+    def _dispatch(self, message: dict):
+        for handler in list(self._handlers):
+            try:
+                handler(message)
+            except Exception:
+                logger.exception("Bus handler failed")
+
+    def publish(self, message: dict):
+        raise NotImplementedError
+
+    def close(self):
+        pass
+
+
+class InMemoryBus(SignalBus):
+    def publish(self, message: dict):
+        self._dispatch(message)
+
+
+class PostgresBus(SignalBus):
+    """
+    pg_notify for publish, a LISTEN thread for delivery. Publishers and
+    listeners use their own autocommit connections, outside the pool.
+
+    publish() only enqueues: it is called from the event loop and the
+    tick thread, so the NOTIFY round trip (and any DB failure) happens
+    on a background sender thread. When the queue is full the message
+    is dropped and logged.
+    """
+
+    def __init__(self, dsn: str, channel: str = CHANNEL, max_pending: int = 10_000):
+        super().__init__()
+        self.dsn = dsn
+        self.channel = channel
+
+        self._pub_conn = None
+        self._outbox: queue.Queue = queue.Queue(maxsize=max_pending)
+        self._sender: Optional[Thread] = None
+        self._listener: Optional[Thread] = None
+        self._stop = False
+
+    def _connect(self):
+        import psycopg2
+
+        conn = psycopg2.connect(self.dsn)
+        conn.autocommit = True
+        return conn
+
+    def publish(self, message: dict):
+        if self._sender is None:
+            self._sender = Thread(target=self._send, daemon=True)
+            self._sender.start()
+        try:
+            self._outbox.put_nowait(message)
+        except queue.Full:
+            logger.error(f"Bus outbox full, dropped {message.get('type')} message")
+
+    def _send(self):
+        while True:
+            message = self._outbox.get()
+            if message is None:
+                break
+            try:
+                payload = json.dumps(message, default=str)
+                if self._pub_conn is None or self._pub_conn.closed:
+                    self._pub_conn = self._connect()
+                with self._pub_conn.cursor() as cur:
+                    cur.execute("SELECT pg_notify(%s, %s)", (self.channel, payload))
+            except Exception:
+                logger.exception(f"Bus publish failed, dropped {message.get('type')} message")
+                if self._pub_conn is not None:
+                    self._pub_conn.close()
+                    self._pub_conn = None
+
+        if self._pub_conn is not None:
+            self._pub_conn.close()
+            self._pub_conn = None
+
+    def subscribe(self, handler: Handler):
+        super().subscribe(handler)
+        if self._listener is None:
+            self._listener = Thread(target=self._listen, daemon=True)
+            self._listener.start()
+
+    def _listen(self):
+        while not self._stop:
+            try:
+                conn = self._connect()
+                with conn.cursor() as cur:
+                    cur.execute(f"LISTEN {self.channel}")
+                logger.info(f"📡 Listening on {self.channel}")
+
+                while not self._stop:
+                    if select.select([conn], [], [], 1.0)[0]:
+                        conn.poll()
+                        while conn.notifies:
+                            note = conn.notifies.pop(0)
+                            self._dispatch(json.loads(note.payload))
+                conn.close()
+
+            except Exception:
+                logger.exception("Bus listener failed; reconnecting")
+                if not self._stop:
+                    time.sleep(2)
+
+    def close(self, timeout: float = 5.0):
+        """
+        Stop listening; queued messages are still sent (up to `timeout`).
+        """
+        self._stop = True
+        if self._sender is not None:
+            self._outbox.put(None)
+            self._sender.join(timeout)
+            self._sender = None
+
+
+def _pg_dsn(url: str) -> str:
+    from sqlalchemy.engine import make_url
+
+    return (
+        make_url(url)
+        .set(drivername="postgresql")
+        .render_as_string(hide_password=False)
+    )
+
+
+_bus: Optional[SignalBus] = None
+
+
+def get_bus() -> SignalBus:
+    global _bus
+    if _bus is None:
+        if settings.BUS_BACKEND == "postgres":
+            _bus = PostgresBus(_pg_dsn(settings.DATABASE_URL))
+        else:
+            _bus = InMemoryBus()
+    return _bus
+
+
+def set_bus(bus: SignalBus):
+    """
+    Swap the process bus (tests, benchmarks).
+    """
+    global _bus
+    _bus = bus
@@ -0,0 +1,104 @@
+import hashlib
+import time
+from threading import Lock
+from typing import Any, Callable, Dict, Iterable, Optional, Set, Tuple
+
+import orjson
+from fastapi import Request, Response
+
+
+def dumps(payload: Any) -> bytes:
+    return orjson.dumps(payload, option=orjson.OPT_SERIALIZE_NUMPY)
+
+
+class CacheEntry:
+    __slots__ = ("body", "etag", "expires")
+
+    def __init__(self, body: bytes, ttl: float):
+        self.body = body
+        self.etag = '"' + hashlib.blake2b(body, digest_size=12).hexdigest() + '"'
+        self.expires = time.monotonic() + ttl
+
+
+class ResponseCache:
+    """
+    In-process cache of pre-serialized JSON responses.
+
+    Entries expire after their TTL or when one of their tags is
+    invalidated (e.g. "signals" after a scanner commit). Every
+    invalidation bumps the tag's generation, and clear() bumps an epoch
+    shared by all tags, so a payload built before an invalidation is
+    served once but never stored.
+    """
+
+    def __init__(self):
+        self._entries: Dict[str, CacheEntry] = {}
+        self._tags: Dict[str, Set[str]] = {}
+        self._generations: Dict[str, int] = {}
+        self._epoch = 0
+        self._lock = Lock()
+
+    def generation(self, tags: Iterable[str]) -> Tuple[int, ...]:
+        return (self._epoch, *(self._generations.get(tag, 0) for tag in tags))
+
+    def get(self, key: str) -> Optional[CacheEntry]:
+        entry = self._entries.get(key)
+        if entry is None or entry.expires < time.monotonic():
+            return None
+        return entry
+
+    def put(self, key: str, payload: Any, ttl: float, tags: Iterable[str] = (),
+            generation: Optional[Tuple[int, ...]] = None) -> CacheEntry:
+        """
+        `generation` is generation(tags) from before the payload was built;
+        if a tag was invalidated since, the entry is returned but not stored.
+        """
+        tags = tuple(tags)
+        entry = CacheEntry(dumps(payload), ttl)
+        with self._lock:
+            if generation is not None and generation != self.generation(tags):
+                return entry
+            self._entries[key] = entry
+            for tag in tags:
+                self._tags.setdefault(tag, set()).add(key)
+        return entry
+
+    def invalidate(self, *tags: str):
+        with self._lock:
+            for tag in tags:
+                self._generations[tag] = self._generations.get(tag, 0) + 1
+                for key in self._tags.pop(tag, ()):
+                    self._entries.pop(key, None)
+
+    def clear(self):
+        with self._lock:
+            self._epoch += 1
+            self._entries.clear()
+            self._tags.clear()
+
+    # -------------------------------------------------
+    def respond(self, request: Request, key: str, build: Callable[[], Any],
+                ttl: float, tags: Iterable[str] = ()) -> Response:
+        """
+        Serve `key` from cache (building it on miss), honouring If-None-Match.
+        """
+        entry = self.get(key)
+        if entry is None:
+            tags = tuple(tags)
+            generation = self.generation(tags)
+            entry = self.put(key, build(), ttl, tags, generation)
+
+        headers = {"ETag": entry.etag, "Cache-Control": "no-cache"}
+
+        if_none_match = request.headers.get("if-none-match")
+        if if_none_match and entry.etag in if_none_match:
+            return Response(status_code=304, headers=headers)
+
+        return Response(
+            content=entry.body,
+            media_type="application/json",
+            headers=headers,
+        )
+
+
+response_cache = ResponseCache()
@@ -1,8 +1,13 @@
+from functools import lru_cache
+from typing import Literal, Optional
+
 from pydantic_settings import BaseSettings
 from pydantic import Field
 
+APP_NAME = "NSE Real-Time F&O Scanner"
+
 class Settings(BaseSettings):
-    app_name: str = "NSE Real-Time F&O Scanner"
+    app_name: str = APP_NAME
 
     # Database
     DATABASE_URL: str = Field(..., env="DATABASE_URL")
@@ -12,6 +17,23 @@ class Settings(BaseSettings):
     SMARTAPI_CLIENT_ID: str = Field(..., env="SMARTAPI_CLIENT_ID")
     SMARTAPI_PIN: str = Field(..., env="SMARTAPI_PIN")
     SMARTAPI_TOTP_SECRET: str = Field(..., env="SMARTAPI_TOTP_SECRET")
+    # override the REST root (e.g. tests/fake_smartapi.py)
+    SMARTAPI_ROOT: Optional[str] = Field(None, env="SMARTAPI_ROOT")
+
+    # Deployment: "all" (API + feed + scanners in one process) or "api"
+    # (stateless HTTP / ws worker; the feed and scanners then run in a
+    # separate `python -m app.ingest` process)
+    RUN_MODE: Literal["all", "api"] = Field("all", env="RUN_MODE")
+    # Event bus between processes: "memory" or "postgres" (LISTEN/NOTIFY)
+    BUS_BACKEND: str = Field("memory", env="BUS_BACKEND")
+    # completed candles that could not be stored (DB down) wait here
+    CANDLE_SPILL_PATH: str = Field("data/candle_spill.jsonl", env="CANDLE_SPILL_PATH")
+    FUTURES_SPILL_PATH: str = Field("data/futures_spill.jsonl", env="FUTURES_SPILL_PATH")
+    # apply migrations (app.db.migrate) during startup instead of as a
+    # separate deploy step
+    MIGRATE_ON_START: bool = Field(False, env="MIGRATE_ON_START")
+    # periodic snapshot of in-memory live state for warm restarts
+    SNAPSHOT_PATH: str = Field("data/live_state.snap", env="SNAPSHOT_PATH")
 
     # --- IMPORTANT: lowercase aliases so code works ---
     @property
@@ -34,4 +56,22 @@ class Settings(BaseSettings):
         env_file = ".env"
         extra = "ignore"
 
-settings = Settings()
+@lru_cache
+def get_settings() -> Settings:
+    """
+    Read (and validate) the environment on first use, not at import.
+    """
+    return Settings()
+
+
+class _LazySettings:
+    """
+    `settings.X` resolves through get_settings(), so importing a module
+    never requires DATABASE_URL / SmartAPI credentials.
+    """
+
+    def __getattr__(self, name):
+        return getattr(get_settings(), name)
+
+
+settings = _LazySettings()
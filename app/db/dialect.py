@@ -0,0 +1,17 @@
+from sqlalchemy.orm import Session
+
+
+def insert_for(db: Session):
+    """
+    Dialect-specific insert() supporting on_conflict_do_* (Postgres / SQLite).
+    """
+    name = db.get_bind().dialect.name
+
+    if name == "postgresql":
+        from sqlalchemy.dialects.postgresql import insert
+    elif name == "sqlite":
+        from sqlalchemy.dialects.sqlite import insert
+    else:
+        raise NotImplementedError(f"No upsert support for dialect {name!r}")
+
+    return insert
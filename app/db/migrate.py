@@ -0,0 +1,88 @@
+"""
+Schema setup / migrations.
+
+    python -m app.db.migrate
+
+Creates missing tables from the models, then applies pending SQL files
+from migrations/<dialect>/ in name order (tracked in schema_migrations),
+then makes sure candle partitions exist around the current month.
+"""
+from pathlib import Path
+from typing import List
+
+from sqlalchemy import text
+from sqlalchemy.engine import Connection, Engine
+from logzero import logger
+
+from app.db.session import Base, get_engine
+from app.db import models  # noqa: F401  (register tables)
+from app.db.partitions import ensure_candle_partitions
+
+MIGRATIONS_DIR = Path(__file__).resolve().parents[2] / "migrations"
+
+# SQLAlchemy dialect name -> script directory; None: the models are the
+# whole schema (create_all only, e.g. throwaway SQLite databases)
+SCRIPT_DIRS = {
+    "postgresql": "postgresql",
+    "sqlite": None,
+}
+
+
+def migration_scripts(dialect: str) -> List[Path]:
+    """
+    All SQL scripts for a dialect, in apply order. Raises for dialects
+    without a script directory rather than silently applying nothing.
+    """
+    if dialect not in SCRIPT_DIRS:
+        raise RuntimeError(f"No migrations configured for dialect {dialect!r}")
+    if SCRIPT_DIRS[dialect] is None:
+        return []
+
+    directory = MIGRATIONS_DIR / SCRIPT_DIRS[dialect]
+    scripts = sorted(directory.glob("*.sql"))
+    if not scripts:
+        raise RuntimeError(f"No migration scripts found in {directory}")
+    return scripts
+
+
+def apply_script(conn: Connection, sql: str):
+    """
+    Send a script to the driver verbatim: without no_parameters psycopg2
+    treats the `%I` / `%L` of format() as bind markers.
+    """
+    conn.exec_driver_sql(sql, execution_options={"no_parameters": True})
+
+
+def run_migrations(engine: Engine = None):
+    engine = engine or get_engine()
+    scripts = migration_scripts(engine.dialect.name)
+
+    Base.metadata.create_all(bind=engine)
+
+    if scripts:
+        with engine.begin() as conn:
+            conn.execute(text(
+                "CREATE TABLE IF NOT EXISTS schema_migrations ("
+                "version VARCHAR PRIMARY KEY, "
+                "applied_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP)"
+            ))
+            applied = set(conn.execute(
+                text("SELECT version FROM schema_migrations")
+            ).scalars())
+
+        for script in scripts:
+            if script.stem in applied:
+                continue
+            with engine.begin() as conn:
+                apply_script(conn, script.read_text())
+                conn.execute(
+                    text("INSERT INTO schema_migrations (version) VALUES (:v)"),
+                    {"v": script.stem},
+                )
+            logger.info(f"🧱 Applied migration {script.name}")
+
+    ensure_candle_partitions(engine)
+
+
+if __name__ == "__main__":
+    run_migrations()
@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String, Float, DateTime, Date, Boolean
+from sqlalchemy import Column, Integer, String, Float, DateTime, Date, Boolean, Index
 from app.db.session import Base
 
 class Instrument(Base):
@@ -11,14 +11,45 @@ class Instrument(Base):
     exchange = Column(String)   # NFO
     segment = Column(String)    # FUT / OPT / FNO
     active = Column(Boolean, default=True)
+    sector = Column(String, nullable=True)   # breadth grouping
+
+    # derivatives only
+    expiry = Column(Date, nullable=True, index=True)
+    strike = Column(Float, nullable=True)
+    option_type = Column(String, nullable=True)   # CE / PE
 
 
 class Candle5m(Base):
+    """
+    Postgres: range-partitioned by month on start_time (see app/db/partitions.py).
+    Other dialects: a plain table with the same keys.
+    """
     __tablename__ = "candles_5m"
+    __table_args__ = (
+        Index(
+            "ix_candles_5m_start_time_brin", "start_time",
+            postgresql_using="brin",
+        ),
+        {"postgresql_partition_by": "RANGE (start_time)"},
+    )
 
-    id = Column(Integer, primary_key=True, index=True)
-    symbol = Column(String, index=True)
-    start_time = Column(DateTime, index=True)
+    symbol = Column(String, primary_key=True)
+    start_time = Column(DateTime, primary_key=True)
+    open = Column(Float)
+    high = Column(Float)
+    low = Column(Float)
+    close = Column(Float)
+    volume = Column(Float)
+
+
+class CandleDaily(Base):
+    """
+    Daily bars compacted from candles_5m by RetentionService.
+    """
+    __tablename__ = "candles_1d"
+
+    symbol = Column(String, primary_key=True)
+    trade_date = Column(Date, primary_key=True)
     open = Column(Float)
     high = Column(Float)
     low = Column(Float)
@@ -47,3 +78,58 @@ class Signal(Base):
     candle_index = Column(Integer)
     move_pct = Column(Float)
     extra = Column(String, nullable=True)
+
+
+class SignalOutcome(Base):
+    """
+    Forward performance of a signal, filled bar by bar by OutcomeService.
+    Returns / MFE / MAE are in % and signed by the signal's direction.
+    """
+    __tablename__ = "signal_outcomes"
+
+    signal_id = Column(Integer, primary_key=True)
+    symbol = Column(String, index=True)
+    rule = Column(String, index=True)
+    signal_time = Column(DateTime, index=True)
+    direction = Column(Integer)          # +1 long, -1 short
+    entry = Column(Float)                # close of the signal bar
+
+    # bar starts at each horizon; horizon_end is the last bar tracked
+    # (capped at 15:25, so a later t_* never fills its return)
+    t_15m = Column(DateTime)
+    t_30m = Column(DateTime)
+    t_60m = Column(DateTime)
+    horizon_end = Column(DateTime)
+
+    bars = Column(Integer, default=0)
+    last_bar_time = Column(DateTime)
+    closed = Column(Boolean, default=False, index=True)
+
+    ret_15m = Column(Float, nullable=True)
+    ret_30m = Column(Float, nullable=True)
+    ret_60m = Column(Float, nullable=True)
+    hit_15m = Column(Boolean, nullable=True)
+    hit_30m = Column(Boolean, nullable=True)
+    hit_60m = Column(Boolean, nullable=True)
+    mfe_pct = Column(Float, nullable=True)
+    mae_pct = Column(Float, nullable=True)
+
+
+class SignalStats(Base):
+    """
+    Per-rule rollup of signal_outcomes, rebuilt after every update.
+    """
+    __tablename__ = "signal_stats"
+
+    rule = Column(String, primary_key=True)
+    signals = Column(Integer)
+    closed = Column(Integer)
+    avg_ret_15m = Column(Float, nullable=True)
+    avg_ret_30m = Column(Float, nullable=True)
+    avg_ret_60m = Column(Float, nullable=True)
+    hit_rate_15m = Column(Float, nullable=True)
+    hit_rate_30m = Column(Float, nullable=True)
+    hit_rate_60m = Column(Float, nullable=True)
+    avg_mfe_pct = Column(Float, nullable=True)
+    avg_mae_pct = Column(Float, nullable=True)
+    updated_at = Column(DateTime)
@@ -0,0 +1,91 @@
+import re
+from datetime import date
+from typing import List, Tuple
+
+from sqlalchemy import text
+from sqlalchemy.engine import Connection, Engine
+from logzero import logger
+
+PARENT = "candles_5m"
+_NAME = re.compile(rf"^{PARENT}_(\d{{4}})_(\d{{2}})$")
+
+
+def _add_months(d: date, n: int) -> date:
+    m = d.month - 1 + n
+    return date(d.year + m // 12, m % 12 + 1, 1)
+
+
+def partition_name(month: date) -> str:
+    return f"{PARENT}_{month:%Y_%m}"
+
+
+def is_partitioned(conn: Connection) -> bool:
+    if conn.dialect.name != "postgresql":
+        return False
+    return bool(conn.execute(text(
+        "SELECT 1 FROM pg_partitioned_table p "
+        "JOIN pg_class c ON c.oid = p.partrelid WHERE c.relname = :t"
+    ), {"t": PARENT}).first())
+
+
+def ensure_candle_partitions(engine: Engine, months_back: int = 1,
+                             months_ahead: int = 2, today: date = None):
+    """
+    Create monthly partitions (plus a DEFAULT catch-all) around today.
+    No-op unless candles_5m is a partitioned Postgres table.
+    """
+    today = today or date.today()
+
+    with engine.begin() as conn:
+        if not is_partitioned(conn):
+            return
+
+        first = _add_months(today.replace(day=1), -months_back)
+        for i in range(months_back + months_ahead + 1):
+            lo = _add_months(first, i)
+            hi = _add_months(lo, 1)
+            conn.execute(text(
+                f"CREATE TABLE IF NOT EXISTS {partition_name(lo)} "
+                f"PARTITION OF {PARENT} "
+                f"FOR VALUES FROM ('{lo}') TO ('{hi}')"
+            ))
+
+        conn.execute(text(
+            f"CREATE TABLE IF NOT EXISTS {PARENT}_default "
+            f"PARTITION OF {PARENT} DEFAULT"
+        ))
+
+
+def list_candle_partitions(conn: Connection) -> List[Tuple[str, date]]:
+    rows = conn.execute(text(
+        "SELECT c.relname FROM pg_inherits i "
+        "JOIN pg_class c ON c.oid = i.inhrelid "
+        "JOIN pg_class p ON p.oid = i.inhparent "
+        "WHERE p.relname = :t"
+    ), {"t": PARENT}).scalars()
+
+    out = []
+    for name in rows:
+        m = _NAME.match(name)
+        if m:
+            out.append((name, date(int(m.group(1)), int(m.group(2)), 1)))
+    return sorted(out, key=lambda x: x[1])
+
+
+def drop_candle_partitions_before(conn: Connection, cutoff: date) -> List[str]:
+    """
+    Drop whole monthly partitions that end on or before `cutoff`.
+    """
+    if not is_partitioned(conn):
+        return []
+
+    dropped = []
+    for name, month in list_candle_partitions(conn):
+        if _add_months(month, 1) <= cutoff:
+            conn.execute(text(f"ALTER TABLE {PARENT} DETACH PARTITION {name}"))
+            conn.execute(text(f"DROP TABLE {name}"))
+            dropped.append(name)
+
+    if dropped:
+        logger.info(f"🗑️ Dropped candle partitions: {', '.join(dropped)}")
+    return dropped
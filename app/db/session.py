@@ -1,17 +1,34 @@
+from functools import lru_cache
+
 from sqlalchemy import create_engine
-from sqlalchemy.orm import sessionmaker, declarative_base
+from sqlalchemy.engine import Engine
+from sqlalchemy.orm import Session, sessionmaker, declarative_base
 from app.config import settings
 
-engine = create_engine(settings.DATABASE_URL, echo=False, future=True)
+Base = declarative_base()
+
 
-SessionLocal = sessionmaker(
-    bind=engine,
-    autocommit=False,
-    autoflush=False,
-    future=True
-)
+@lru_cache
+def get_engine() -> Engine:
+    """
+    Created on first use: importing models / routers opens no pool.
+    """
+    return create_engine(settings.DATABASE_URL, echo=False, future=True)
+
+
+@lru_cache
+def _sessionmaker() -> sessionmaker:
+    return sessionmaker(
+        bind=get_engine(),
+        autocommit=False,
+        autoflush=False,
+        future=True
+    )
+
+
+def SessionLocal() -> Session:
+    return _sessionmaker()()
 
-Base = declarative_base()
 
 # 🔥 ADD THIS
 def get_db():
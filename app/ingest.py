@@ -0,0 +1,43 @@
+"""
+Ingestion / scanner process for split deployments.
+
+    python -m app.db.migrate
+    BUS_BACKEND=postgres python -m app.ingest
+    BUS_BACKEND=postgres RUN_MODE=api uvicorn app.main:app --workers 4
+
+Runs the live feed, candle flush, scanners and retention exactly once and
+publishes signals / candles on the bus; API workers only serve HTTP and
+relay bus messages to their /ws clients.
+"""
+import asyncio
+import signal
+
+from logzero import logger
+
+from app.bus import get_bus
+from app.config import settings
+from app.db.migrate import run_migrations
+from app.runtime import LiveRuntime
+
+
+async def main():
+    if settings.MIGRATE_ON_START:
+        await asyncio.to_thread(run_migrations)
+
+    runtime = LiveRuntime()
+    await runtime.start()
+
+    stop = asyncio.Event()
+    loop = asyncio.get_running_loop()
+    for sig in (signal.SIGINT, signal.SIGTERM):
+        loop.add_signal_handler(sig, stop.set)
+
+    logger.info("📥 Ingestion process running")
+    await stop.wait()
+
+    await runtime.stop()
+    get_bus().close()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
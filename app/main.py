@@ -1,12 +1,11 @@
 import asyncio
+from contextlib import asynccontextmanager
+
 from fastapi import FastAPI
 from logzero import logger
 
-from app.config import settings
-from app.db.session import Base, engine, SessionLocal
-from app.providers.smartapi_provider import SmartAPIProvider
-from app.services.levels_service import LevelsService
-from app.services.scanner_service import ScannerService
+from app.config import APP_NAME, settings
+from app.bus import get_bus
 
 from app.routers import (
     health,
@@ -15,49 +14,89 @@ from app.routers import (
     ws,
     instruments,
     dashboard,
+    export,
 )
 
 from fastapi.middleware.cors import CORSMiddleware
+from app.responses import ORJSONResponse
 
-app = FastAPI(title=settings.app_name)
-
-app.add_middleware(
-    CORSMiddleware,
-    allow_origins=[
-        "http://localhost:3000",     # React dev
-        "http://127.0.0.1:3000",
-        "http://localhost:5173",     # Vite
-        "http://127.0.0.1:5173",
-        "http://localhost:5500",     # static server
-        "http://127.0.0.1:5500",
-    ],
-    allow_credentials=True,
-    allow_methods=["*"],
-    allow_headers=["*"],
-)
 
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    bus = get_bus()
+    handler = ws.bus_handler(asyncio.get_running_loop())
+    bus.subscribe(handler)
+    bus.subscribe(dashboard.remember_breadth)
+
+    if settings.MIGRATE_ON_START:
+        from app.db.migrate import run_migrations
+
+        await asyncio.to_thread(run_migrations)
+
+    # RUN_MODE=api: stateless worker, ingestion runs in app.ingest
+    runtime = None
+    if settings.RUN_MODE == "all":
+        # feed / provider stack (requests, websocket, numpy) only loads here
+        from app.runtime import LiveRuntime
+
+        runtime = LiveRuntime()
+        app.state.runtime = runtime
+        app.state.scanner = runtime.scanner
+        app.state.option_chains = runtime.option_chains
+
+        # returns at once: login + token load continue in the background
+        await runtime.start()
+        logger.info("🚀 App initialized & scanner loop started")
+    else:
+        logger.info(f"🚀 API worker started (RUN_MODE={settings.RUN_MODE})")
+
+    try:
+        yield
+    finally:
+        if runtime:
+            await runtime.stop()
+        bus.unsubscribe(handler)
+        bus.unsubscribe(dashboard.remember_breadth)
 
-@app.on_event("startup")
-async def startup_event():
-    Base.metadata.create_all(bind=engine)
 
-    provider = SmartAPIProvider()
-    levels = LevelsService(provider)
-    scanner = ScannerService(provider, levels)
+def create_app() -> FastAPI:
+    """
+    Build the ASGI app. Nothing here touches the environment, the
+    database or SmartAPI; that all happens in `lifespan`.
 
-    app.state.scanner = scanner
-    asyncio.create_task(scanner.run_intraday_loop(SessionLocal))
+        uvicorn --factory app.main:create_app
+    """
+    app = FastAPI(
+        title=APP_NAME,
+        default_response_class=ORJSONResponse,
+        lifespan=lifespan,
+    )
 
-    logger.info("🚀 App initialized & scanner loop started")
+    app.add_middleware(
+        CORSMiddleware,
+        allow_origins=[
+            "http://localhost:3000",     # React dev
+            "http://127.0.0.1:3000",
+            "http://localhost:5173",     # Vite
+            "http://127.0.0.1:5173",
+            "http://localhost:5500",     # static server
+            "http://127.0.0.1:5500",
+        ],
+        allow_credentials=True,
+        allow_methods=["*"],
+        allow_headers=["*"],
+    )
 
+    # 🔥 ROUTERS (ORDER DOES NOT MATTER)
+    app.include_router(health.router)
+    app.include_router(signals.router)
+    app.include_router(market.router)
+    app.include_router(instruments.router)
+    app.include_router(dashboard.router)
+    app.include_router(export.router)
+    app.include_router(ws.router)
 
-# 🔥 ROUTERS (ORDER DOES NOT MATTER)
-app.include_router(health.router)
-app.include_router(signals.router)
-app.include_router(market.router)
-app.include_router(instruments.router)
-app.include_router(dashboard.router)
-app.include_router(signals.router)
-app.include_router(ws.router)
+    return app
 
 
+app = create_app()
@@ -0,0 +1,235 @@
+"""
+Minimal Prometheus-style metrics.
+
+Updates are plain attribute arithmetic (no locks) so they are cheap
+enough for the tick path; the feed, flush and scanner paths each have a
+single writer thread, so lost updates are not a practical concern.
+"""
+import math
+import time
+from bisect import bisect_left
+from threading import Lock
+from typing import Callable, Dict, List, Optional, Sequence, Tuple
+
+LATENCY_BUCKETS = (
+    0.0001, 0.00025, 0.0005, 0.001, 0.0025, 0.005, 0.01,
+    0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0,
+)
+SIZE_BUCKETS = (1, 5, 10, 25, 50, 100, 250, 500, 1000, 2500)
+
+
+def _fmt_labels(labels: Tuple[Tuple[str, str], ...], extra: str = "") -> str:
+    parts = [f'{k}="{v}"' for k, v in labels]
+    if extra:
+        parts.append(extra)
+    return "{" + ",".join(parts) + "}" if parts else ""
+
+
+def _fmt_value(v: float) -> str:
+    if v == math.inf:
+        return "+Inf"
+    return repr(float(v))
+
+
+class _Metric:
+    kind = ""
+
+    def __init__(self, name: str, help: str, labelnames: Sequence[str] = (),
+                 _labels: Tuple[Tuple[str, str], ...] = ()):
+        self.name = name
+        self.help = help
+        self.labelnames = tuple(labelnames)
+        self._labels = _labels
+        self._children: Dict[Tuple[str, ...], "_Metric"] = {}
+        self._lock = Lock()
+
+    def labels(self, **values) -> "_Metric":
+        key = tuple(str(values[n]) for n in self.labelnames)
+        child = self._children.get(key)
+        if child is None:
+            with self._lock:
+                child = self._children.get(key)
+                if child is None:
+                    child = self._new_child(tuple(zip(self.labelnames, key)))
+                    self._children[key] = child
+        return child
+
+    def _new_child(self, labels):
+        return type(self)(self.name, self.help, (), labels)
+
+    def _series(self) -> List["_Metric"]:
+        return list(self._children.values()) if self.labelnames else [self]
+
+    def render(self) -> List[str]:
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} {self.kind}"]
+        for m in self._series():
+            lines.extend(m._samples())
+        return lines
+
+
+class Counter(_Metric):
+    kind = "counter"
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.value = 0.0
+
+    def inc(self, n: float = 1.0):
+        self.value += n
+
+    def _samples(self):
+        return [f"{self.name}_total{_fmt_labels(self._labels)} {_fmt_value(self.value)}"]
+
+
+class Gauge(_Metric):
+    kind = "gauge"
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.value = 0.0
+        self._fn: Optional[Callable[[], float]] = None
+
+    def set(self, v: float):
+        self.value = v
+
+    def inc(self, n: float = 1.0):
+        self.value += n
+
+    def dec(self, n: float = 1.0):
+        self.value -= n
+
+    def set_function(self, fn: Callable[[], float]):
+        """
+        Read the value lazily at scrape time.
+        """
+        self._fn = fn
+
+    def get(self) -> float:
+        return self._fn() if self._fn else self.value
+
+    def _samples(self):
+        return [f"{self.name}{_fmt_labels(self._labels)} {_fmt_value(self.get())}"]
+
+
+class Histogram(_Metric):
+    kind = "histogram"
+
+    def __init__(self, name, help, labelnames=(), _labels=(),
+                 buckets: Sequence[float] = LATENCY_BUCKETS):
+        super().__init__(name, help, labelnames, _labels)
+        self.buckets = tuple(buckets)
+        self.counts = [0] * (len(self.buckets) + 1)
+        self.sum = 0.0
+        self.count = 0
+
+    def _new_child(self, labels):
+        return Histogram(self.name, self.help, (), labels, self.buckets)
+
+    def observe(self, v: float):
+        self.counts[bisect_left(self.buckets, v)] += 1
+        self.sum += v
+        self.count += 1
+
+    def time(self):
+        return _Timer(self)
+
+    def _samples(self):
+        out = []
+        acc = 0
+        for bound, n in zip(self.buckets + (math.inf,), self.counts):
+            acc += n
+            le = f'le="{_fmt_value(bound) if bound == math.inf else bound}"'
+            out.append(f"{self.name}_bucket{_fmt_labels(self._labels, le)} {acc}")
+        out.append(f"{self.name}_sum{_fmt_labels(self._labels)} {_fmt_value(self.sum)}")
+        out.append(f"{self.name}_count{_fmt_labels(self._labels)} {self.count}")
+        return out
+
+
+class _Timer:
+    __slots__ = ("hist", "t0")
+
+    def __init__(self, hist: Histogram):
+        self.hist = hist
+
+    def __enter__(self):
+        self.t0 = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        self.hist.observe(time.perf_counter() - self.t0)
+        return False
+
+
+class Registry:
+    def __init__(self):
+        self._metrics: Dict[str, _Metric] = {}
+
+    def _register(self, metric: _Metric) -> _Metric:
+        existing = self._metrics.get(metric.name)
+        if existing is not None:
+            return existing
+        self._metrics[metric.name] = metric
+        return metric
+
+    def counter(self, name, help, labelnames=()) -> Counter:
+        return self._register(Counter(name, help, labelnames))
+
+    def gauge(self, name, help, labelnames=()) -> Gauge:
+        return self._register(Gauge(name, help, labelnames))
+
+    def histogram(self, name, help, labelnames=(), buckets=LATENCY_BUCKETS) -> Histogram:
+        return self._register(Histogram(name, help, labelnames, buckets=buckets))
+
+    def render(self) -> str:
+        lines = []
+        for metric in self._metrics.values():
+            lines.extend(metric.render())
+        return "\n".join(lines) + "\n"
+
+
+REGISTRY = Registry()
+
+# ---- FEED ----
+FEED_TICKS = REGISTRY.counter("feed_ticks", "Binary ticks received")
+FEED_DECODE_ERRORS = REGISTRY.counter("feed_decode_errors", "Ticks that failed to decode")
+FEED_DECODE_SECONDS = REGISTRY.histogram(
+    "feed_decode_seconds", "Tick decode + candle update time"
+)
+FEED_LAST_TICK = REGISTRY.gauge("feed_last_tick_timestamp", "Unix time of the last tick")
+
+# ---- CANDLES ----
+CANDLES_CLOSED = REGISTRY.counter("candles_closed", "Completed 5m candles")
+CANDLE_QUEUE_DEPTH = REGISTRY.gauge("candle_flush_queue_depth", "Candles waiting to be stored")
+FLUSH_BATCH_SIZE = REGISTRY.histogram(
+    "candle_flush_batch_size", "Candles per DB flush", buckets=SIZE_BUCKETS
+)
+FLUSH_COMMIT_SECONDS = REGISTRY.histogram("candle_flush_commit_seconds", "Candle flush time")
+FLUSH_FAILURES = REGISTRY.counter("candle_flush_failures", "Failed candle flushes")
+FLUSH_RETRIES = REGISTRY.counter("candle_flush_retries", "Candle flush retries")
+CANDLES_SPILLED = REGISTRY.counter("candles_spilled", "Candles written to the spill file")
+CANDLES_REPLAYED = REGISTRY.counter("candles_replayed", "Spilled candles stored on recovery")
+CANDLE_SPILL_PENDING = REGISTRY.gauge("candle_spill_pending", "Candles waiting in the spill file")
+
+# ---- SCANNER ----
+SCANNER_EVAL_SECONDS = REGISTRY.histogram(
+    "scanner_eval_seconds", "Realtime scanner time per closed candle"
+)
+CLOSE_TO_SIGNAL_SECONDS = REGISTRY.histogram(
+    "close_to_signal_seconds", "Candle close to committed signal"
+)
+SIGNALS_EMITTED = REGISTRY.counter("signals_emitted", "Signals committed", ("rule",))
+
+# ---- SMARTAPI ----
+SMARTAPI_SECONDS = REGISTRY.histogram(
+    "smartapi_request_seconds", "SmartAPI call latency", ("call",)
+)
+SMARTAPI_ERRORS = REGISTRY.counter("smartapi_errors", "Failed SmartAPI calls", ("call",))
+CANDLE_CACHE_BARS = REGISTRY.counter(
+    "candle_cache_bars", "Historical 5m bars served, by source", ("source",)
+)
+
+# ---- WEBSOCKET CLIENTS ----
+WS_CLIENTS = REGISTRY.gauge("ws_clients", "Connected /ws clients")
+WS_BROADCAST_SECONDS = REGISTRY.histogram(
+    "ws_broadcast_seconds", "Time to fan a message out to all /ws clients"
+)
@@ -1,35 +1,207 @@
-from SmartApi import SmartConnect
+import base64
+import json
+import socket
+import time
+import uuid
+from threading import Lock
+
 import pyotp
-from datetime import datetime
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
 from logzero import logger
 from app.config import settings
+from app.metrics import SMARTAPI_SECONDS, SMARTAPI_ERRORS
+
+ROOT_URL = "https://apiconnect.angelone.in"
+
+ROUTES = {
+    "login": "/rest/auth/angelbroking/user/v1/loginByPassword",
+    "token": "/rest/auth/angelbroking/jwt/v1/generateTokens",
+    "candles": "/rest/secure/angelbroking/historical/v1/getCandleData",
+}
+
+# SmartAPI error codes meaning "log in again"
+AUTH_ERRORS = {"AG8001", "AG8002", "AG8003", "AB1010"}
+
+
+class SmartAPIAuthError(Exception):
+    pass
+
+
+class SmartAPIError(Exception):
+    """
+    The API answered status:false (rate limit, bad token, AB1004, ...).
+    """
+
+
+def _jwt_expiry(jwt: str, default_ttl: float = 6 * 3600) -> float:
+    """
+    Unix expiry from the token's `exp` claim (no signature check).
+    """
+    try:
+        payload = jwt.split(".")[1]
+        payload += "=" * (-len(payload) % 4)
+        return float(json.loads(base64.urlsafe_b64decode(payload))["exp"])
+    except Exception:
+        return time.time() + default_ttl
+
 
 class SmartAPIProvider:
-    def __init__(self):
+    """
+    Thread-safe SmartAPI REST client.
+
+    - one keep-alive HTTP connection pool shared by every caller
+    - single-flight login: concurrent callers wait for one login
+    - tokens are renewed `refresh_margin` seconds before the JWT expires
+      (refresh token first, full TOTP login as fallback)
+    """
+
+    def __init__(self, root=None, pool_size=16, timeout=10, refresh_margin=600):
         self.api_key = settings.smartapi_key
         self.client_id = settings.smartapi_client_id
         self.pin = settings.smartapi_pin
         self.totp_secret = settings.smartapi_totp_secret
-        self.client = None
 
-    def _ensure_login(self):
-        if self.client:
-            return self.client
+        self.root = (root or settings.SMARTAPI_ROOT or ROOT_URL).rstrip("/")
+        self.timeout = timeout
+        self.refresh_margin = refresh_margin
+
+        self.session = requests.Session()
+        adapter = HTTPAdapter(
+            pool_connections=1,
+            pool_maxsize=pool_size,
+            max_retries=Retry(
+                total=2,
+                backoff_factor=0.2,
+                # default allowed_methods: idempotent verbs only, so a POST
+                # (every SmartAPI call) is only retried if it never got sent
+                status_forcelist=(502, 503, 504),
+            ),
+        )
+        self.session.mount("https://", adapter)
+        self.session.mount("http://", adapter)
+
+        try:
+            local_ip = socket.gethostbyname(socket.gethostname())
+        except OSError:
+            local_ip = "127.0.0.1"
+        mac = ":".join(f"{(uuid.getnode() >> s) & 0xff:02x}" for s in range(40, -8, -8))
+        self.session.headers.update({
+            "Content-Type": "application/json",
+            "Accept": "application/json",
+            "X-UserType": "USER",
+            "X-SourceID": "WEB",
+            "X-ClientLocalIP": local_ip,
+            "X-ClientPublicIP": local_ip,
+            "X-MACAddress": mac,
+            "X-PrivateKey": self.api_key,
+        })
+
+        self.jwt = None
+        self.refresh_token = None
+        self.feed_token = None
+        self.expires_at = 0.0
+        self._login_lock = Lock()
 
-        client = SmartConnect(self.api_key)
+    # -------------------------------------------------
+    def _post(self, route: str, payload: dict, auth: bool = True) -> dict:
+        headers = {"Authorization": f"Bearer {self.jwt}"} if auth and self.jwt else None
+
+        with SMARTAPI_SECONDS.labels(call=route).time():
+            r = self.session.post(
+                self.root + ROUTES[route],
+                data=json.dumps(payload),
+                headers=headers,
+                timeout=self.timeout,
+            )
+
+        if r.status_code in (401, 403):
+            raise SmartAPIAuthError(f"{route}: HTTP {r.status_code}")
+        r.raise_for_status()
+
+        data = r.json()
+        if not data.get("status") and data.get("errorcode") in AUTH_ERRORS:
+            raise SmartAPIAuthError(f"{route}: {data.get('errorcode')}")
+        return data
+
+    def _fresh(self) -> bool:
+        return bool(self.jwt) and time.time() < self.expires_at - self.refresh_margin
+
+    def _set_tokens(self, data: dict):
+        self.jwt = data["jwtToken"]
+        self.refresh_token = data.get("refreshToken", self.refresh_token)
+        self.feed_token = data.get("feedToken", self.feed_token)
+        self.expires_at = _jwt_expiry(self.jwt)
+
+    def _login(self):
         totp = pyotp.TOTP(self.totp_secret).now()
-        data = client.generateSession(self.client_id, self.pin, totp)
+        try:
+            data = self._post("login", {
+                "clientcode": self.client_id,
+                "password": self.pin,
+                "totp": totp,
+            }, auth=False)
+        except Exception:
+            SMARTAPI_ERRORS.labels(call="login").inc()
+            raise
 
         if not data.get("status"):
+            SMARTAPI_ERRORS.labels(call="login").inc()
             raise Exception("SmartAPI Login Failed!")
 
+        self._set_tokens(data["data"])
         logger.info("SmartAPI Login Successful")
-        self.client = client
-        return client
 
-    def get_5m_candles(self, exchange, token, from_dt, to_dt):
-        client = self._ensure_login()
+    def _refresh(self):
+        data = self._post("token", {"refreshToken": self.refresh_token})
+        if not data.get("status"):
+            raise SmartAPIAuthError(f"token refresh: {data.get('message')}")
+        self._set_tokens(data["data"])
+        logger.info("SmartAPI token refreshed")
 
+    def _ensure_login(self, stale=None):
+        """
+        Returns a valid JWT. `stale` is a token the server just rejected:
+        only the first caller holding it logs in again.
+        """
+        if stale is None and self._fresh():
+            return self.jwt
+
+        with self._login_lock:
+            # another thread may have logged in while we waited
+            if stale is None and self._fresh():
+                return self.jwt
+            if stale is not None and self.jwt != stale:
+                return self.jwt
+
+            if stale is None and self.refresh_token and time.time() < self.expires_at:
+                try:
+                    self._refresh()
+                    return self.jwt
+                except Exception:
+                    SMARTAPI_ERRORS.labels(call="token").inc()
+                    logger.warning("Token refresh failed, logging in again")
+
+            self._login()
+            return self.jwt
+
+    # -------------------------------------------------
+    def _call(self, route: str, payload: dict) -> dict:
+        jwt = self._ensure_login()
+        try:
+            return self._post(route, payload)
+        except SmartAPIAuthError:
+            # token revoked server-side: one re-login, then retry
+            self._ensure_login(stale=jwt)
+            return self._post(route, payload)
+
+    def fetch_5m_candles(self, exchange, token, from_dt, to_dt):
+        """
+        Like get_5m_candles, but raises SmartAPIError instead of returning
+        [] when the API reports a failure, so callers can tell "no bars"
+        from "no answer".
+        """
         params = {
             "exchange": exchange,
             "symboltoken": token,
@@ -38,10 +210,24 @@ class SmartAPIProvider:
             "todate": to_dt.strftime("%Y-%m-%d %H:%M"),
         }
 
-        resp = client.getCandleData(params)
+        try:
+            resp = self._call("candles", params)
+        except Exception:
+            SMARTAPI_ERRORS.labels(call="candles").inc()
+            raise
 
         if resp.get("status"):
-            return resp["data"]
+            return resp["data"] or []
+
+        SMARTAPI_ERRORS.labels(call="candles").inc()
+        raise SmartAPIError(f"{resp.get('errorcode')}: {resp.get('message')}")
+
+    def get_5m_candles(self, exchange, token, from_dt, to_dt):
+        try:
+            return self.fetch_5m_candles(exchange, token, from_dt, to_dt)
+        except SmartAPIError as e:
+            logger.error(f"Candle fetch failed: {e}")
+            return []
 
-        logger.error(f"Candle fetch failed: {resp}")
-        return []
+    def close(self):
+        self.session.close()
@@ -1,5 +1,6 @@
 import json
 import struct
+import time
 import websocket
 from threading import Thread
 from datetime import datetime
@@ -12,38 +13,87 @@ from app.db import models
 from app.services.candle_builder import CandleBuilder
 from app.services.realtime_scanner_service import RealTimeScannerService
 from app.services.levels_service import LevelsService
+from app.services.indicator_engine import IndicatorEngine
+from app.services.option_chain_service import OptionChainService
+from app.services.futures_oi_service import FuturesOIScanner
+from app.metrics import FEED_TICKS, FEED_DECODE_ERRORS, FEED_DECODE_SECONDS, FEED_LAST_TICK
 
 WS_URL = "wss://smartapisocket.angelone.in/smart-stream"
 
+# SmartStream v2 packet: mode, exchange, token, seq, exch_ts, ltp
+SNAP_HEADER = struct.Struct("<BB25sqqq")
+SNAP_OI = struct.Struct("<q")
+SNAP_OI_OFFSET = 131
+SNAP_VOLUME_OFFSET = 67  # volume traded for the day (cumulative)
+MODE_SNAPQUOTE = 3
+
 
 class WebSocketProvider:
-    def __init__(self, max_tokens=50):
+    def __init__(self, max_tokens=50, provider=None, levels=None):
         self.ws = None
+        self._thread = None
         self.feed_token = None
         self.client_id = settings.SMARTAPI_CLIENT_ID
         self.api_key = settings.SMARTAPI_KEY
         self.max_tokens = max_tokens
 
+        # tick timestamps; replaced when replaying recorded/synthetic ticks
+        self.clock = datetime.now
+
         # ---- CORE SERVICES ----
-        self.provider = SmartAPIProvider()
-        self.levels = LevelsService(self.provider)
-        self.scanner = RealTimeScannerService(self.levels)
+        self.provider = provider or SmartAPIProvider()
+        self.levels = levels or LevelsService(self.provider)
+        self.indicators = IndicatorEngine()
+        self.scanner = RealTimeScannerService(
+            self.levels, indicators=self.indicators
+        )
 
+        # indicators first so the scanner sees values incl. this candle
         self.candle_builder = CandleBuilder(
-            on_candle_close=self.scanner.on_candle_close
+            on_candle_close=self.indicators.on_candle_close
         )
+        self.candle_builder.add_close_listener(self.scanner.on_candle_close)
+
+        self.option_chains = OptionChainService()
+        self.option_chains.on_resubscribe = self._resubscribe_options
+
+        # current-month futures: own builder (candles carry OI deltas)
+        self.futures = FuturesOIScanner()
+        self.futures_builder = CandleBuilder(
+            on_candle_close=self.futures.on_candle_close,
+            spill_path=settings.FUTURES_SPILL_PATH,
+        )
+        self.candle_builder.add_close_listener(self.futures.on_spot_close)
+        # token -> last cumulative day volume (SnapQuote); bars get deltas
+        self._day_volume = {}
 
         # ---- CACHE ----
         self.token_symbol_map = {}
         self.tokens = []
+        self.option_tokens = []
+        self.futures_tokens = []
 
     # -------------------------------------------------
     def initialize(self):
         self.provider._ensure_login()
-        self.feed_token = self.provider.client.feed_token
+        self.feed_token = self.provider.feed_token
         logger.info("Feed Token Acquired")
 
         self.tokens = self._load_fno_stock_tokens()
+        self.scanner.token_symbol_cache.update(self.token_symbol_map)
+
+        db = SessionLocal()
+        try:
+            self.indicators.warm_start(db, self.token_symbol_map)
+            self.option_chains.load(
+                db, sorted(set(self.token_symbol_map.values()))
+            )
+            self.futures.load(db, self.token_symbol_map)
+        finally:
+            db.close()
+
+        self.option_tokens = self.option_chains.subscription_tokens()
+        self.futures_tokens = self.futures.subscription_tokens()
 
     # -------------------------------------------------
     def _load_fno_stock_tokens(self):
@@ -114,11 +164,32 @@ class WebSocketProvider:
             on_close=self.on_close,
         )
 
-        Thread(
+        self._thread = Thread(
             target=self.ws.run_forever,
             kwargs={"ping_interval": 20, "ping_timeout": 10},
             daemon=True,
-        ).start()
+        )
+        self._thread.start()
+        self.futures.start(self._close_futures_buckets)
+
+    def _close_futures_buckets(self):
+        builder = self.futures_builder
+        builder.close_before(builder._bucket_start(self.clock()))
+
+    # -------------------------------------------------
+    def stop(self, timeout=5):
+        """
+        Close the socket, then drain and store completed candles.
+        """
+        if self.ws:
+            self.ws.close()
+        if self._thread:
+            self._thread.join(timeout)
+
+        self.futures.stop()
+        self.candle_builder.stop()
+        self.futures_builder.stop()
+        logger.info("WebSocket feed stopped")
 
     # -------------------------------------------------
     def subscribe(self):
@@ -139,6 +210,49 @@ class WebSocketProvider:
         logger.info(f"Subscribing to {len(self.tokens)} tokens")
         self.ws.send(json.dumps(sub_msg))
 
+        nfo_tokens = self.option_tokens + self.futures_tokens
+        if nfo_tokens:
+            self.ws.send(json.dumps({
+                "correlationID": "fno-derivatives",
+                "action": 1,
+                "params": {
+                    "mode": MODE_SNAPQUOTE,  # carries OI
+                    "tokenList": [
+                        {
+                            "exchangeType": 2,  # NFO
+                            "tokens": nfo_tokens,
+                        }
+                    ],
+                },
+            }))
+            logger.info(
+                f"Subscribing to {len(self.option_tokens)} option contracts "
+                f"and {len(self.futures_tokens)} futures"
+            )
+
+    def _resubscribe_options(self, added, removed):
+        """
+        Swap option contracts after a chain is re-centred on live spot.
+        """
+        self.option_tokens = self.option_chains.subscription_tokens()
+        if not self.ws:
+            return
+
+        for action, tokens in ((0, removed), (1, added)):
+            if not tokens:
+                continue
+            self.ws.send(json.dumps({
+                "correlationID": "fno-derivatives",
+                "action": action,
+                "params": {
+                    "mode": MODE_SNAPQUOTE,
+                    "tokenList": [{"exchangeType": 2, "tokens": tokens}],
+                },
+            }))
+        logger.info(
+            f"Option subscription re-centred: +{len(added)} / -{len(removed)}"
+        )
+
     # -------------------------------------------------
     def on_open(self, ws):
         logger.info("WebSocket Connected")
@@ -151,6 +265,15 @@ class WebSocketProvider:
 
     # -------------------------------------------------
     def _handle_binary_tick(self, raw: bytes):
+        t0 = time.perf_counter()
+        FEED_TICKS.inc()
+        FEED_LAST_TICK.set(time.time())
+
+        if raw[0] == MODE_SNAPQUOTE:
+            self._handle_snapquote(raw)
+            FEED_DECODE_SECONDS.observe(time.perf_counter() - t0)
+            return
+
         try:
             token = raw[2:27].decode("utf-8").rstrip("\x00")
             ltp = struct.unpack("<I", raw[27:31])[0] / 100
@@ -164,14 +287,45 @@ class WebSocketProvider:
                 token=token,
                 ltp=ltp,
                 volume=volume,
-                ts=datetime.now(),
+                ts=self.clock(),
             )
 
+            self.option_chains.update_spot(symbol, ltp)
+
             logger.debug(f"TICK {symbol} ({token}) → {ltp}")
 
         except Exception:
+            FEED_DECODE_ERRORS.inc()
             logger.exception("Binary tick parse failed")
 
+        FEED_DECODE_SECONDS.observe(time.perf_counter() - t0)
+
+    # -------------------------------------------------
+    def _handle_snapquote(self, raw: bytes):
+        try:
+            _, _, token, _, _, ltp = SNAP_HEADER.unpack_from(raw)
+            oi = SNAP_OI.unpack_from(raw, SNAP_OI_OFFSET)[0]
+            token = token.decode("utf-8").rstrip("\x00")
+
+            if token in self.futures.index:
+                total = SNAP_OI.unpack_from(raw, SNAP_VOLUME_OFFSET)[0]
+                prev = self._day_volume.get(token)
+                self._day_volume[token] = total
+                # first frame after (re)connect or a new day: no baseline
+                volume = total - prev if prev is not None and total >= prev else 0
+
+                self.futures_builder.update_tick(
+                    token=token, ltp=ltp / 100, volume=volume,
+                    ts=self.clock(), oi=oi,
+                )
+                return
+
+            self.option_chains.on_tick(token, ltp / 100, oi)
+
+        except Exception:
+            FEED_DECODE_ERRORS.inc()
+            logger.exception("SnapQuote parse failed")
+
     # -------------------------------------------------
     def on_error(self, ws, error):
         logger.error(f"WebSocket Error: {error}")
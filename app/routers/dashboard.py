@@ -1,28 +1,59 @@
-from fastapi import APIRouter, Depends
+from typing import Optional
+
+from fastapi import APIRouter, Depends, HTTPException, Request
+from sqlalchemy import select
 from sqlalchemy.orm import Session
 from app.db.session import get_db
 from app.db import models
+from app.cache import response_cache
 
 router = APIRouter(prefix="/dashboard", tags=["Dashboard"])
 
+# last breadth snapshot seen on the bus (this worker). Kept here, not in
+# breadth_service, so API workers never import numpy.
+_latest: Optional[dict] = None
+
+
+def latest_breadth() -> Optional[dict]:
+    return _latest
+
+
+def remember_breadth(message: dict):
+    """
+    Bus subscriber: keep the newest breadth snapshot in memory.
+    """
+    global _latest
+    if message.get("type") == "breadth":
+        _latest = message["payload"]
+
 
 @router.get("")
-def dashboard(db: Session = Depends(get_db)):
-    signals = (
-        db.query(models.Signal)
-        .order_by(models.Signal.time.desc())
-        .limit(20)
-        .all()
+def dashboard(request: Request, db: Session = Depends(get_db)):
+    def build():
+        rows = db.execute(
+            select(
+                models.Signal.symbol,
+                models.Signal.rule,
+                models.Signal.time,
+                models.Signal.move_pct,
+            )
+            .order_by(models.Signal.time.desc())
+            .limit(20)
+        ).mappings()
+
+        return {"signals": [dict(r) for r in rows]}
+
+    return response_cache.respond(
+        request, "dashboard", build, ttl=30, tags=("signals",)
     )
 
-    return {
-        "signals": [
-            {
-                "symbol": s.symbol,
-                "rule": s.rule,
-                "time": s.time,
-                "move_pct": s.move_pct,
-            }
-            for s in signals
-        ]
-    }
+
+@router.get("/breadth")
+def breadth():
+    """
+    Latest bucket-close breadth snapshot (served from memory)
+    """
+    snap = latest_breadth()
+    if snap is None:
+        raise HTTPException(503, "No breadth snapshot yet")
+    return snap
@@ -0,0 +1,45 @@
+from datetime import date
+from typing import Optional
+
+from fastapi import APIRouter, HTTPException, Query
+from fastapi.responses import StreamingResponse
+
+from app.db.session import SessionLocal
+from app.services import export_service
+from app.services.export_service import FORMATS, TABLES
+
+router = APIRouter(prefix="/export", tags=["Export"])
+
+
+@router.get("/{table}")
+def export_table(
+    table: str,
+    start: date = Query(...),
+    end: date = Query(...),
+    symbols: Optional[str] = Query(None, description="comma separated"),
+    format: str = Query("parquet", pattern="^(parquet|arrow)$"),
+    batch_size: int = Query(50_000, ge=1_000, le=500_000),
+):
+    """
+    Stream candles_5m / daily_levels / signals for a date range as Parquet
+    or Arrow IPC (memory stays flat: one record batch at a time)
+    """
+    if table not in TABLES:
+        raise HTTPException(404, f"Unknown table {table}")
+    if end < start:
+        raise HTTPException(400, "end is before start")
+    try:
+        export_service.arrow_schema(TABLES[table][0])
+    except RuntimeError as e:
+        raise HTTPException(503, str(e))
+
+    wanted = [s.strip().upper() for s in symbols.split(",")] if symbols else None
+    filename = f"{table}_{start}_{end}.{format}"
+
+    return StreamingResponse(
+        export_service.stream_export(
+            SessionLocal, table, start, end, wanted, format, batch_size
+        ),
+        media_type=FORMATS[format],
+        headers={"Content-Disposition": f'attachment; filename="{filename}"'},
+    )
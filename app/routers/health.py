@@ -1,11 +1,70 @@
+import time
+from datetime import datetime, time as dtime
+
 from fastapi import APIRouter
+from fastapi.responses import PlainTextResponse
+
+from app.config import settings
+from app.metrics import (
+    REGISTRY,
+    FEED_LAST_TICK,
+    CANDLE_QUEUE_DEPTH,
+    CANDLE_SPILL_PENDING,
+    WS_CLIENTS,
+)
 
 router = APIRouter(tags=["Health"])
 
+# feed considered stale after this many seconds without a tick (market hours)
+STALE_AFTER = 60
+
+
+def market_open(now: datetime) -> bool:
+    """
+    NSE cash session, Monday to Friday. There is no holiday calendar in
+    the tree, so an exchange holiday still counts as open.
+    """
+    return now.weekday() < 5 and dtime(9, 15) <= now.time() <= dtime(15, 30)
+
 
 @router.get("/health")
 def health():
+    """
+    Feed and candle queues only exist where the feed runs: in
+    RUN_MODE=api they live in the app.ingest process, so they are not
+    reported (or judged) here.
+    """
+    if settings.RUN_MODE == "api":
+        return {
+            "status": "ok",
+            "service": "NSE Scanner",
+            "mode": "api",
+            "queues": {"ws_clients": WS_CLIENTS.get()},
+        }
+
+    last_tick = FEED_LAST_TICK.get()
+    age = time.time() - last_tick if last_tick else None
+
+    stale = market_open(datetime.now()) and (age is None or age > STALE_AFTER)
+
     return {
-        "status": "ok",
+        "status": "degraded" if stale else "ok",
         "service": "NSE Scanner",
+        "mode": settings.RUN_MODE,
+        "feed": {
+            "last_tick_age_seconds": age,
+            "stale": stale,
+        },
+        "queues": {
+            "candle_flush": CANDLE_QUEUE_DEPTH.get(),
+            "candle_spill": CANDLE_SPILL_PENDING.get(),
+            "ws_clients": WS_CLIENTS.get(),
+        },
     }
+
+
+@router.get("/metrics", response_class=PlainTextResponse)
+def metrics():
+    return PlainTextResponse(
+        REGISTRY.render(), media_type="text/plain; version=0.0.4"
+    )
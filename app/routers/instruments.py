@@ -1,24 +1,41 @@
-from fastapi import APIRouter, Depends
+from typing import List
+
+from fastapi import APIRouter, Depends, Request
+from sqlalchemy import select
 from sqlalchemy.orm import Session
 
 from app.db.session import get_db
 from app.db import models
+from app.cache import response_cache
+from app.schemas.instruments import InstrumentOut
 
 router = APIRouter(prefix="/instruments", tags=["Instruments"])
 
 
-@router.get("/fno")
-def get_fno_stocks(db: Session = Depends(get_db)):
+INSTRUMENT_COLUMNS = [
+    getattr(models.Instrument, f) for f in InstrumentOut.model_fields
+]
+
+
+# cached bytes: the schema documents the body, nothing validates it
+@router.get("/fno", responses={200: {"model": List[InstrumentOut], "description": "Instruments"}})
+def get_fno_stocks(request: Request, db: Session = Depends(get_db)):
     """
     F&O stock universe (no options, no indices)
     """
-    return (
-        db.query(models.Instrument)
-        .filter(models.Instrument.exchange == "NSE")
-        .filter(models.Instrument.segment == "FNO")
-        .filter(models.Instrument.symbol.notin_(
-            ["NIFTY", "BANKNIFTY", "FINNIFTY", "MIDCPNIFTY"]
-        ))
-        .order_by(models.Instrument.symbol)
-        .all()
+    def build():
+        rows = db.execute(
+            select(*INSTRUMENT_COLUMNS)
+            .where(models.Instrument.exchange == "NSE")
+            .where(models.Instrument.segment == "FNO")
+            .where(models.Instrument.symbol.notin_(
+                ["NIFTY", "BANKNIFTY", "FINNIFTY", "MIDCPNIFTY"]
+            ))
+            .order_by(models.Instrument.symbol)
+        ).mappings()
+
+        return [dict(r) for r in rows]
+
+    return response_cache.respond(
+        request, "instruments:fno", build, ttl=300, tags=("instruments",)
     )
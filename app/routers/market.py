@@ -1,22 +1,57 @@
-from fastapi import APIRouter, Depends, Query
+from datetime import date
+from typing import List, Optional
+
+from fastapi import APIRouter, Depends, Query, Request, HTTPException
+from sqlalchemy import select
 from sqlalchemy.orm import Session
 
 from app.db.session import get_db
 from app.db import models
+from app.schemas.candles import Candle5mOut
+from app.responses import ORJSONResponse
 
 router = APIRouter(prefix="/market", tags=["Market"])
 
 
-@router.get("/candles")
+CANDLE_COLUMNS = [
+    getattr(models.Candle5m, f) for f in Candle5mOut.model_fields
+]
+
+
+# raw ORJSONResponse: the schema documents the body, nothing validates it
+@router.get("/candles", responses={200: {"model": List[Candle5mOut], "description": "Candles"}})
 def get_candles(
     symbol: str = Query(...),
     limit: int = Query(100),
     db: Session = Depends(get_db),
 ):
-    return (
-        db.query(models.Candle5m)
-        .filter(models.Candle5m.symbol == symbol)
+    # column-only rows: no ORM identity map, no per-row model validation
+    rows = db.execute(
+        select(*CANDLE_COLUMNS)
+        .where(models.Candle5m.symbol == symbol)
         .order_by(models.Candle5m.start_time.desc())
         .limit(limit)
-        .all()
-    )
+    ).mappings()
+
+    return ORJSONResponse([dict(r) for r in rows])
+
+
+@router.get("/option-chain/{symbol}")
+def get_option_chain(
+    symbol: str,
+    request: Request,
+    expiry: Optional[date] = Query(None),
+):
+    """
+    Live chain with IV / Greeks / PCR / max-pain (served from memory)
+    """
+    chains = getattr(request.app.state, "option_chains", None)
+    if chains is None:
+        raise HTTPException(503, "Option chain feed not running")
+
+    snap = chains.snapshot(symbol.upper(), expiry)
+    if snap is None:
+        raise HTTPException(404, f"No option chain for {symbol}")
+
+    # already JSON-native: skip jsonable_encoder
+    return ORJSONResponse(snap)
@@ -1,12 +1,15 @@
 # app/routers/signals.py
 
-from fastapi import APIRouter, Depends, Query
+from typing import List
+
+from fastapi import APIRouter, Depends, Query, Request
+from sqlalchemy import select
 from sqlalchemy.orm import Session
 
 from app.db.session import get_db
 from app.db import models
-
-print("✅ signals router loaded")
+from app.cache import response_cache
+from app.schemas.signals import SignalOut, SignalStatsOut
 
 router = APIRouter(
     prefix="/signals",
@@ -14,39 +17,73 @@ router = APIRouter(
 )
 
 
-@router.get("/", summary="All signals")
+SIGNAL_COLUMNS = [getattr(models.Signal, f) for f in SignalOut.model_fields]
+
+# Handlers return pre-serialized cached bytes, so the schemas only
+# document the body (`responses=`); a response_model would claim a
+# validation that never runs.
+
+
+@router.get("/", summary="All signals",
+            responses={200: {"model": List[SignalOut], "description": "Signals"}})
 def get_signals(
+    request: Request,
     limit: int = Query(50, le=200),
     db: Session = Depends(get_db),
 ):
-    return (
-        db.query(models.Signal)
-        .order_by(models.Signal.time.desc())
-        .limit(limit)
-        .all()
+    def build():
+        rows = db.execute(
+            select(*SIGNAL_COLUMNS)
+            .order_by(models.Signal.time.desc())
+            .limit(limit)
+        ).mappings()
+
+        return [dict(r) for r in rows]
+
+    return response_cache.respond(
+        request, f"signals:all:{limit}", build, ttl=30, tags=("signals",)
     )
 
 
 @router.get("/latest", summary="Latest signals (dashboard)")
 def latest_signals(
+    request: Request,
     limit: int = Query(50, le=100),
     db: Session = Depends(get_db),
 ):
-    rows = (
-        db.query(models.Signal)
-        .order_by(models.Signal.time.desc())
-        .limit(limit)
-        .all()
+    def build():
+        rows = db.execute(
+            select(
+                models.Signal.symbol,
+                models.Signal.rule,
+                models.Signal.time,
+                models.Signal.move_pct,
+            )
+            .order_by(models.Signal.time.desc())
+            .limit(limit)
+        ).mappings()
+
+        return {"signals": [dict(r) for r in rows]}
+
+    return response_cache.respond(
+        request, f"signals:latest:{limit}", build, ttl=30, tags=("signals",)
     )
 
-    return {
-        "signals": [
-            {
-                "symbol": r.symbol,
-                "rule": r.rule,
-                "time": r.time.isoformat(),
-                "move_pct": r.move_pct,
-            }
-            for r in rows
-        ]
-    }
+
+@router.get("/stats", summary="Outcome stats per rule",
+            responses={200: {"model": List[SignalStatsOut], "description": "Stats"}})
+def signal_stats(request: Request, db: Session = Depends(get_db)):
+    """
+    Forward returns, hit rates and MFE / MAE per rule (see OutcomeService)
+    """
+    def build():
+        rows = db.execute(
+            select(*[getattr(models.SignalStats, f) for f in SignalStatsOut.model_fields])
+            .order_by(models.SignalStats.rule)
+        ).mappings()
+
+        return [dict(r) for r in rows]
+
+    return response_cache.respond(
+        request, "signals:stats", build, ttl=300, tags=("signal_stats",)
+    )
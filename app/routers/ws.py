@@ -1,6 +1,11 @@
 from fastapi import APIRouter, WebSocket, WebSocketDisconnect
 from typing import List
+import asyncio
 import json
+import time
+
+from app.metrics import WS_CLIENTS, WS_BROADCAST_SECONDS
+from app.cache import response_cache
 
 router = APIRouter()
 
@@ -17,11 +22,28 @@ class ConnectionManager:
         self.active_connections.remove(websocket)
 
     async def broadcast(self, message: dict):
+        t0 = time.perf_counter()
+        text = json.dumps(message)
         for ws in self.active_connections:
-            await ws.send_text(json.dumps(message))
+            await ws.send_text(text)
+        WS_BROADCAST_SECONDS.observe(time.perf_counter() - t0)
 
 
 manager = ConnectionManager()
+WS_CLIENTS.set_function(lambda: len(manager.active_connections))
+
+
+def bus_handler(loop: asyncio.AbstractEventLoop):
+    """
+    Bus subscriber for this worker: fan messages out to local /ws clients.
+    Safe to call from the bus listener thread.
+    """
+    def handle(message: dict):
+        if message.get("type") == "signal":
+            response_cache.invalidate("signals")
+        asyncio.run_coroutine_threadsafe(manager.broadcast(message), loop)
+
+    return handle
 
 
 @router.websocket("/ws")
@@ -0,0 +1,122 @@
+import asyncio
+from datetime import date
+from typing import List
+
+from logzero import logger
+
+from app.bus import get_bus
+from app.config import settings
+from app.db.session import SessionLocal
+from app.providers.smartapi_provider import SmartAPIProvider
+from app.providers.ws_provider import WebSocketProvider
+from app.services.breadth_service import BreadthService
+from app.services.candle_cache_service import CachedCandleProvider
+from app.services.levels_service import LevelsService
+from app.services.outcome_service import OutcomeService
+from app.services.scanner_service import ScannerService
+from app.services.retention_service import RetentionService
+from app.services.snapshot_service import SnapshotService
+
+
+class LiveRuntime:
+    """
+    Owns every long-running component and the single SmartAPI session
+    they share: live feed (+ candle flush thread and realtime scanner),
+    intraday batch scanner, breadth, signal outcome tracker and retention job.
+    """
+
+    def __init__(self, max_tokens=50):
+        self.provider = SmartAPIProvider()
+        # history goes through the local cache; the feed keeps the raw
+        # provider for login / feed token
+        self.candles = CachedCandleProvider(self.provider)
+        self.levels = LevelsService(self.candles)
+
+        self.scanner = ScannerService(self.candles, self.levels)
+        self.feed = WebSocketProvider(
+            max_tokens=max_tokens,
+            provider=self.provider,
+            levels=self.levels,
+        )
+        self.retention = RetentionService()
+        self.breadth = BreadthService()
+        self.outcomes = OutcomeService()
+        self.snapshots = SnapshotService(
+            self.feed, self.scanner, self.candles, settings.SNAPSHOT_PATH
+        )
+
+        self.feed.candle_builder.add_close_listener(self._publish_candle)
+        self.feed.candle_builder.add_close_listener(self.breadth.on_candle_close)
+
+        self._tasks: List[asyncio.Task] = []
+        self._booted = False
+
+    @property
+    def candle_builder(self):
+        return self.feed.candle_builder
+
+    @property
+    def option_chains(self):
+        return self.feed.option_chains
+
+    def _publish_candle(self, candle: dict):
+        get_bus().publish({
+            "type": "candle",
+            "payload": {
+                "symbol": self.feed.token_symbol_map.get(candle["token"]),
+                "token": candle["token"],
+                "start": candle["start"].isoformat(),
+                "open": candle["open"],
+                "high": candle["high"],
+                "low": candle["low"],
+                "close": candle["close"],
+                "volume": candle["volume"],
+            },
+        })
+
+    def _initialize(self):
+        self.feed.initialize()
+        self.breadth.load(SessionLocal, self.feed.token_symbol_map)
+        self.breadth.refresh_levels(date.today())
+        # before the feed starts, so ticks continue the restored candles
+        self.snapshots.restore()
+
+    # -------------------------------------------------
+    async def _boot(self):
+        """
+        Login + token load + warm start, then the feed. Blocking work
+        stays off the loop and the app serves requests meanwhile.
+        """
+        try:
+            await asyncio.to_thread(self._initialize)
+        except Exception:
+            logger.exception("Live runtime failed to initialize")
+            return
+        self.feed.start()
+        self._booted = True
+        logger.info("📡 Live feed started")
+
+        # only after restore, or an early save would clobber the snapshot
+        self._tasks.append(asyncio.create_task(self.snapshots.run_loop()))
+        await asyncio.to_thread(self.snapshots.replay_gap)
+
+    async def start(self):
+        self._tasks = [
+            asyncio.create_task(self._boot()),
+            asyncio.create_task(self.scanner.run_intraday_loop(SessionLocal)),
+            asyncio.create_task(self.retention.run_daily_loop(SessionLocal)),
+            asyncio.create_task(self.outcomes.run_loop(SessionLocal)),
+        ]
+        logger.info("🚀 Live runtime started")
+
+    async def stop(self):
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+
+        await asyncio.to_thread(self.feed.stop)
+        self.breadth.stop()
+        if self._booted:
+            await asyncio.to_thread(self.snapshots.save)
+        logger.info("🛑 Live runtime stopped")
@@ -0,0 +1,19 @@
+from pydantic import BaseModel
+from datetime import date
+from typing import Optional
+
+class InstrumentOut(BaseModel):
+    id: int
+    symbol: str
+    token: str
+    name: Optional[str] = None
+    exchange: str
+    segment: Optional[str] = None
+    active: Optional[bool] = None
+    sector: Optional[str] = None
+    expiry: Optional[date] = None
+    strike: Optional[float] = None
+    option_type: Optional[str] = None
+
+    class Config:
+        from_attributes = True
@@ -1,5 +1,6 @@
 from pydantic import BaseModel
 from datetime import datetime
+from typing import Optional
 
 class SignalOut(BaseModel):
     id: int
@@ -12,3 +13,21 @@ class SignalOut(BaseModel):
 
     class Config:
         from_attributes = True
+
+
+class SignalStatsOut(BaseModel):
+    rule: str
+    signals: int
+    closed: int
+    avg_ret_15m: Optional[float] = None
+    avg_ret_30m: Optional[float] = None
+    avg_ret_60m: Optional[float] = None
+    hit_rate_15m: Optional[float] = None
+    hit_rate_30m: Optional[float] = None
+    hit_rate_60m: Optional[float] = None
+    avg_mfe_pct: Optional[float] = None
+    avg_mae_pct: Optional[float] = None
+    updated_at: Optional[datetime] = None
+
+    class Config:
+        from_attributes = True
@@ -0,0 +1,260 @@
+"""
+Market breadth over the live universe, recomputed at every 5m bucket close.
+
+    python -m app.services.breadth_service load-sectors sectors.csv
+
+loads a `symbol,sector` CSV into instruments.sector.
+"""
+import csv
+import sys
+from datetime import date, datetime
+from threading import Lock, Timer
+from typing import Dict, List, Optional
+
+import numpy as np
+from logzero import logger
+from sqlalchemy.orm import Session
+
+from app.bus import get_bus
+from app.db import models
+
+UNCLASSIFIED = "OTHER"
+
+
+def update_sectors(db: Session, mapping: Dict[str, str]) -> int:
+    """
+    Set instruments.sector for every row of each symbol (cash and F&O).
+    """
+    n = 0
+    for symbol, sector in mapping.items():
+        n += (
+            db.query(models.Instrument)
+            .filter(models.Instrument.symbol == symbol)
+            .update({"sector": sector}, synchronize_session=False)
+        )
+    db.commit()
+    return n
+
+
+class BreadthService:
+    """
+    Keeps the universe in numpy arrays (one slot per token) and, shortly
+    after each bucket boundary, computes:
+      - advancers / decliners / unchanged vs previous close
+      - % of the universe above PDH / below PDL
+      - per-sector average return and advancers / decliners
+
+    Candles for a bucket close as each token's first tick of the next
+    bucket arrives, so the snapshot is taken `settle_seconds` after the
+    first close of a bucket. Previous-day levels are read off the tick
+    path (at boot and from the snapshot timer) and re-read while any
+    token still has none, since the scanner writes them during the day.
+    """
+
+    def __init__(self, settle_seconds: float = 2.0):
+        self.settle_seconds = settle_seconds
+
+        self.index: Dict[str, int] = {}  # token -> slot
+        self.symbols: List[str] = []
+        self.sector_names: List[str] = []
+        self.sector_ids = np.zeros(0, dtype=np.int64)
+        self.pdc = np.zeros(0)
+        self.pdh = np.zeros(0)
+        self.pdl = np.zeros(0)
+        self.close = np.zeros(0)
+        self.levels_date: Optional[date] = None
+        self.missing_levels = 0
+        self.session_date: Optional[date] = None
+
+        self._db_factory = None
+        self._lock = Lock()
+        self._bucket: Optional[datetime] = None
+        self._timer: Optional[Timer] = None
+
+    # -------------------------------------------------
+    def load(self, db_factory, token_symbol_map: Dict[str, str]):
+        """
+        Build the slot arrays and sector codes from instruments.
+        """
+        self._db_factory = db_factory
+        tokens = list(token_symbol_map)
+        self.index = {t: i for i, t in enumerate(tokens)}
+        self.symbols = [token_symbol_map[t] for t in tokens]
+
+        db = db_factory()
+        try:
+            sectors = dict(
+                db.query(models.Instrument.symbol, models.Instrument.sector)
+                .filter(models.Instrument.symbol.in_(set(self.symbols)))
+                .filter(models.Instrument.sector.isnot(None))
+                .all()
+            )
+        finally:
+            db.close()
+
+        per_symbol = [sectors.get(s, UNCLASSIFIED) for s in self.symbols]
+        self.sector_names = sorted(set(per_symbol))
+        code = {name: i for i, name in enumerate(self.sector_names)}
+        self.sector_ids = np.array([code[s] for s in per_symbol], dtype=np.int64)
+
+        n = len(tokens)
+        self.close = np.full(n, np.nan)
+        self.pdc = np.full(n, np.nan)
+        self.pdh = np.full(n, np.nan)
+        self.pdl = np.full(n, np.nan)
+        self.levels_date = None
+        self.session_date = None
+
+        logger.info(
+            f"📊 Breadth universe: {n} tokens, {len(self.sector_names)} sectors"
+        )
+
+    def refresh_levels(self, date_: date):
+        """
+        Read PDC / PDH / PDL for `date_` and swap them in.
+        """
+        db = self._db_factory()
+        try:
+            rows = (
+                db.query(
+                    models.DailyLevel.symbol,
+                    models.DailyLevel.pdc,
+                    models.DailyLevel.pdh,
+                    models.DailyLevel.pdl,
+                )
+                .filter(models.DailyLevel.trade_date == date_)
+                .all()
+            )
+        finally:
+            db.close()
+
+        n = len(self.symbols)
+        pdc, pdh, pdl = np.full(n, np.nan), np.full(n, np.nan), np.full(n, np.nan)
+        slot = {s: i for i, s in enumerate(self.symbols)}
+        for symbol, c, h, l in rows:
+            i = slot.get(symbol)
+            if i is not None:
+                pdc[i], pdh[i], pdl[i] = c, h, l
+
+        missing = int(np.isnan(pdc).sum())
+        with self._lock:
+            self.pdc, self.pdh, self.pdl = pdc, pdh, pdl
+            self.levels_date = date_
+            self.missing_levels = missing
+
+        if missing:
+            logger.warning(
+                f"📊 Breadth: no {date_} levels yet for {missing}/{n} tokens "
+                "(excluded until they are stored)"
+            )
+
+    # -------------------------------------------------
+    def on_candle_close(self, candle: dict):
+        i = self.index.get(candle["token"])
+        if i is None:
+            return
+
+        start = candle["start"]
+        with self._lock:
+            if start.date() != self.session_date:
+                self.session_date = start.date()
+                self.close[:] = np.nan
+            self.close[i] = candle["close"]
+
+            if self._bucket is None or start > self._bucket:
+                self._bucket = start
+                self._timer = Timer(self.settle_seconds, self.publish)
+                self._timer.daemon = True
+                self._timer.start()
+
+    def publish(self):
+        day = self._bucket.date()
+        if self.levels_date != day or self.missing_levels:
+            try:
+                self.refresh_levels(day)
+            except Exception:
+                logger.exception("Breadth levels refresh failed")
+
+        snap = self.compute()
+        if snap is not None:
+            get_bus().publish({"type": "breadth", "payload": snap})
+
+    def stop(self):
+        if self._timer:
+            self._timer.cancel()
+
+    # -------------------------------------------------
+    def compute(self) -> Optional[dict]:
+        with self._lock:
+            if self._bucket is None:
+                return None
+            close = self.close.copy()
+            bucket = self._bucket
+            pdc, pdh, pdl = self.pdc, self.pdh, self.pdl
+
+        live = ~np.isnan(close) & ~np.isnan(pdc)
+        n = int(live.sum())
+        if not n:
+            return None
+
+        chg = np.where(live, close / np.where(live, pdc, 1.0) - 1.0, 0.0)
+        up = live & (chg > 0)
+        down = live & (chg < 0)
+
+        # NaN comparisons are False, so tokens without levels drop out
+        with np.errstate(invalid="ignore"):
+            above_pdh = live & (close > pdh)
+            below_pdl = live & (close < pdl)
+
+        k = len(self.sector_names)
+        count = np.bincount(self.sector_ids, weights=live, minlength=k)
+        total = np.bincount(self.sector_ids, weights=chg, minlength=k)
+        adv = np.bincount(self.sector_ids, weights=up, minlength=k)
+        dec = np.bincount(self.sector_ids, weights=down, minlength=k)
+
+        sectors = [
+            {
+                "sector": self.sector_names[s],
+                "return_pct": round(float(total[s] / count[s] * 100), 3),
+                "advancers": int(adv[s]),
+                "decliners": int(dec[s]),
+                "count": int(count[s]),
+            }
+            for s in np.argsort(-np.divide(total, count, where=count > 0,
+                                           out=np.full(k, -np.inf)))
+            if count[s]
+        ]
+
+        advancers, decliners = int(up.sum()), int(down.sum())
+        return {
+            "time": bucket.isoformat(),
+            "universe": len(self.symbols),
+            "reporting": n,
+            "advancers": advancers,
+            "decliners": decliners,
+            "unchanged": n - advancers - decliners,
+            "ad_ratio": round(advancers / decliners, 3) if decliners else None,
+            "pct_above_pdh": round(float(above_pdh.sum()) / n * 100, 2),
+            "pct_below_pdl": round(float(below_pdl.sum()) / n * 100, 2),
+            "sectors": sectors,
+        }
+
+
+if __name__ == "__main__":
+    from app.db.session import SessionLocal
+
+    if len(sys.argv) != 3 or sys.argv[1] != "load-sectors":
+        sys.exit("usage: python -m app.services.breadth_service load-sectors FILE.csv")
+
+    with open(sys.argv[2], newline="") as f:
+        mapping = {
+            row["symbol"].strip().upper(): row["sector"].strip()
+            for row in csv.DictReader(f)
+            if row.get("symbol") and row.get("sector")
+        }
+
+    db = SessionLocal()
+    try:
+        print(f"Updated {update_sectors(db, mapping)} instruments")
+    finally:
+        db.close()
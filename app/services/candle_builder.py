@@ -1,34 +1,67 @@
 from datetime import datetime
 from collections import defaultdict
-from threading import Lock, Thread
+from threading import Lock
 import time
-from typing import Optional, Dict, Any, List
+from typing import Optional, Dict, Any, List, Callable
 
+from app.config import settings
 from app.db.session import SessionLocal
 from app.db import models
+from app.db.dialect import insert_for
+from app.services.candle_flusher import CandleFlusher
+from app.metrics import (
+    CANDLES_CLOSED,
+    FLUSH_BATCH_SIZE,
+    FLUSH_COMMIT_SECONDS,
+)
 from logzero import logger
 
 
+def stored_symbol(symbol: Optional[str], name: Optional[str], segment: Optional[str],
+                  expiry) -> Optional[str]:
+    """
+    candles_5m symbol for an instrument. A future whose symbol is missing
+    or equals its underlying's (the cash symbol) is keyed by its exchange
+    trading symbol instead, e.g. RELIANCE28MAR24FUT, so futures bars can
+    never overwrite the cash bars.
+    """
+    if segment != "FUT" or (symbol and symbol != name) or not expiry:
+        return symbol
+    return f"{name}{expiry:%d%b%y}FUT".upper()
+
+
 class CandleBuilder:
     """
     Builds 5-minute OHLC candles from incoming ticks.
+    Ticks that carry open interest (futures) also keep the bucket's last
+    `oi` and `oi_change` vs the previous bucket's last OI.
+    Candles normally close on the token's first tick of a new bucket;
+    `close_before()` closes them on a clock instead.
     On candle close:
-      - Stores to DB
+      - Queues it for storage (CandleFlusher)
       - Triggers realtime scanner callback
     """
 
-    def __init__(self, bucket_minutes=5, on_candle_close=None):
+    def __init__(self, bucket_minutes=5, on_candle_close=None, spill_path=None):
         self.bucket_minutes = bucket_minutes
-        self.on_candle_close = on_candle_close
+
+        # called in order with each completed candle
+        self.close_listeners: List[Callable[[Dict[str, Any]], None]] = []
+        if on_candle_close:
+            self.close_listeners.append(on_candle_close)
 
         self.live: Dict[str, Dict[str, Any]] = {}
         self.locks: Dict[str, Lock] = defaultdict(Lock)
+        # last OI of a candle closed by close_before(): the next bucket's oi_open
+        self.carry_oi: Dict[str, float] = {}
 
-        self.completed_queue: List[Dict[str, Any]] = []
-        self.queue_lock = Lock()
+        self.flusher = CandleFlusher(
+            self._write_candles_to_db,
+            spill_path=spill_path or settings.CANDLE_SPILL_PATH,
+        )
 
-        self._stop = False
-        Thread(target=self._periodic_flush, daemon=True).start()
+    def add_close_listener(self, fn: Callable[[Dict[str, Any]], None]):
+        self.close_listeners.append(fn)
 
     def _bucket_start(self, ts: datetime) -> datetime:
         minute = (ts.minute // self.bucket_minutes) * self.bucket_minutes
@@ -40,6 +73,7 @@ class CandleBuilder:
         ltp: float,
         volume: float,
         ts: Optional[datetime] = None,
+        oi: Optional[float] = None,
     ):
         ts = ts or datetime.now()
         start = self._bucket_start(ts)
@@ -58,13 +92,16 @@ class CandleBuilder:
                     "close": ltp,
                     "volume": volume or 0,
                 }
+                if oi is not None:
+                    self.live[token]["oi"] = oi
+                    self.live[token]["oi_open"] = self.carry_oi.pop(token, oi)
                 return None
 
             # CANDLE CLOSED
             if cur["start"] != start:
                 completed = cur.copy()
 
-                self.live[token] = {
+                nxt = self.live[token] = {
                     "token": token,
                     "start": start,
                     "open": ltp,
@@ -73,65 +110,125 @@ class CandleBuilder:
                     "close": ltp,
                     "volume": volume or 0,
                 }
+                if "oi" in completed:
+                    completed["oi_change"] = completed["oi"] - completed["oi_open"]
+                    # next bucket's delta starts from this bucket's last OI
+                    nxt["oi_open"] = completed["oi"]
+                if oi is not None:
+                    nxt["oi"] = oi
+                    nxt.setdefault("oi_open", oi)
 
-                with self.queue_lock:
-                    self.completed_queue.append(completed)
-
-                if self.on_candle_close:
-                    self.on_candle_close(completed)
-
-                return completed
+                return self.emit_closed(completed)
 
             # UPDATE LIVE
             cur["high"] = max(cur["high"], ltp)
             cur["low"] = min(cur["low"], ltp)
             cur["close"] = ltp
             cur["volume"] += volume or 0
+            if oi is not None:
+                cur["oi"] = oi
+                cur.setdefault("oi_open", oi)
 
             return None
 
-    def _periodic_flush(self):
-        while not self._stop:
-            batch = []
-            with self.queue_lock:
-                if self.completed_queue:
-                    batch = self.completed_queue[:]
-                    self.completed_queue.clear()
-
-            if batch:
-                self._write_candles_to_db(batch)
-
-            time.sleep(1)
+    def close_before(self, start: datetime) -> int:
+        """
+        Close every live candle of a bucket before `start` without waiting
+        for the token's next tick (thin contracts may not trade for minutes).
+        """
+        closed = 0
+        for token in list(self.live):
+            with self.locks[token]:
+                cur = self.live.get(token)
+                if cur is None or cur["start"] >= start:
+                    continue
+                del self.live[token]
+                if "oi" in cur:
+                    cur["oi_change"] = cur["oi"] - cur["oi_open"]
+                    self.carry_oi[token] = cur["oi"]
+                self.emit_closed(cur)
+                closed += 1
+        return closed
+
+    def emit_closed(self, completed: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        Store a completed candle and run the close listeners. Also used to
+        replay bars missed while the process was down.
+        """
+        completed["closed_at"] = time.perf_counter()
+        CANDLES_CLOSED.inc()
+
+        self.flusher.put(completed)
+
+        for fn in self.close_listeners:
+            fn(completed)
+
+        return completed
+
+    def stop(self, timeout=5):
+        """
+        Stop the flush thread and store whatever is still queued.
+        """
+        self.flusher.stop(timeout)
 
     def _write_candles_to_db(self, candles):
+        """
+        Upsert a batch; raises so the flusher can retry / spill.
+        """
+        FLUSH_BATCH_SIZE.observe(len(candles))
+        t0 = time.perf_counter()
+
         db = SessionLocal()
         try:
-            for c in candles:
-                inst = (
-                    db.query(models.Instrument)
-                    .filter(models.Instrument.token == c["token"])
-                    .first()
-                )
-                if not inst:
-                    continue
-
-                db.add(
-                    models.Candle5m(
-                        symbol=inst.symbol,
-                        start_time=c["start"],
-                        open=c["open"],
-                        high=c["high"],
-                        low=c["low"],
-                        close=c["close"],
-                        volume=c["volume"],
+            tokens = {c["token"] for c in candles}
+            symbols = {
+                token: stored_symbol(symbol, name, segment, expiry)
+                for token, symbol, name, segment, expiry in (
+                    db.query(
+                        models.Instrument.token,
+                        models.Instrument.symbol,
+                        models.Instrument.name,
+                        models.Instrument.segment,
+                        models.Instrument.expiry,
                     )
+                    .filter(models.Instrument.token.in_(tokens))
+                    .all()
+                )
+            }
+
+            rows = [
+                {
+                    "symbol": symbols[c["token"]],
+                    "start_time": c["start"],
+                    "open": c["open"],
+                    "high": c["high"],
+                    "low": c["low"],
+                    "close": c["close"],
+                    "volume": c["volume"],
+                }
+                for c in candles
+                if c["token"] in symbols
+            ]
+
+            if rows:
+                # (symbol, start_time) is the key: re-writes replace the bar
+                insert = insert_for(db)
+                stmt = insert(models.Candle5m).values(rows)
+                stmt = stmt.on_conflict_do_update(
+                    index_elements=["symbol", "start_time"],
+                    set_={
+                        k: stmt.excluded[k]
+                        for k in ("open", "high", "low", "close", "volume")
+                    },
                 )
+                db.execute(stmt)
 
             db.commit()
-            logger.info(f"🕯️ Stored {len(candles)} 5m candles")
+            FLUSH_COMMIT_SECONDS.observe(time.perf_counter() - t0)
+            logger.info(f"🕯️ Stored {len(rows)} 5m candles")
 
         except Exception:
             db.rollback()
-            logger.exception("Failed to store candles")
+            raise
         finally:
             db.close()
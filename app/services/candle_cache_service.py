@@ -0,0 +1,265 @@
+import time
+from datetime import datetime, time as dtime, timedelta
+from threading import Lock
+from typing import Dict, List, Optional, Tuple
+
+from logzero import logger
+
+from app.db.session import SessionLocal
+from app.db import models
+from app.db.dialect import insert_for
+from app.metrics import CANDLE_CACHE_BARS
+from app.providers.smartapi_provider import SmartAPIError
+
+IST_SUFFIX = "+05:30"
+BUCKET = timedelta(minutes=5)
+FIRST_BUCKET = (9, 15)
+LAST_BUCKET = (15, 25)
+
+
+def expected_buckets(from_dt: datetime, to_dt: datetime) -> List[datetime]:
+    """
+    5m bucket starts within market hours (weekdays) in [from_dt, to_dt].
+    """
+    t = from_dt.replace(second=0, microsecond=0)
+    if t.minute % 5 or t < from_dt:
+        t += timedelta(minutes=5 - t.minute % 5)
+
+    out = []
+    while t <= to_dt:
+        if t.weekday() < 5 and FIRST_BUCKET <= (t.hour, t.minute) <= LAST_BUCKET:
+            out.append(t)
+        t += BUCKET
+    return out
+
+
+def _runs(buckets: List[datetime]) -> List[Tuple[datetime, datetime]]:
+    """
+    Group sorted buckets into contiguous (first, last) ranges.
+    """
+    runs = []
+    for b in buckets:
+        if runs and b - runs[-1][1] == BUCKET:
+            runs[-1][1] = b
+        else:
+            runs.append([b, b])
+    return [(a, b) for a, b in runs]
+
+
+class CachedCandleProvider:
+    """
+    Read-through cache in front of SmartAPIProvider.get_5m_candles.
+
+    Lookup order per bucket: memory → candles_5m → network (only the
+    missing contiguous sub-ranges). Fetched closed bars are written back
+    to candles_5m. Closed buckets never expire; the forming bucket is
+    kept for `forming_ttl` seconds. Closed buckets a successful response
+    had no bar for (holidays, no trades) are remembered as empty for
+    `empty_ttl` seconds; failed fetches are never cached. Bars older than
+    `keep_days` are dropped at the first call of each day.
+    """
+
+    def __init__(self, provider, db_factory=SessionLocal,
+                 forming_ttl: float = 30, empty_ttl: float = 900,
+                 keep_days: int = 5):
+        self.provider = provider
+        self.db_factory = db_factory
+        self.forming_ttl = forming_ttl
+        self.empty_ttl = empty_ttl
+        self.keep_days = keep_days
+
+        # (exchange, token) -> {bucket: row}
+        self._bars: Dict[Tuple[str, str], Dict[datetime, list]] = {}
+        # (exchange, token) -> (bucket, row, expires)
+        self._forming: Dict[Tuple[str, str], Tuple[datetime, list, float]] = {}
+        # ((exchange, token), bucket) -> expires
+        self._empty: Dict[Tuple[Tuple[str, str], datetime], float] = {}
+        self._symbols: Dict[str, Optional[str]] = {}
+        self._day = None
+        self._lock = Lock()
+
+    # -------------------------------------------------
+    def get_5m_candles(self, exchange, token, from_dt, to_dt):
+        key = (exchange, token)
+        now = datetime.now()
+        forming = now.replace(
+            minute=now.minute - now.minute % 5, second=0, microsecond=0
+        )
+        if now.date() != self._day:
+            self._day = now.date()
+            self.evict_before(
+                datetime.combine(now.date() - timedelta(days=self.keep_days), dtime.min)
+            )
+
+        wanted = [b for b in expected_buckets(from_dt, to_dt) if b <= forming]
+        if not wanted:
+            return []
+
+        found: Dict[datetime, list] = {}
+        self._from_memory(key, wanted, forming, found)
+        CANDLE_CACHE_BARS.labels(source="memory").inc(len(found))
+
+        missing = [b for b in wanted if b not in found and not self._known_empty(key, b)]
+        closed_missing = [b for b in missing if b != forming]
+
+        if closed_missing:
+            symbol = self._symbol(token)
+            if symbol:
+                self._from_db(key, symbol, closed_missing, found)
+            missing = [b for b in missing if b not in found]
+
+        if missing:
+            self._from_network(key, missing, forming, found)
+
+        return [found[b] for b in wanted if b in found]
+
+    # -------------------------------------------------
+    def _from_memory(self, key, wanted, forming, found):
+        with self._lock:
+            bars = self._bars.get(key, {})
+            for b in wanted:
+                row = bars.get(b)
+                if row is not None:
+                    found[b] = row
+
+            f = self._forming.get(key)
+            if f and f[0] == forming and f[2] > time.monotonic() and forming in wanted:
+                found[forming] = f[1]
+
+    def _from_db(self, key, symbol, buckets, found):
+        db = self.db_factory()
+        try:
+            rows = (
+                db.query(
+                    models.Candle5m.start_time,
+                    models.Candle5m.open,
+                    models.Candle5m.high,
+                    models.Candle5m.low,
+                    models.Candle5m.close,
+                    models.Candle5m.volume,
+                )
+                .filter(models.Candle5m.symbol == symbol)
+                .filter(models.Candle5m.start_time >= buckets[0])
+                .filter(models.Candle5m.start_time <= buckets[-1])
+                .all()
+            )
+        finally:
+            db.close()
+
+        wanted = set(buckets)
+        loaded = {}
+        for start, o, h, l, c, v in rows:
+            if start in wanted:
+                loaded[start] = [start.isoformat() + IST_SUFFIX, o, h, l, c, v]
+
+        found.update(loaded)
+        self._remember(key, loaded)
+        CANDLE_CACHE_BARS.labels(source="db").inc(len(loaded))
+
+    def _known_empty(self, key, bucket) -> bool:
+        expires = self._empty.get((key, bucket))
+        return expires is not None and expires > time.monotonic()
+
+    def _from_network(self, key, missing, forming, found):
+        exchange, token = key
+        fetched: Dict[datetime, list] = {}
+        answered: List[datetime] = []
+
+        for first, last in _runs(missing):
+            try:
+                rows = self.provider.fetch_5m_candles(exchange, token, first, last)
+            except SmartAPIError as e:
+                logger.error(f"Candle fetch failed: {e}")
+                continue
+            for row in rows:
+                start = datetime.fromisoformat(row[0].split("+")[0])
+                fetched[start] = row
+            answered.extend(b for b in missing if first <= b <= last)
+
+        closed = {b: r for b, r in fetched.items() if b != forming}
+        found.update(fetched)
+        self._remember(key, closed)
+        CANDLE_CACHE_BARS.labels(source="network").inc(len(fetched))
+
+        with self._lock:
+            if forming in fetched:
+                self._forming[key] = (
+                    forming, fetched[forming], time.monotonic() + self.forming_ttl
+                )
+            expires = time.monotonic() + self.empty_ttl
+            for b in answered:
+                if b != forming and b not in fetched:
+                    self._empty[(key, b)] = expires
+
+        if closed:
+            self._write_back(token, closed)
+
+    # -------------------------------------------------
+    def _remember(self, key, bars: Dict[datetime, list]):
+        if not bars:
+            return
+        horizon = datetime.now() - timedelta(days=self.keep_days)
+        with self._lock:
+            store = self._bars.setdefault(key, {})
+            for b, row in bars.items():
+                if b >= horizon:
+                    store[b] = row
+
+    def _symbol(self, token: str) -> Optional[str]:
+        if token not in self._symbols:
+            db = self.db_factory()
+            try:
+                inst = (
+                    db.query(models.Instrument.symbol)
+                    .filter(models.Instrument.token == token)
+                    .first()
+                )
+            finally:
+                db.close()
+            self._symbols[token] = inst[0] if inst else None
+        return self._symbols[token]
+
+    def _write_back(self, token: str, bars: Dict[datetime, list]):
+        symbol = self._symbol(token)
+        if not symbol:
+            return
+
+        db = self.db_factory()
+        try:
+            insert = insert_for(db)
+            stmt = insert(models.Candle5m).values([
+                {
+                    "symbol": symbol,
+                    "start_time": b,
+                    "open": float(r[1]),
+                    "high": float(r[2]),
+                    "low": float(r[3]),
+                    "close": float(r[4]),
+                    "volume": float(r[5]),
+                }
+                for b, r in bars.items()
+            ]).on_conflict_do_nothing(index_elements=["symbol", "start_time"])
+            db.execute(stmt)
+            db.commit()
+        except Exception:
+            db.rollback()
+            logger.exception("Candle cache write-back failed")
+        finally:
+            db.close()
+
+    def evict_before(self, cutoff: datetime):
+        """
+        Drop cached bars older than `cutoff` and expired empty markers.
+        """
+        now = time.monotonic()
+        with self._lock:
+            for key in list(self._bars):
+                bars = self._bars[key]
+                for b in [b for b in bars if b < cutoff]:
+                    del bars[b]
+                if not bars:
+                    del self._bars[key]
+            self._empty = {
+                k: expires for k, expires in self._empty.items()
+                if k[1] >= cutoff and expires > now
+            }
@@ -0,0 +1,252 @@
+import os
+import time
+import weakref
+from collections import deque
+from datetime import datetime
+from threading import Condition, Event, Lock, Thread
+from typing import Any, Callable, Deque, Dict, List
+
+import orjson
+from logzero import logger
+
+from app.metrics import (
+    CANDLE_QUEUE_DEPTH,
+    CANDLE_SPILL_PENDING,
+    CANDLES_REPLAYED,
+    CANDLES_SPILLED,
+    FLUSH_FAILURES,
+    FLUSH_RETRIES,
+)
+
+Candle = Dict[str, Any]
+
+# every live flusher (cash and futures candles) reports into the same gauges
+_flushers: "weakref.WeakSet[CandleFlusher]" = weakref.WeakSet()
+CANDLE_QUEUE_DEPTH.set_function(lambda: sum(len(f) for f in list(_flushers)))
+CANDLE_SPILL_PENDING.set_function(
+    lambda: sum(f.spill_pending for f in list(_flushers))
+)
+
+
+class CandleFlusher:
+    """
+    Bounded queue between the tick thread and the database.
+
+    - the writer thread sleeps on a Condition and wakes when a full batch
+      is queued (or after `max_wait` for a partial one)
+    - batch size adapts: doubled while commits are fast and a backlog
+      exists, halved when a commit takes longer than `target_seconds`
+    - failed batches are retried with exponential backoff; after
+      `max_retries` (or when the queue is full) candles go to an
+      append-only spill file, replayed once writes succeed again
+    - `stop()` drains the queue; whatever cannot be written is spilled
+
+    `write(candles)` must raise on failure. Re-writing a candle is safe
+    (candles_5m upserts on (symbol, start_time)), so replay is
+    at-least-once.
+    """
+
+    def __init__(
+        self,
+        write: Callable[[List[Candle]], None],
+        spill_path: str,
+        max_queue: int = 50_000,
+        min_batch: int = 50,
+        max_batch: int = 5_000,
+        max_wait: float = 1.0,
+        target_seconds: float = 0.5,
+        max_retries: int = 3,
+        backoff: float = 0.5,
+        max_backoff: float = 30.0,
+    ):
+        self.write = write
+        self.spill_path = spill_path
+        self.max_queue = max_queue
+        self.min_batch = min_batch
+        self.max_batch = max_batch
+        self.max_wait = max_wait
+        self.target_seconds = target_seconds
+        self.max_retries = max_retries
+        self.backoff = backoff
+        self.max_backoff = max_backoff
+
+        self.batch_size = min_batch
+        self._queue: Deque[Candle] = deque()
+        self._cond = Condition()
+        self._stopping = Event()
+        self._spill_lock = Lock()
+
+        # while the DB is down, skip retries until this monotonic time
+        self._retry_at = 0.0
+        self._delay = backoff
+
+        self.spill_pending = self._count_spilled()
+        _flushers.add(self)
+
+        self._thread = Thread(target=self._run, daemon=True)
+        self._thread.start()
+
+    def __len__(self):
+        return len(self._queue)
+
+    # -------------------------------------------------
+    def put(self, candle: Candle):
+        """
+        Called from the tick thread: never blocks on the database.
+        """
+        with self._cond:
+            if len(self._queue) < self.max_queue:
+                self._queue.append(candle)
+                if len(self._queue) >= self.batch_size:
+                    self._cond.notify()
+                return
+
+        logger.warning("⚠️ Candle flush queue full, spilling to disk")
+        self._spill([candle])
+
+    def _take(self) -> List[Candle]:
+        with self._cond:
+            self._cond.wait_for(
+                lambda: len(self._queue) >= self.batch_size or self._stopping.is_set(),
+                timeout=self.max_wait,
+            )
+            n = min(self.batch_size, len(self._queue))
+            return [self._queue.popleft() for _ in range(n)]
+
+    # -------------------------------------------------
+    def _run(self):
+        while not self._stopping.is_set():
+            batch = self._take()
+            if batch:
+                self._flush(batch)
+            if self.spill_pending and self._healthy():
+                self._replay()
+
+    def _healthy(self) -> bool:
+        return time.monotonic() >= self._retry_at
+
+    def _flush(self, batch: List[Candle]):
+        if not self._healthy():
+            self._spill(batch)
+            return
+
+        for attempt in range(self.max_retries + 1):
+            try:
+                t0 = time.perf_counter()
+                self.write(batch)
+                self._adapt(time.perf_counter() - t0)
+                self._retry_at = 0.0
+                self._delay = self.backoff
+                return
+            except Exception:
+                FLUSH_FAILURES.inc()
+                logger.exception(f"Candle flush failed (attempt {attempt + 1})")
+                if attempt < self.max_retries:
+                    FLUSH_RETRIES.inc()
+                    if self._stopping.wait(self._delay):
+                        break
+                    self._delay = min(self._delay * 2, self.max_backoff)
+
+        # DB looks down: spill and stop retrying until the backoff expires
+        self._retry_at = time.monotonic() + self._delay
+        self._spill(batch)
+
+    def _adapt(self, seconds: float):
+        if seconds > self.target_seconds:
+            self.batch_size = max(self.min_batch, self.batch_size // 2)
+        elif len(self._queue) > self.batch_size:
+            self.batch_size = min(self.max_batch, self.batch_size * 2)
+
+    # -------------------------------------------------
+    def _spill(self, candles: List[Candle]):
+        lines = b"".join(
+            orjson.dumps({k: v for k, v in c.items() if k != "closed_at"}) + b"\n"
+            for c in candles
+        )
+        with self._spill_lock:
+            os.makedirs(os.path.dirname(self.spill_path) or ".", exist_ok=True)
+            with open(self.spill_path, "ab") as f:
+                f.write(lines)
+                f.flush()
+                os.fsync(f.fileno())
+            self.spill_pending += len(candles)
+        CANDLES_SPILLED.inc(len(candles))
+
+    def _count_spilled(self) -> int:
+        n = 0
+        for path in (self.spill_path, self.spill_path + ".replay"):
+            if os.path.exists(path):
+                with open(path, "rb") as f:
+                    n += sum(1 for _ in f)
+        return n
+
+    def _load_spilled(self, path: str) -> List[Candle]:
+        candles = []
+        with open(path, "rb") as f:
+            for line in f:
+                try:
+                    c = orjson.loads(line)
+                except orjson.JSONDecodeError:
+                    continue  # torn last line after a crash
+                c["start"] = datetime.fromisoformat(c["start"])
+                candles.append(c)
+        return candles
+
+    def _replay(self):
+        """
+        Move the spill file aside and write it back in batches. On failure
+        the file stays where it is and is replayed from the start once the
+        backoff expires (chunks already written are upserted again).
+        """
+        replay_path = self.spill_path + ".replay"
+        with self._spill_lock:
+            if not os.path.exists(replay_path):
+                if not os.path.exists(self.spill_path):
+                    self.spill_pending = 0
+                    return
+                os.replace(self.spill_path, replay_path)
+
+        candles = self._load_spilled(replay_path)
+        logger.info(f"♻️ Replaying {len(candles)} spilled candles")
+
+        for i in range(0, len(candles), self.max_batch):
+            chunk = candles[i:i + self.max_batch]
+            try:
+                self.write(chunk)
+            except Exception:
+                FLUSH_FAILURES.inc()
+                logger.exception("Spill replay failed")
+                self._retry_at = time.monotonic() + self._delay
+                self._delay = min(self._delay * 2, self.max_backoff)
+                return
+            CANDLES_REPLAYED.inc(len(chunk))
+
+        os.remove(replay_path)
+        with self._spill_lock:
+            self.spill_pending = max(0, self.spill_pending - len(candles))
+
+    # -------------------------------------------------
+    def stop(self, timeout: float = 5):
+        """
+        Stop the writer and drain the queue (spilling what cannot be written).
+        """
+        self._stopping.set()
+        with self._cond:
+            self._cond.notify_all()
+        self._thread.join(timeout)
+
+        with self._cond:
+            rest = list(self._queue)
+            self._queue.clear()
+
+        for i in range(0, len(rest), self.max_batch):
+            chunk = rest[i:i + self.max_batch]
+            try:
+                if not self._healthy():
+                    raise RuntimeError("database unavailable")
+                self.write(chunk)
+            except Exception:
+                FLUSH_FAILURES.inc()
+                self._spill(rest[i:])
+                logger.warning(f"Spilled {len(rest) - i} candles on shutdown")
+                return
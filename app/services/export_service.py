@@ -0,0 +1,211 @@
+"""
+Bulk columnar export of candles_5m / daily_levels / signals.
+
+    python -m app.services.export_service candles_5m 2024-01-01 2024-12-31 \
+        -o candles.parquet [--symbols RELIANCE,TCS] [--format arrow]
+
+Rows are read through a server-side cursor (stream_results) in
+`batch_size` chunks and each chunk becomes one Arrow record batch /
+Parquet row group, so memory stays flat whatever the date range.
+Requires pyarrow (imported on first use).
+"""
+import argparse
+import sys
+from datetime import date, datetime, time, timedelta
+from typing import IO, Iterator, List, Optional, Sequence
+
+from sqlalchemy import Boolean, Date, DateTime, Float, Integer, select
+from sqlalchemy.orm import Session
+
+from app.db import models
+
+FORMATS = {
+    "parquet": "application/vnd.apache.parquet",
+    "arrow": "application/vnd.apache.arrow.stream",
+}
+
+# table -> (model, column the date range applies to)
+TABLES = {
+    "candles_5m": (models.Candle5m, "start_time"),
+    "daily_levels": (models.DailyLevel, "trade_date"),
+    "signals": (models.Signal, "time"),
+}
+
+
+def _pyarrow():
+    try:
+        import pyarrow
+        import pyarrow.ipc
+        import pyarrow.parquet
+    except ImportError:
+        raise RuntimeError("pyarrow is not installed (pip install pyarrow)")
+    return pyarrow
+
+
+def arrow_schema(model):
+    pa = _pyarrow()
+    types = (
+        (DateTime, pa.timestamp("us")),
+        (Date, pa.date32()),
+        (Boolean, pa.bool_()),
+        (Integer, pa.int64()),
+        (Float, pa.float64()),
+    )
+    fields = []
+    for col in model.__table__.columns:
+        arrow_type = next(
+            (t for sa_type, t in types if isinstance(col.type, sa_type)),
+            pa.string(),
+        )
+        fields.append(pa.field(col.name, arrow_type))
+    return pa.schema(fields)
+
+
+# -------------------------------------------------
+def iter_batches(
+    db: Session,
+    table: str,
+    start: date,
+    end: date,
+    symbols: Optional[Sequence[str]] = None,
+    batch_size: int = 50_000,
+) -> Iterator:
+    """
+    Yield pyarrow RecordBatches of at most `batch_size` rows, ordered by
+    (symbol, date column).
+    """
+    pa = _pyarrow()
+    model, date_col = TABLES[table]
+    schema = arrow_schema(model)
+    columns = [model.__table__.c[f.name] for f in schema]
+    when = model.__table__.c[date_col]
+
+    if isinstance(when.type, DateTime):
+        lo, hi = datetime.combine(start, time.min), datetime.combine(end + timedelta(days=1), time.min)
+    else:
+        lo, hi = start, end + timedelta(days=1)
+
+    stmt = (
+        select(*columns)
+        .where(when >= lo, when < hi)
+        .order_by(model.__table__.c.symbol, when)
+    )
+    if symbols:
+        stmt = stmt.where(model.__table__.c.symbol.in_(list(symbols)))
+
+    result = db.execute(
+        stmt.execution_options(stream_results=True, max_row_buffer=batch_size)
+    )
+    try:
+        for rows in result.partitions(batch_size):
+            # row tuples -> columns, straight into Arrow arrays
+            yield pa.RecordBatch.from_arrays(
+                [pa.array(col, type=f.type) for col, f in zip(zip(*rows), schema)],
+                schema=schema,
+            )
+    finally:
+        result.close()
+
+
+class _Sink:
+    """
+    Write-only file object collecting what the Arrow writer produced since
+    the last `drain()`, so the export can be streamed chunk by chunk.
+    """
+
+    def __init__(self):
+        self.chunks: List[bytes] = []
+        self.closed = False
+        self.pos = 0
+
+    def write(self, data) -> int:
+        self.chunks.append(bytes(data))
+        self.pos += len(data)
+        return len(data)
+
+    def tell(self) -> int:
+        return self.pos
+
+    def flush(self):
+        pass
+
+    def close(self):
+        self.closed = True
+
+    def writable(self) -> bool:
+        return True
+
+    def drain(self) -> bytes:
+        data = b"".join(self.chunks)
+        self.chunks = []
+        return data
+
+
+def _writer(fmt: str, sink, schema):
+    pa = _pyarrow()
+    if fmt == "parquet":
+        return pa.parquet.ParquetWriter(sink, schema, compression="zstd")
+    if fmt == "arrow":
+        return pa.ipc.new_stream(sink, schema)
+    raise ValueError(f"unknown format {fmt!r}")
+
+
+def stream_export(db_factory, table: str, start: date, end: date,
+                  symbols: Optional[Sequence[str]] = None, fmt: str = "parquet",
+                  batch_size: int = 50_000) -> Iterator[bytes]:
+    """
+    Encoded file contents, one chunk per record batch (for StreamingResponse).
+    Opens its own session so it outlives the request's dependencies.
+    """
+    schema = arrow_schema(TABLES[table][0])
+    sink = _Sink()
+    writer = _writer(fmt, sink, schema)
+
+    db = db_factory()
+    try:
+        for batch in iter_batches(db, table, start, end, symbols, batch_size):
+            writer.write_batch(batch)
+            yield sink.drain()
+        writer.close()
+        yield sink.drain()
+    finally:
+        db.close()
+
+
+def export_to_file(db: Session, table: str, start: date, end: date, out: IO,
+                   symbols: Optional[Sequence[str]] = None, fmt: str = "parquet",
+                   batch_size: int = 50_000) -> int:
+    writer = _writer(fmt, out, arrow_schema(TABLES[table][0]))
+    rows = 0
+    for batch in iter_batches(db, table, start, end, symbols, batch_size):
+        writer.write_batch(batch)
+        rows += batch.num_rows
+    writer.close()
+    return rows
+
+
+if __name__ == "__main__":
+    from app.db.session import SessionLocal
+
+    parser = argparse.ArgumentParser(prog="python -m app.services.export_service")
+    parser.add_argument("table", choices=sorted(TABLES))
+    parser.add_argument("start", type=date.fromisoformat)
+    parser.add_argument("end", type=date.fromisoformat)
+    parser.add_argument("-o", "--output", required=True)
+    parser.add_argument("--symbols", default=None, help="comma separated")
+    parser.add_argument("--format", choices=sorted(FORMATS), default="parquet")
+    parser.add_argument("--batch-size", type=int, default=50_000)
+    args = parser.parse_args()
+
+    symbols = [s.strip().upper() for s in args.symbols.split(",")] if args.symbols else None
+
+    db = SessionLocal()
+    try:
+        with open(args.output, "wb") as f:
+            n = export_to_file(db, args.table, args.start, args.end, f,
+                               symbols, args.format, args.batch_size)
+    except RuntimeError as e:
+        sys.exit(str(e))
+    finally:
+        db.close()
+    print(f"Exported {n} rows to {args.output}")
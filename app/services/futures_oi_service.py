@@ -0,0 +1,360 @@
+import json
+import time
+from datetime import date, datetime
+from threading import Event, Lock, Thread
+from typing import Callable, Dict, List, Optional, Tuple
+
+import numpy as np
+from logzero import logger
+from sqlalchemy import func
+from sqlalchemy.orm import Session
+
+from app.bus import get_bus
+from app.cache import response_cache
+from app.db import models
+from app.db.session import SessionLocal
+from app.metrics import SCANNER_EVAL_SECONDS, SIGNALS_EMITTED
+from app.services.scanner_service import signal_message
+from app.services.signal_deduplicator import SignalDeduplicator
+
+# price up / down x OI up / down
+LONG_BUILDUP = "LONG_BUILDUP"
+SHORT_BUILDUP = "SHORT_BUILDUP"
+SHORT_COVERING = "SHORT_COVERING"
+LONG_UNWINDING = "LONG_UNWINDING"
+BASIS_PREMIUM_SPIKE = "BASIS_PREMIUM_SPIKE"
+BASIS_DISCOUNT_SPIKE = "BASIS_DISCOUNT_SPIKE"
+
+BUCKET_SECONDS = 300
+
+QUADRANTS = np.array([LONG_BUILDUP, SHORT_BUILDUP, SHORT_COVERING, LONG_UNWINDING])
+
+# trade direction per rule (signal outcome tracking)
+RULE_DIRECTIONS = {
+    LONG_BUILDUP: 1,
+    SHORT_BUILDUP: -1,
+    SHORT_COVERING: 1,
+    LONG_UNWINDING: -1,
+    BASIS_PREMIUM_SPIKE: 1,
+    BASIS_DISCOUNT_SPIKE: -1,
+}
+
+
+class FuturesOIScanner:
+    """
+    Current-month stock futures, one slot per contract in numpy arrays.
+
+    Futures are Instrument rows with segment == "FUT", name == underlying
+    and expiry set. The futures CandleBuilder supplies each contract's
+    close and `oi_change`; cash candles supply the spot close.
+    `settle_seconds` after every 5m boundary a clock thread closes the
+    futures bars still open (so contracts that have not ticked since the
+    boundary are included) and classifies the whole universe once:
+
+      - price/OI quadrant (long buildup, short buildup, short covering,
+        long unwinding) when both moves clear their thresholds
+      - basis (future - spot, % of spot) against its own running EWMA:
+        a z-score beyond `basis_z` that also moved at least
+        `basis_min_move` points is a premium / discount spike
+
+    Hits are stored as Signal rows (one per symbol/rule/day, `extra`
+    holds the numbers) and published on the bus.
+    """
+
+    def __init__(self, price_threshold=0.3, oi_threshold=2.0,
+                 basis_z=3.0, basis_min_move=0.25, basis_alpha=0.1,
+                 basis_min_samples=6, settle_seconds=2.0):
+        self.price_threshold = price_threshold  # % move of the future
+        self.oi_threshold = oi_threshold        # % change in OI
+        self.basis_z = basis_z
+        self.basis_min_move = basis_min_move  # percentage points
+        self.basis_alpha = basis_alpha
+        self.basis_min_samples = basis_min_samples
+        self.settle_seconds = settle_seconds
+
+        self.index: Dict[str, int] = {}       # future token -> slot
+        self.spot_index: Dict[str, int] = {}  # cash token -> slot
+        self.symbols: List[str] = []          # underlying per slot
+        self.expiries: List[date] = []
+
+        self.close = np.zeros(0)
+        self.prev_close = np.zeros(0)
+        self.oi = np.zeros(0)
+        self.oi_change = np.zeros(0)
+        self.spot = np.zeros(0)
+        self.basis_mean = np.zeros(0)
+        self.basis_var = np.zeros(0)
+        self.basis_n = np.zeros(0, dtype=np.int64)
+
+        self.dedup = SignalDeduplicator()
+        self._lock = Lock()
+        self._bucket: Optional[datetime] = None
+        self._stop = Event()
+        self._clock: Optional[Thread] = None
+
+    # -------------------------------------------------
+    def load(self, db: Session, token_symbol_map: Dict[str, str],
+             today: Optional[date] = None):
+        """
+        Pick the nearest unexpired future of every underlying in the
+        cash universe (token -> symbol).
+        """
+        today = today or date.today()
+        underlyings = set(token_symbol_map.values())
+
+        nearest = (
+            db.query(
+                models.Instrument.name,
+                func.min(models.Instrument.expiry).label("expiry"),
+            )
+            .filter(models.Instrument.segment == "FUT")
+            .filter(models.Instrument.name.in_(underlyings))
+            .filter(models.Instrument.expiry >= today)
+            .group_by(models.Instrument.name)
+            .subquery()
+        )
+        rows = (
+            db.query(
+                models.Instrument.token,
+                models.Instrument.name,
+                models.Instrument.expiry,
+            )
+            .join(
+                nearest,
+                (models.Instrument.name == nearest.c.name)
+                & (models.Instrument.expiry == nearest.c.expiry),
+            )
+            .filter(models.Instrument.segment == "FUT")
+            .order_by(models.Instrument.name)
+            .all()
+        )
+
+        self.index = {token: i for i, (token, _, _) in enumerate(rows)}
+        self.symbols = [name for _, name, _ in rows]
+        self.expiries = [expiry for _, _, expiry in rows]
+
+        slot = {s: i for i, s in enumerate(self.symbols)}
+        self.spot_index = {
+            t: slot[s] for t, s in token_symbol_map.items() if s in slot
+        }
+
+        n = len(rows)
+        self.close = np.full(n, np.nan)
+        self.prev_close = np.full(n, np.nan)
+        self.oi = np.full(n, np.nan)
+        self.oi_change = np.full(n, np.nan)
+        self.spot = np.full(n, np.nan)
+        self.basis_mean = np.zeros(n)
+        self.basis_var = np.zeros(n)
+        self.basis_n = np.zeros(n, dtype=np.int64)
+
+        logger.info(f"📈 Futures OI scanner: {n} current-month contracts")
+
+    def subscription_tokens(self) -> List[str]:
+        return list(self.index)
+    # -------------------------------------------------
+    def on_spot_close(self, candle: dict):
+        """
+        Close listener on the cash CandleBuilder.
+        """
+        i = self.spot_index.get(candle["token"])
+        if i is not None:
+            with self._lock:
+                self.spot[i] = candle["close"]
+
+    def on_candle_close(self, candle: dict):
+        """
+        Close listener on the futures CandleBuilder.
+        """
+        i = self.index.get(candle["token"])
+        if i is None or "oi_change" not in candle:
+            return
+
+        start = candle["start"]
+        with self._lock:
+            prev = self.close[i]
+            self.prev_close[i] = prev if not np.isnan(prev) else candle["open"]
+            self.close[i] = candle["close"]
+            self.oi[i] = candle["oi"]
+            self.oi_change[i] = candle["oi_change"]
+
+            if self._bucket is None or start > self._bucket:
+                self._bucket = start
+
+    def start(self, close_buckets: Callable[[], None]):
+        """
+        Start the bucket clock. `close_buckets` closes the futures bars of
+        finished buckets (CandleBuilder.close_before) before each scan.
+        """
+        self._stop.clear()
+        self._clock = Thread(target=self._run_clock, args=(close_buckets,), daemon=True)
+        self._clock.start()
+
+    def _run_clock(self, close_buckets):
+        while True:
+            # IST is a whole number of buckets off UTC, so epoch % 300 lines up
+            wait = BUCKET_SECONDS - time.time() % BUCKET_SECONDS + self.settle_seconds
+            if self._stop.wait(wait):
+                return
+            try:
+                close_buckets()
+                self.publish()
+            except Exception:
+                logger.exception("Futures OI bucket close failed")
+
+    def stop(self, timeout=5):
+        self._stop.set()
+        if self._clock:
+            self._clock.join(timeout)
+            self._clock = None
+
+    # -------------------------------------------------
+    def basis_state(self) -> List[Tuple[str, float, float, int]]:
+        """
+        (symbol, mean, var, samples) of every contract's basis EWMA.
+        """
+        with self._lock:
+            return [
+                (self.symbols[i], float(self.basis_mean[i]),
+                 float(self.basis_var[i]), int(self.basis_n[i]))
+                for i in np.nonzero(self.basis_n)[0]
+            ]
+
+    def restore_basis(self, state: List[Tuple[str, float, float, int]]) -> int:
+        slot = {s: i for i, s in enumerate(self.symbols)}
+        restored = 0
+        with self._lock:
+            for symbol, mean, var, n in state:
+                i = slot.get(symbol)
+                if i is not None:
+                    self.basis_mean[i], self.basis_var[i], self.basis_n[i] = mean, var, n
+                    restored += 1
+        return restored
+
+    # -------------------------------------------------
+    def scan(self) -> List[dict]:
+        """
+        Classify every contract for the current bucket; consumes the OI
+        deltas so a contract without a new bar is not reported twice.
+        """
+        with self._lock:
+            if self._bucket is None:
+                return []
+            bucket = self._bucket
+            close = self.close.copy()
+            prev_close = self.prev_close.copy()
+            oi = self.oi.copy()
+            oi_change = self.oi_change.copy()
+            spot = self.spot.copy()
+            self.oi_change[:] = np.nan
+
+        hits = []
+
+        # ---- price / OI quadrants ----
+        with np.errstate(invalid="ignore", divide="ignore"):
+            price_pct = (close / prev_close - 1.0) * 100
+            oi_pct = oi_change / (oi - oi_change) * 100
+
+        moved = (
+            np.isfinite(price_pct) & np.isfinite(oi_pct)
+            & (np.abs(price_pct) >= self.price_threshold)
+            & (np.abs(oi_pct) >= self.oi_threshold)
+        )
+        quadrant = np.where(price_pct > 0, 0, 1) + np.where(oi_pct > 0, 0, 2)
+
+        for i in np.nonzero(moved)[0]:
+            hits.append({
+                "slot": int(i),
+                "rule": str(QUADRANTS[quadrant[i]]),
+                "move_pct": float(price_pct[i]),
+                "oi_change_pct": float(oi_pct[i]),
+            })
+
+        # ---- basis vs its running EWMA ----
+        with np.errstate(invalid="ignore", divide="ignore"):
+            basis = (close - spot) / spot * 100
+        fresh = np.isfinite(basis) & np.isfinite(oi_change)
+
+        # judge and fold in under the lock: restore_basis / basis_state
+        # run on other threads
+        with self._lock:
+            std = np.sqrt(self.basis_var)
+            dev = basis - self.basis_mean
+            with np.errstate(invalid="ignore", divide="ignore"):
+                z = np.where(std > 0, dev / std, 0.0)
+            spiked = (
+                fresh & (self.basis_n >= self.basis_min_samples)
+                & (np.abs(z) >= self.basis_z)
+                & (np.abs(dev) >= self.basis_min_move)
+            )
+
+            # update after testing, so a spike is judged against the past only
+            a = self.basis_alpha
+            first = fresh & (self.basis_n == 0)
+            later = fresh & (self.basis_n > 0)
+            diff = np.where(later, basis - self.basis_mean, 0.0)
+            self.basis_mean = np.where(first, basis, self.basis_mean + a * diff)
+            self.basis_var = np.where(later, (1 - a) * (self.basis_var + a * diff * diff),
+                                      self.basis_var)
+            self.basis_n += fresh
+
+        for i in np.nonzero(spiked)[0]:
+            hits.append({
+                "slot": int(i),
+                "rule": BASIS_PREMIUM_SPIKE if z[i] > 0 else BASIS_DISCOUNT_SPIKE,
+                "move_pct": float(price_pct[i]) if np.isfinite(price_pct[i]) else 0.0,
+                "basis_pct": float(basis[i]),
+                "basis_z": float(z[i]),
+            })
+
+        for h in hits:
+            i = h.pop("slot")
+            h["symbol"] = self.symbols[i]
+            h["time"] = bucket
+            h["oi"] = float(oi[i])
+            if np.isfinite(basis[i]):
+                h.setdefault("basis_pct", float(basis[i]))
+        return hits
+
+    def publish(self):
+        t0 = time.perf_counter()
+        db = SessionLocal()
+        try:
+            signals = []
+            for h in self.scan():
+                if self.dedup.is_duplicate(db, h["symbol"], h["rule"], h["time"]):
+                    continue
+                extra = {k: round(v, 4) for k, v in h.items()
+                         if k not in ("symbol", "rule", "time", "move_pct")}
+                signals.append(models.Signal(
+                    symbol=h["symbol"],
+                    time=h["time"],
+                    rule=h["rule"],
+                    candle_index=0,
+                    move_pct=round(h["move_pct"], 2),
+                    extra=json.dumps(extra),
+                ))
+            if not signals:
+                return
+
+            db.add_all(signals)
+            db.commit()
+            response_cache.invalidate("signals")
+
+            bus = get_bus()
+            for s in signals:
+                SIGNALS_EMITTED.labels(rule=s.rule).inc()
+                bus.publish(signal_message(s))
+
+            logger.warning(
+                f"🚨 FUTURES OI → {len(signals)} signals: "
+                + ", ".join(f"{s.symbol} {s.rule}" for s in signals[:10])
+            )
+
+        except Exception:
+            db.rollback()
+            logger.exception("Futures OI scan failed")
+
+        finally:
+            db.close()
+            SCANNER_EVAL_SECONDS.observe(time.perf_counter() - t0)
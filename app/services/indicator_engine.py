@@ -0,0 +1,276 @@
+import math
+from array import array
+from datetime import datetime, time, timedelta
+from threading import Lock
+from typing import Dict, Optional
+
+from sqlalchemy.orm import Session
+from logzero import logger
+
+from app.db import models
+
+
+class RollingWindow:
+    """
+    Fixed-size ring buffer with a running mean / sum of squared deviations
+    (Welford, with the evicted value swapped out in the same step).
+    push / mean / std are O(1); the running pair is recomputed from `buf`
+    each time the ring wraps so rounding error cannot accumulate.
+    """
+
+    __slots__ = ("buf", "size", "idx", "count", "_mean", "_m2")
+
+    def __init__(self, size: int):
+        self.buf = array("d", bytes(8 * size))
+        self.size = size
+        self.idx = 0
+        self.count = 0
+        self._mean = 0.0
+        self._m2 = 0.0
+
+    def push(self, x: float):
+        if self.count == self.size:
+            old = self.buf[self.idx]
+            mean = self._mean + (x - old) / self.count
+            self._m2 += (x - old) * (x - mean + old - self._mean)
+        else:
+            self.count += 1
+            mean = self._mean + (x - self._mean) / self.count
+            self._m2 += (x - self._mean) * (x - mean)
+        self._mean = mean
+
+        self.buf[self.idx] = x
+        self.idx = (self.idx + 1) % self.size
+        if self.idx == 0 and self.count == self.size:
+            self._resync()
+
+    def _resync(self):
+        n = self.count
+        m = math.fsum(self.buf) / n
+        self._mean = m
+        self._m2 = math.fsum((v - m) * (v - m) for v in self.buf)
+
+    @property
+    def full(self) -> bool:
+        return self.count == self.size
+
+    @property
+    def mean(self) -> Optional[float]:
+        return self._mean if self.count else None
+
+    @property
+    def std(self) -> Optional[float]:
+        if self.count < 2:
+            return None
+        var = self._m2 / self.count
+        return math.sqrt(var) if var > 0 else 0.0
+
+
+class TokenIndicators:
+    """
+    Streaming indicator state for one token, updated once per closed candle.
+    """
+
+    __slots__ = (
+        "ema_fast", "ema_slow", "sma", "atr", "vwap",
+        "volume_zscore", "or_high", "or_low", "last_close", "last_start",
+        "_alpha_fast", "_alpha_slow", "_atr_period", "_atr_seed",
+        "_closes", "_volumes", "_session", "_pv", "_vol", "_or_end",
+    )
+
+    def __init__(self, ema_fast: int, ema_slow: int, sma_period: int,
+                 atr_period: int, volume_window: int, or_end: time):
+        self.ema_fast = None
+        self.ema_slow = None
+        self.sma = None
+        self.atr = None
+        self.vwap = None
+        self.volume_zscore = None
+        self.or_high = None
+        self.or_low = None
+        self.last_close = None
+        self.last_start = None
+
+        self._alpha_fast = 2 / (ema_fast + 1)
+        self._alpha_slow = 2 / (ema_slow + 1)
+        self._atr_period = atr_period
+        self._atr_seed = RollingWindow(atr_period)
+        self._closes = RollingWindow(sma_period)
+        self._volumes = RollingWindow(volume_window)
+        self._session = None
+        self._pv = 0.0
+        self._vol = 0.0
+        self._or_end = or_end
+
+    # -------------------------------------------------
+    def update(self, start: datetime, o: float, h: float,
+               l: float, c: float, v: float):
+        # ---- SESSION RESET (VWAP / OPENING RANGE) ----
+        session = start.date()
+        if session != self._session:
+            self._session = session
+            self._pv = 0.0
+            self._vol = 0.0
+            self.or_high = None
+            self.or_low = None
+
+        # ---- EMA ----
+        if self.ema_fast is None:
+            self.ema_fast = self.ema_slow = c
+        else:
+            self.ema_fast += self._alpha_fast * (c - self.ema_fast)
+            self.ema_slow += self._alpha_slow * (c - self.ema_slow)
+
+        # ---- SMA ----
+        self._closes.push(c)
+        self.sma = self._closes.mean if self._closes.full else None
+
+        # ---- ATR (Wilder) ----
+        pc = self.last_close
+        tr = h - l if pc is None else max(h - l, abs(h - pc), abs(l - pc))
+        if self.atr is None:
+            self._atr_seed.push(tr)
+            if self._atr_seed.full:
+                self.atr = self._atr_seed.mean
+        else:
+            n = self._atr_period
+            self.atr = (self.atr * (n - 1) + tr) / n
+
+        # ---- VWAP ----
+        self._pv += (h + l + c) / 3 * v
+        self._vol += v
+        self.vwap = self._pv / self._vol if self._vol else c
+
+        # ---- VOLUME Z-SCORE (vs previous window) ----
+        std = self._volumes.std
+        if self._volumes.full and std:
+            self.volume_zscore = (v - self._volumes.mean) / std
+        else:
+            self.volume_zscore = None
+        self._volumes.push(v)
+
+        # ---- OPENING RANGE ----
+        if start.time() < self._or_end:
+            self.or_high = h if self.or_high is None else max(self.or_high, h)
+            self.or_low = l if self.or_low is None else min(self.or_low, l)
+
+        self.last_close = c
+        self.last_start = start
+
+    def values(self) -> dict:
+        return {
+            "ema_fast": self.ema_fast,
+            "ema_slow": self.ema_slow,
+            "sma": self.sma,
+            "atr": self.atr,
+            "vwap": self.vwap,
+            "volume_zscore": self.volume_zscore,
+            "or_high": self.or_high,
+            "or_low": self.or_low,
+            "last_close": self.last_close,
+            "last_start": self.last_start,
+        }
+
+
+class IndicatorEngine:
+    """
+    Per-token streaming indicators.
+
+    Fed by CandleBuilder close events; warm-started from candles_5m so
+    scanners can read current values without touching the DB.
+    """
+
+    def __init__(self, ema_fast=9, ema_slow=21, sma_period=20,
+                 atr_period=14, volume_window=20, opening_range_minutes=15):
+        self._params = dict(
+            ema_fast=ema_fast,
+            ema_slow=ema_slow,
+            sma_period=sma_period,
+            atr_period=atr_period,
+            volume_window=volume_window,
+            or_end=(
+                datetime(2000, 1, 1, 9, 15)
+                + timedelta(minutes=opening_range_minutes)
+            ).time(),
+        )
+        self.state: Dict[str, TokenIndicators] = {}
+        self._lock = Lock()
+
+    def _state_for(self, token: str) -> TokenIndicators:
+        st = self.state.get(token)
+        if st is None:
+            with self._lock:
+                st = self.state.setdefault(token, TokenIndicators(**self._params))
+        return st
+
+    # -------------------------------------------------
+    def on_candle_close(self, candle: dict):
+        """
+        candle = {
+            token, start, open, high, low, close, volume
+        }
+        """
+        st = self._state_for(candle["token"])
+
+        # ignore replays of bars already applied (e.g. after warm start)
+        if st.last_start is not None and candle["start"] <= st.last_start:
+            return
+
+        st.update(
+            candle["start"],
+            candle["open"],
+            candle["high"],
+            candle["low"],
+            candle["close"],
+            candle["volume"] or 0,
+        )
+
+    def get(self, token: str) -> Optional[TokenIndicators]:
+        return self.state.get(token)
+
+    # -------------------------------------------------
+    def warm_start(self, db: Session, token_symbol_map: Dict[str, str],
+                   lookback_days: int = 5):
+        """
+        Replay recent stored candles so indicators are hot at startup.
+        """
+        if not token_symbol_map:
+            return
+
+        symbol_tokens: Dict[str, list] = {}
+        for token, symbol in token_symbol_map.items():
+            symbol_tokens.setdefault(symbol, []).append(token)
+
+        since = datetime.now() - timedelta(days=lookback_days)
+
+        rows = (
+            db.query(
+                models.Candle5m.symbol,
+                models.Candle5m.start_time,
+                models.Candle5m.open,
+                models.Candle5m.high,
+                models.Candle5m.low,
+                models.Candle5m.close,
+                models.Candle5m.volume,
+            )
+            .filter(models.Candle5m.symbol.in_(list(symbol_tokens)))
+            .filter(models.Candle5m.start_time >= since)
+            .order_by(models.Candle5m.symbol, models.Candle5m.start_time)
+            .yield_per(5000)
+        )
+
+        n = 0
+        for symbol, start, o, h, l, c, v in rows:
+            for token in symbol_tokens[symbol]:
+                self.on_candle_close({
+                    "token": token,
+                    "start": start,
+                    "open": o,
+                    "high": h,
+                    "low": l,
+                    "close": c,
+                    "volume": v,
+                })
+            n += 1
+
+        logger.info(f"📈 Indicators warm-started from {n} stored candles")
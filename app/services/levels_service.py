@@ -6,6 +6,24 @@ from app.providers.smartapi_provider import SmartAPIProvider
 class LevelsService:
     def __init__(self, provider: SmartAPIProvider):
         self.provider = provider
+        self._cache = {}  # (symbol, date) -> DailyLevel
+
+    def get_levels_for_today(self, db: Session, symbol: str, date_):
+        """
+        Stored levels only (no network); hits are cached in memory.
+        """
+        key = (symbol, date_)
+        lvl = self._cache.get(key)
+        if lvl is None:
+            lvl = (
+                db.query(models.DailyLevel)
+                .filter_by(symbol=symbol, trade_date=date_)
+                .first()
+            )
+            if lvl is not None:
+                db.expunge(lvl)
+                self._cache[key] = lvl
+        return lvl
 
     def ensure_daily_levels(self, db: Session, symbol: str, token: str, date_):
         existing = (
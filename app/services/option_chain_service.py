@@ -0,0 +1,436 @@
+import math
+from datetime import date, datetime, time
+from threading import Lock
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+from sqlalchemy.orm import Session
+from logzero import logger
+
+from app.db import models
+
+
+EXPIRY_CLOSE = time(15, 30)
+YEAR_SECONDS = 365.0 * 24 * 3600
+# a cached chain is reused while spot stays within the same 0.05% bucket
+SPOT_BUCKET = 0.0005
+
+
+# -------------------------------------------------
+# Vectorized Black-Scholes
+# -------------------------------------------------
+def _erf(x: np.ndarray) -> np.ndarray:
+    """
+    Abramowitz & Stegun 7.1.26 (|err| < 1.5e-7), vectorized.
+    """
+    sign = np.sign(x)
+    x = np.abs(x)
+    t = 1.0 / (1.0 + 0.3275911 * x)
+    y = 1.0 - (((((1.061405429 * t - 1.453152027) * t) + 1.421413741) * t
+                 - 0.284496736) * t + 0.254829592) * t * np.exp(-x * x)
+    return sign * y
+
+
+def norm_cdf(x: np.ndarray) -> np.ndarray:
+    return 0.5 * (1.0 + _erf(x / math.sqrt(2.0)))
+
+
+def norm_pdf(x: np.ndarray) -> np.ndarray:
+    return np.exp(-0.5 * x * x) / math.sqrt(2.0 * math.pi)
+
+
+def _d1_d2(S, K, T, r, sigma):
+    vol_t = sigma * np.sqrt(T)
+    d1 = (np.log(S / K) + (r + 0.5 * sigma * sigma) * T) / vol_t
+    return d1, d1 - vol_t
+
+
+def bs_price(S, K, T, r, sigma, is_call):
+    d1, d2 = _d1_d2(S, K, T, r, sigma)
+    disc = K * np.exp(-r * T)
+    call = S * norm_cdf(d1) - disc * norm_cdf(d2)
+    put = disc * norm_cdf(-d2) - S * norm_cdf(-d1)
+    return np.where(is_call, call, put)
+
+
+def bs_vega(S, K, T, r, sigma):
+    d1, _ = _d1_d2(S, K, T, r, sigma)
+    return S * norm_pdf(d1) * np.sqrt(T)
+
+
+def implied_vol(price, S, K, T, r, is_call,
+                lo=1e-4, hi=5.0, tol=1e-6, max_iter=50):
+    """
+    Safeguarded Newton on a whole chain at once.
+
+    Each element keeps a [lo, hi] bracket; a Newton step that leaves the
+    bracket (or has vanishing vega) falls back to bisection. Prices
+    outside no-arbitrage bounds give NaN.
+    """
+    price = np.asarray(price, dtype=float)
+    K = np.asarray(K, dtype=float)
+    is_call = np.asarray(is_call, dtype=bool)
+
+    disc = K * np.exp(-r * T)
+    intrinsic = np.where(is_call, np.maximum(S - disc, 0.0),
+                         np.maximum(disc - S, 0.0))
+    upper = np.where(is_call, S, disc)
+    valid = np.isfinite(price) & (price > intrinsic) & (price < upper)
+
+    lo_b = np.full(price.shape, lo)
+    hi_b = np.full(price.shape, hi)
+    # Brenner-Subrahmanyam initial guess
+    sigma = np.clip(math.sqrt(2 * math.pi / T) * price / S, lo * 10, hi / 2)
+
+    active = valid.copy()
+    for _ in range(max_iter):
+        if not active.any():
+            break
+
+        idx = np.nonzero(active)[0]
+        s = sigma[idx]
+        diff = bs_price(S, K[idx], T, r, s, is_call[idx]) - price[idx]
+
+        done = np.abs(diff) < tol
+        active[idx[done]] = False
+
+        # tighten bracket: price is increasing in sigma
+        over = diff > 0
+        hi_b[idx] = np.where(over, s, hi_b[idx])
+        lo_b[idx] = np.where(over, lo_b[idx], s)
+
+        vega = bs_vega(S, K[idx], T, r, s)
+        with np.errstate(divide="ignore", invalid="ignore"):
+            newton = s - diff / vega
+        inside = (vega > 1e-8) & (newton > lo_b[idx]) & (newton < hi_b[idx])
+        sigma[idx] = np.where(
+            done, s, np.where(inside, newton, 0.5 * (lo_b[idx] + hi_b[idx]))
+        )
+
+    return np.where(valid, sigma, np.nan)
+
+
+def greeks(S, K, T, r, sigma, is_call) -> Dict[str, np.ndarray]:
+    d1, d2 = _d1_d2(S, K, T, r, sigma)
+    pdf = norm_pdf(d1)
+    sqrt_t = np.sqrt(T)
+    disc = K * np.exp(-r * T)
+
+    delta = np.where(is_call, norm_cdf(d1), norm_cdf(d1) - 1.0)
+    gamma = pdf / (S * sigma * sqrt_t)
+    vega = S * pdf * sqrt_t / 100                      # per 1 vol point
+    decay = -S * pdf * sigma / (2 * sqrt_t)
+    theta = np.where(
+        is_call,
+        decay - r * disc * norm_cdf(d2),
+        decay + r * disc * norm_cdf(-d2),
+    ) / 365                                            # per calendar day
+
+    return {"delta": delta, "gamma": gamma, "vega": vega, "theta": theta}
+
+
+def max_pain(strikes: np.ndarray, call_oi: np.ndarray, put_oi: np.ndarray) -> float:
+    """
+    Strike at which total option-writer payout is smallest.
+    """
+    settle = strikes[:, None]
+    payout = (
+        np.maximum(settle - strikes[None, :], 0.0) * call_oi[None, :]
+        + np.maximum(strikes[None, :] - settle, 0.0) * put_oi[None, :]
+    ).sum(axis=1)
+    return float(strikes[int(np.argmin(payout))])
+
+
+def _json_list(arr: np.ndarray) -> list:
+    return [float(x) if math.isfinite(x) else None for x in arr.tolist()]
+
+
+def spot_bucket(spot: Optional[float]) -> Optional[int]:
+    """
+    Cache key for a spot price: equal within a SPOT_BUCKET relative band.
+    """
+    if not spot or spot <= 0:
+        return None
+    return int(round(math.log(spot) / SPOT_BUCKET))
+
+
+# -------------------------------------------------
+# Chain state
+# -------------------------------------------------
+class OptionChain:
+    """
+    One (underlying, expiry) chain held column-wise in NumPy arrays.
+    Rows are strikes; calls and puts live side by side.
+
+    Quotes arrive on the tick thread and snapshots are read by API
+    requests: both go through `_lock`, but the compute itself runs on a
+    copy outside it, and `dirty` is cleared before computing so a quote
+    landing meanwhile triggers the next recompute.
+    """
+
+    def __init__(self, underlying: str, expiry: date, strikes: np.ndarray,
+                 call_tokens: List[Optional[str]], put_tokens: List[Optional[str]]):
+        self.underlying = underlying
+        self.expiry = expiry
+        self.strikes = strikes
+
+        n = len(strikes)
+        self.call_ltp = np.full(n, np.nan)
+        self.put_ltp = np.full(n, np.nan)
+        self.call_oi = np.zeros(n)
+        self.put_oi = np.zeros(n)
+
+        self.call_tokens = call_tokens
+        self.put_tokens = put_tokens
+
+        self.dirty = True
+        self._snapshot: Optional[dict] = None
+        self._snapshot_key: Optional[int] = None
+        self._lock = Lock()
+
+    def tokens(self) -> List[str]:
+        return [t for t in self.call_tokens + self.put_tokens if t]
+
+    def set_quote(self, is_call: bool, i: int, ltp: float, oi: Optional[float]):
+        with self._lock:
+            if is_call:
+                self.call_ltp[i] = ltp
+                if oi is not None:
+                    self.call_oi[i] = oi
+            else:
+                self.put_ltp[i] = ltp
+                if oi is not None:
+                    self.put_oi[i] = oi
+            self.dirty = True
+
+    def quotes(self) -> Tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray]:
+        """
+        Consistent copy of (call_ltp, put_ltp, call_oi, put_oi).
+        """
+        with self._lock:
+            return (self.call_ltp.copy(), self.put_ltp.copy(),
+                    self.call_oi.copy(), self.put_oi.copy())
+
+    # -------------------------------------------------
+    def compute(self, spot: Optional[float], r: float,
+                now: Optional[datetime] = None, quotes=None) -> dict:
+        """
+        IV, Greeks, PCR and max-pain for the whole chain in one pass
+        (over `quotes`, default a fresh copy of the live ones).
+        """
+        call_ltp, put_ltp, call_oi, put_oi = quotes or self.quotes()
+        now = now or datetime.now()
+        expiry_at = datetime.combine(self.expiry, EXPIRY_CLOSE)
+        T = max((expiry_at - now).total_seconds(), 60.0) / YEAR_SECONDS
+
+        K = self.strikes
+        n = len(K)
+
+        call_oi_total = float(call_oi.sum())
+        pcr = float(put_oi.sum()) / call_oi_total if call_oi_total else None
+
+        out = {
+            "symbol": self.underlying,
+            "expiry": self.expiry.isoformat(),
+            "spot": spot,
+            "time": now.isoformat(),
+            "pcr": pcr,
+            "max_pain": max_pain(K, call_oi, put_oi) if n else None,
+            "strikes": K.tolist(),
+            "call": {"ltp": _json_list(call_ltp), "oi": call_oi.tolist()},
+            "put": {"ltp": _json_list(put_ltp), "oi": put_oi.tolist()},
+        }
+
+        if not spot or not n:
+            return out
+
+        # stack calls and puts to price both sides in one batched call
+        KK = np.concatenate([K, K])
+        prices = np.concatenate([call_ltp, put_ltp])
+        is_call = np.concatenate([np.ones(n, bool), np.zeros(n, bool)])
+
+        iv = implied_vol(prices, spot, KK, T, r, is_call)
+        g = greeks(spot, KK, T, r, np.where(np.isfinite(iv), iv, np.nan), is_call)
+
+        for side, sl in (("call", slice(0, n)), ("put", slice(n, 2 * n))):
+            out[side]["iv"] = _json_list(iv[sl] * 100)
+            for name, values in g.items():
+                out[side][name] = _json_list(values[sl])
+
+        return out
+
+    def snapshot(self, spot: Optional[float], r: float) -> dict:
+        key = spot_bucket(spot)
+        with self._lock:
+            if not self.dirty and self._snapshot is not None and self._snapshot_key == key:
+                return self._snapshot
+            self.dirty = False
+            quotes = (self.call_ltp.copy(), self.put_ltp.copy(),
+                      self.call_oi.copy(), self.put_oi.copy())
+
+        snap = self.compute(spot, r, quotes=quotes)
+        with self._lock:
+            self._snapshot, self._snapshot_key = snap, key
+        return snap
+
+
+class OptionChainService:
+    """
+    Keeps live option chains for the universe underlyings.
+
+    Options are Instrument rows with segment == "OPT", name == underlying
+    and expiry / strike / option_type populated. Only strikes within
+    `strikes_each_side` of ATM on the nearest `expiries` are tracked.
+    An underlying without a stored close starts centred on its middle
+    strike and is re-centred on the first live spot; `on_resubscribe`
+    (added, removed tokens) then lets the feed adjust its subscription.
+    """
+
+    def __init__(self, strikes_each_side=10, expiries=1, risk_free_rate=0.065):
+        self.strikes_each_side = strikes_each_side
+        self.expiries = expiries
+        self.r = risk_free_rate
+
+        self.chains: Dict[str, List[OptionChain]] = {}
+        self.spot: Dict[str, float] = {}
+        # option token -> (chain, is_call, row)
+        self._routes: Dict[str, Tuple[OptionChain, bool, int]] = {}
+        # (symbol, expiry) -> (all strikes, {strike: CE token}, {strike: PE token})
+        self._contracts: Dict[Tuple[str, date], Tuple[np.ndarray, dict, dict]] = {}
+        self._uncentred: set = set()
+        self._lock = Lock()
+        self.on_resubscribe = None
+
+    # -------------------------------------------------
+    def load(self, db: Session, underlyings: List[str], today: Optional[date] = None):
+        today = today or date.today()
+
+        for symbol in underlyings:
+            if symbol not in self.spot:
+                last = (
+                    db.query(models.Candle5m.close)
+                    .filter(models.Candle5m.symbol == symbol)
+                    .order_by(models.Candle5m.start_time.desc())
+                    .first()
+                )
+                if last:
+                    self.spot[symbol] = last[0]
+
+            expiries = [
+                e[0] for e in (
+                    db.query(models.Instrument.expiry)
+                    .filter(models.Instrument.segment == "OPT")
+                    .filter(models.Instrument.name == symbol)
+                    .filter(models.Instrument.expiry >= today)
+                    .distinct()
+                    .order_by(models.Instrument.expiry)
+                    .limit(self.expiries)
+                    .all()
+                )
+            ]
+
+            chains = []
+            for expiry in expiries:
+                if self._load_contracts(db, symbol, expiry):
+                    chains.append(self._window(symbol, expiry))
+
+            self.chains[symbol] = chains
+            if chains and symbol not in self.spot:
+                self._uncentred.add(symbol)
+
+        logger.info(
+            f"🧮 Option chains loaded for {len(self.chains)} underlyings "
+            f"({len(self._routes)} contracts)"
+        )
+
+    def _load_contracts(self, db: Session, symbol: str, expiry: date) -> bool:
+        rows = (
+            db.query(
+                models.Instrument.token,
+                models.Instrument.strike,
+                models.Instrument.option_type,
+            )
+            .filter(models.Instrument.segment == "OPT")
+            .filter(models.Instrument.name == symbol)
+            .filter(models.Instrument.expiry == expiry)
+            .all()
+        )
+        if not rows:
+            return False
+
+        calls = {float(k): t for t, k, o in rows if o == "CE"}
+        puts = {float(k): t for t, k, o in rows if o == "PE"}
+        all_strikes = np.unique(np.array([r.strike for r in rows], dtype=float))
+        self._contracts[(symbol, expiry)] = (all_strikes, calls, puts)
+        return True
+
+    def _window(self, symbol: str, expiry: date) -> OptionChain:
+        """
+        Chain over the strikes around ATM (middle strike while spot is unknown).
+        """
+        all_strikes, call_of, put_of = self._contracts[(symbol, expiry)]
+
+        spot = self.spot.get(symbol)
+        atm = (
+            int(np.argmin(np.abs(all_strikes - spot)))
+            if spot else len(all_strikes) // 2
+        )
+        lo = max(atm - self.strikes_each_side, 0)
+        strikes = all_strikes[lo: atm + self.strikes_each_side + 1]
+
+        calls = [call_of.get(k) for k in strikes.tolist()]
+        puts = [put_of.get(k) for k in strikes.tolist()]
+
+        chain = OptionChain(symbol, expiry, strikes, calls, puts)
+        for i, t in enumerate(calls):
+            if t:
+                self._routes[t] = (chain, True, i)
+        for i, t in enumerate(puts):
+            if t:
+                self._routes[t] = (chain, False, i)
+
+        return chain
+
+    # -------------------------------------------------
+    def subscription_tokens(self) -> List[str]:
+        return list(self._routes)
+
+    def on_tick(self, token: str, ltp: float, oi: Optional[float] = None) -> bool:
+        route = self._routes.get(token)
+        if not route:
+            return False
+        chain, is_call, i = route
+        chain.set_quote(is_call, i, ltp, oi)
+        return True
+
+    def update_spot(self, symbol: str, price: float):
+        if symbol not in self.chains:
+            return
+        with self._lock:
+            self.spot[symbol] = price
+            if symbol not in self._uncentred:
+                return
+            self._uncentred.discard(symbol)
+            old = {t for c in self.chains[symbol] for t in c.tokens()}
+            for t in old:
+                self._routes.pop(t, None)
+            chains = [self._window(symbol, c.expiry) for c in self.chains[symbol]]
+            self.chains[symbol] = chains
+            new = {t for c in chains for t in c.tokens()}
+
+        logger.info(f"🧮 {symbol} option chain re-centred on spot {price}")
+        if self.on_resubscribe:
+            self.on_resubscribe(sorted(new - old), sorted(old - new))
+
+    def snapshot(self, symbol: str, expiry: Optional[date] = None) -> Optional[dict]:
+        chains = self.chains.get(symbol)
+        if not chains:
+            return None
+
+        chain = chains[0]
+        if expiry:
+            chain = next((c for c in chains if c.expiry == expiry), None)
+            if chain is None:
+                return None
+
+        return chain.snapshot(self.spot.get(symbol), self.r)
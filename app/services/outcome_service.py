@@ -0,0 +1,191 @@
+import asyncio
+from datetime import datetime, time, timedelta
+from typing import Optional
+
+from sqlalchemy import text
+from sqlalchemy.orm import Session
+from logzero import logger
+
+from app.cache import response_cache
+from app.db import models
+from app.services.futures_oi_service import RULE_DIRECTIONS
+from app.services.strategy_engine import STRATEGIES
+
+BAR = timedelta(minutes=5)
+LAST_BAR = time(15, 25)
+
+# One statement per bucket: aggregate the bars that arrived since each open
+# outcome's last_bar_time and fold them into the running values.
+UPDATE_SQL = text("""
+    UPDATE signal_outcomes SET
+        mfe_pct = CASE WHEN signal_outcomes.mfe_pct IS NULL OR a.mfe > signal_outcomes.mfe_pct
+                       THEN a.mfe ELSE signal_outcomes.mfe_pct END,
+        mae_pct = CASE WHEN signal_outcomes.mae_pct IS NULL OR a.mae < signal_outcomes.mae_pct
+                       THEN a.mae ELSE signal_outcomes.mae_pct END,
+        ret_15m = COALESCE(signal_outcomes.ret_15m, a.r15),
+        ret_30m = COALESCE(signal_outcomes.ret_30m, a.r30),
+        ret_60m = COALESCE(signal_outcomes.ret_60m, a.r60),
+        hit_15m = COALESCE(signal_outcomes.hit_15m, a.r15 > 0),
+        hit_30m = COALESCE(signal_outcomes.hit_30m, a.r30 > 0),
+        hit_60m = COALESCE(signal_outcomes.hit_60m, a.r60 > 0),
+        bars = signal_outcomes.bars + a.n,
+        last_bar_time = a.last_bar,
+        closed = a.last_bar >= signal_outcomes.horizon_end
+    FROM (
+        SELECT o.signal_id,
+               COUNT(*) AS n,
+               MAX(c.start_time) AS last_bar,
+               MAX(o.direction * (CASE WHEN o.direction > 0 THEN c.high ELSE c.low END
+                                  - o.entry)) / MAX(o.entry) * 100 AS mfe,
+               MIN(o.direction * (CASE WHEN o.direction > 0 THEN c.low ELSE c.high END
+                                  - o.entry)) / MAX(o.entry) * 100 AS mae,
+               MAX(CASE WHEN c.start_time = o.t_15m
+                        THEN o.direction * (c.close - o.entry) / o.entry * 100 END) AS r15,
+               MAX(CASE WHEN c.start_time = o.t_30m
+                        THEN o.direction * (c.close - o.entry) / o.entry * 100 END) AS r30,
+               MAX(CASE WHEN c.start_time = o.t_60m
+                        THEN o.direction * (c.close - o.entry) / o.entry * 100 END) AS r60
+        FROM signal_outcomes o
+        JOIN candles_5m c
+          ON c.symbol = o.symbol
+         AND c.start_time > o.last_bar_time
+         AND c.start_time <= o.horizon_end
+        WHERE NOT o.closed
+        GROUP BY o.signal_id
+    ) a
+    WHERE signal_outcomes.signal_id = a.signal_id
+""")
+
+ROLLUP_SQL = text("""
+    INSERT INTO signal_stats (
+        rule, signals, closed,
+        avg_ret_15m, avg_ret_30m, avg_ret_60m,
+        hit_rate_15m, hit_rate_30m, hit_rate_60m,
+        avg_mfe_pct, avg_mae_pct, updated_at
+    )
+    SELECT rule,
+           COUNT(*),
+           SUM(CASE WHEN closed THEN 1 ELSE 0 END),
+           AVG(ret_15m), AVG(ret_30m), AVG(ret_60m),
+           AVG(CASE WHEN hit_15m THEN 1.0 WHEN NOT hit_15m THEN 0.0 END),
+           AVG(CASE WHEN hit_30m THEN 1.0 WHEN NOT hit_30m THEN 0.0 END),
+           AVG(CASE WHEN hit_60m THEN 1.0 WHEN NOT hit_60m THEN 0.0 END),
+           AVG(mfe_pct), AVG(mae_pct), :now
+    FROM signal_outcomes
+    GROUP BY rule
+""")
+
+
+class OutcomeService:
+    """
+    Tracks what happened after each signal.
+
+    Per bucket:
+      1. new signals whose bar is stored get an outcome row
+         (entry = signal bar close, horizon bar times precomputed)
+      2. one UPDATE joins the new candles_5m bars to every open outcome
+         and folds them into forward returns (15/30/60m), MFE / MAE and
+         hit flags; outcomes close at the 60m bar (or 15:25: a horizon
+         the session cuts short leaves its return NULL)
+      3. signal_stats is rebuilt per rule for /signals/stats
+    """
+
+    def __init__(self, settle_seconds=20, stale_after=timedelta(days=1)):
+        self.settle_seconds = settle_seconds
+        self.stale_after = stale_after
+
+    # -------------------------------------------------
+    def open_new(self, db: Session, now: Optional[datetime] = None) -> int:
+        """
+        Outcome rows for recent signals whose bar is stored. Older signals
+        whose bar never arrived are not rescanned every bucket.
+        """
+        now = now or datetime.now()
+        rows = (
+            db.query(models.Signal, models.Candle5m.close)
+            .join(
+                models.Candle5m,
+                (models.Candle5m.symbol == models.Signal.symbol)
+                & (models.Candle5m.start_time == models.Signal.time),
+            )
+            .outerjoin(
+                models.SignalOutcome,
+                models.SignalOutcome.signal_id == models.Signal.id,
+            )
+            .filter(models.SignalOutcome.signal_id.is_(None))
+            .filter(models.Signal.time >= now - self.stale_after)
+            .all()
+        )
+
+        for sig, entry in rows:
+            strategy = STRATEGIES.get(sig.rule)
+            session_end = datetime.combine(sig.time.date(), LAST_BAR)
+            db.add(models.SignalOutcome(
+                signal_id=sig.id,
+                symbol=sig.symbol,
+                rule=sig.rule,
+                signal_time=sig.time,
+                direction=(
+                    strategy.side if strategy
+                    else RULE_DIRECTIONS.get(sig.rule, 1)
+                ),
+                entry=entry,
+                t_15m=sig.time + 3 * BAR,
+                t_30m=sig.time + 6 * BAR,
+                t_60m=sig.time + 12 * BAR,
+                horizon_end=min(sig.time + 12 * BAR, session_end),
+                bars=0,
+                last_bar_time=sig.time,
+                closed=False,
+            ))
+        return len(rows)
+
+    def update(self, db: Session, now: Optional[datetime] = None) -> int:
+        now = now or datetime.now()
+        opened = self.open_new(db, now)
+        db.flush()
+
+        updated = db.execute(UPDATE_SQL).rowcount
+
+        # bars that never arrived (halt, feed gap): stop waiting
+        db.query(models.SignalOutcome).filter(
+            models.SignalOutcome.closed.is_(False),
+            models.SignalOutcome.horizon_end < now - self.stale_after,
+        ).update({"closed": True}, synchronize_session=False)
+
+        db.query(models.SignalStats).delete()
+        db.execute(ROLLUP_SQL, {"now": now})
+        db.commit()
+
+        response_cache.invalidate("signal_stats")
+        if opened or updated:
+            logger.info(f"🎯 Outcomes: {opened} opened, {updated} updated")
+        return updated
+
+    # -------------------------------------------------
+    async def run_loop(self, db_factory):
+        """
+        Runs `settle_seconds` after every 5m boundary so the bucket's
+        candles have been flushed.
+        """
+        logger.info("🎯 Outcome tracker started")
+        while True:
+            now = datetime.now()
+            boundary = now.replace(
+                minute=now.minute - now.minute % 5, second=0, microsecond=0
+            ) + BAR
+            await asyncio.sleep(
+                (boundary - now).total_seconds() + self.settle_seconds
+            )
+
+            if not time(9, 15) <= datetime.now().time() <= time(15, 45):
+                continue
+
+            db = db_factory()
+            try:
+                await asyncio.to_thread(self.update, db)
+            except Exception:
+                db.rollback()
+                logger.exception("Outcome update failed")
+            finally:
+                db.close()
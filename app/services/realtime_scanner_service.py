@@ -1,9 +1,15 @@
+import time
 from datetime import date
 from logzero import logger
 
 from app.db.session import SessionLocal
 from app.db import models
 from app.services.signal_deduplicator import SignalDeduplicator
+from app.services.strategy_engine import StrategyEngine, StrategyContext
+from app.cache import response_cache
+from app.bus import get_bus
+from app.services.scanner_service import signal_message
+from app.metrics import SCANNER_EVAL_SECONDS, CLOSE_TO_SIGNAL_SECONDS, SIGNALS_EMITTED
 
 
 class RealTimeScannerService:
@@ -12,10 +18,16 @@ class RealTimeScannerService:
     Triggered by CandleBuilder.on_candle_close
     """
 
-    def __init__(self, levels_service):
+    # OR_* read the live IndicatorEngine state passed in as `indicators`
+    RULES = ("PDH_BREAKOUT", "PDL_BREAKDOWN", "OR_BREAKOUT", "OR_BREAKDOWN")
+
+    def __init__(self, levels_service, threshold=3.0, rules=RULES,
+                 indicators=None):
         self.levels = levels_service
+        self.indicators = indicators
         self.dedup = SignalDeduplicator()
         self.token_symbol_cache = {}
+        self.engine = StrategyEngine(rules, params={"threshold": threshold})
 
     # -------------------------------------------------
     def on_candle_close(self, candle: dict):
@@ -24,6 +36,7 @@ class RealTimeScannerService:
             token, start, open, high, low, close, volume
         }
         """
+        t0 = time.perf_counter()
         db = SessionLocal()
         try:
             token = candle["token"]
@@ -37,7 +50,8 @@ class RealTimeScannerService:
             if not lvl:
                 return
 
-            signal = self.check_signal(symbol, candle, lvl)
+            ind = self.indicators.get(token) if self.indicators else None
+            signal = self.check_signal(symbol, candle, lvl, ind)
             if not signal:
                 return
 
@@ -47,6 +61,14 @@ class RealTimeScannerService:
 
             db.add(signal)
             db.commit()
+            response_cache.invalidate("signals")
+
+            CLOSE_TO_SIGNAL_SECONDS.observe(
+                time.perf_counter() - candle.get("closed_at", t0)
+            )
+            SIGNALS_EMITTED.labels(rule=signal.rule).inc()
+
+            get_bus().publish(signal_message(signal))
 
             logger.warning(
                 f"🚨 LIVE SIGNAL → {symbol} | {signal.rule} | {signal.move_pct:.2f}%"
@@ -58,6 +80,7 @@ class RealTimeScannerService:
 
         finally:
             db.close()
+            SCANNER_EVAL_SECONDS.observe(time.perf_counter() - t0)
 
     # -------------------------------------------------
     def _get_symbol(self, db, token: str):
@@ -74,32 +97,10 @@ class RealTimeScannerService:
         return self.token_symbol_cache[token]
 
     # -------------------------------------------------
-    def check_signal(self, symbol, candle, lvl):
-        o, c = candle["open"], candle["close"]
-        move = (c - o) / o * 100
-
-        pdh, pdl = lvl.pdh, lvl.pdl
-        is_green = c > o
-        is_red = c < o
-
-        # 🔥 PDH Breakout
-        if is_green and move > 3 and c > pdh:
-            return models.Signal(
-                symbol=symbol,
-                time=candle["start"],
-                rule="PDH_BREAKOUT",
-                candle_index=0,
-                move_pct=move,
-            )
-
-        # 🔥 PDL Breakdown
-        if is_red and move < -3 and c < pdl:
-            return models.Signal(
-                symbol=symbol,
-                time=candle["start"],
-                rule="PDL_BREAKDOWN",
-                candle_index=0,
-                move_pct=move,
-            )
-
-        return None
+    def check_signal(self, symbol, candle, lvl, indicators=None):
+        ctx = StrategyContext(
+            symbol, candle["start"], candle,
+            levels=lvl, indicators=indicators,
+        )
+        signals = self.engine.evaluate(ctx)
+        return signals[0] if signals else None
@@ -0,0 +1,125 @@
+import asyncio
+from datetime import date, datetime, time, timedelta
+from typing import Optional
+
+from sqlalchemy import func, text
+from sqlalchemy.orm import Session
+from logzero import logger
+
+from app.db import models
+from app.db.partitions import drop_candle_partitions_before, ensure_candle_partitions
+
+COMPACT_SQL = text("""
+    INSERT INTO candles_1d (symbol, trade_date, open, high, low, close, volume)
+    SELECT a.symbol, a.trade_date, o.open, a.high, a.low, c.close, a.volume
+    FROM (
+        SELECT symbol,
+               DATE(start_time) AS trade_date,
+               MIN(start_time) AS first_ts,
+               MAX(start_time) AS last_ts,
+               MAX(high) AS high,
+               MIN(low) AS low,
+               SUM(volume) AS volume
+        FROM candles_5m
+        WHERE start_time >= :since AND start_time < :until
+        GROUP BY symbol, DATE(start_time)
+    ) a
+    JOIN candles_5m o ON o.symbol = a.symbol AND o.start_time = a.first_ts
+    JOIN candles_5m c ON c.symbol = a.symbol AND c.start_time = a.last_ts
+    WHERE 1 = 1
+    ON CONFLICT (symbol, trade_date) DO NOTHING
+""")
+
+
+class RetentionService:
+    """
+    Rolls completed days of 5m candles into candles_1d, then drops 5m data
+    (whole monthly partitions on Postgres) and signals past retention.
+    """
+
+    def __init__(self, keep_5m_days=90, keep_signal_days=365,
+                 run_at=time(16, 0)):
+        self.keep_5m_days = keep_5m_days
+        self.keep_signal_days = keep_signal_days
+        self.run_at = run_at
+
+    # -------------------------------------------------
+    def compact(self, db: Session, until: date) -> int:
+        """
+        Aggregate every not-yet-compacted day before `until`.
+        """
+        last = db.query(func.max(models.CandleDaily.trade_date)).scalar()
+        if last is None:
+            first = db.query(func.min(models.Candle5m.start_time)).scalar()
+            if first is None:
+                return 0
+            since = first.date()
+        else:
+            since = last + timedelta(days=1)
+
+        if since >= until:
+            return 0
+
+        result = db.execute(COMPACT_SQL, {
+            "since": datetime.combine(since, time.min),
+            "until": datetime.combine(until, time.min),
+        })
+        db.commit()
+        return result.rowcount
+
+    def purge(self, db: Session, today: date) -> None:
+        cutoff_5m = today - timedelta(days=self.keep_5m_days)
+        cutoff_signals = today - timedelta(days=self.keep_signal_days)
+
+        # whole months first (cheap), then the partial month
+        drop_candle_partitions_before(db.connection(), cutoff_5m)
+
+        candles = (
+            db.query(models.Candle5m)
+            .filter(models.Candle5m.start_time < cutoff_5m)
+            .delete(synchronize_session=False)
+        )
+        signals = (
+            db.query(models.Signal)
+            .filter(models.Signal.time < cutoff_signals)
+            .delete(synchronize_session=False)
+        )
+        db.query(models.SignalOutcome).filter(
+            models.SignalOutcome.signal_time < cutoff_signals
+        ).delete(synchronize_session=False)
+        db.commit()
+
+        logger.info(
+            f"🧹 Retention: {candles} 5m candles < {cutoff_5m}, "
+            f"{signals} signals < {cutoff_signals} removed"
+        )
+
+    def run_once(self, db: Session, today: Optional[date] = None) -> None:
+        today = today or date.today()
+
+        # never drop 5m bars that have not been compacted yet
+        compacted = self.compact(db, today)
+        logger.info(f"📦 Compacted {compacted} daily bars")
+
+        self.purge(db, today)
+        ensure_candle_partitions(db.get_bind())
+
+    # -------------------------------------------------
+    async def run_daily_loop(self, db_factory):
+        logger.info("🗄️ Retention loop started")
+        last_run = None
+        while True:
+            now = datetime.now()
+
+            if now.time() >= self.run_at and last_run != now.date():
+                db = db_factory()
+                try:
+                    await asyncio.to_thread(self.run_once, db, now.date())
+                    last_run = now.date()
+                except Exception:
+                    db.rollback()
+                    logger.exception("Retention job failed")
+                finally:
+                    db.close()
+
+            await asyncio.sleep(300)
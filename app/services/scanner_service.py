@@ -5,7 +5,22 @@ from logzero import logger
 
 from app.db import models
 from app.services.universe_service import UniverseService
-from app.routers.ws import manager
+from app.services.strategy_engine import StrategyEngine, StrategyContext
+from app.cache import response_cache
+from app.bus import get_bus
+from app.metrics import SIGNALS_EMITTED
+
+
+def signal_message(s: models.Signal) -> dict:
+    return {
+        "type": "signal",
+        "payload": {
+            "symbol": s.symbol,
+            "rule": s.rule,
+            "time": s.time.isoformat(),
+            "move_pct": s.move_pct
+        }
+    }
 
 
 class ScannerService:
@@ -13,9 +28,10 @@ class ScannerService:
                  threshold=3.0, proximity=0.3):
         self.provider = provider
         self.levels = levels_service
-        self.threshold = threshold
-        self.proximity = proximity / 100
         self.universe = UniverseService()
+        self.engine = StrategyEngine(
+            params={"threshold": threshold, "proximity": proximity}
+        )
         self._latest = []
 
     @property
@@ -29,20 +45,29 @@ class ScannerService:
 
             if time(9, 15) <= now <= time(15, 30):
                 db = db_factory()
-                await self.scan_once(db)
-                db.close()
+                try:
+                    await self.scan_once(db)
+                except Exception:
+                    db.rollback()
+                    logger.exception("Intraday scan failed")
+                finally:
+                    db.close()
 
             await asyncio.sleep(60)
 
     async def scan_once(self, db: Session):
+        """
+        Blocking work (SmartAPI login / history, DB) runs in a worker
+        thread, one call at a time on this session; the loop stays free.
+        """
         today = getattr(self, "_force_date", date.today())
-        instruments = self.universe.get_fno_universe(db)
+        instruments = await asyncio.to_thread(self.universe.get_fno_universe, db)
 
-        signals = []
+        contexts = []
 
         for inst in instruments:
-            lvl = self.levels.ensure_daily_levels(
-                db, inst.symbol, inst.token, today
+            lvl = await asyncio.to_thread(
+                self.levels.ensure_daily_levels, db, inst.symbol, inst.token, today
             )
             if not lvl:
                 continue
@@ -51,36 +76,35 @@ class ScannerService:
 
             for idx, candle in enumerate([c1, c2], start=1):
                 if candle:
-                    signal = self.check_signal(inst.symbol, candle, lvl, idx)
-                    if signal:
-                        signals.append(signal)
+                    contexts.append(StrategyContext(
+                        inst.symbol, candle["timestamp"], candle,
+                        levels=lvl, candle_index=idx,
+                    ))
+
+        # one rule per candle, as before the strategy registry
+        signals = self.engine.evaluate_bucket(contexts, first_match=True)
 
         if signals:
             for s in signals:
                 db.add(s)
-            db.commit()
+                SIGNALS_EMITTED.labels(rule=s.rule).inc()
+            await asyncio.to_thread(db.commit)
+            response_cache.invalidate("signals")
 
             self._latest = signals
             logger.info(f"🚨 {len(signals)} signals generated")
 
-            # 🔥 REAL-TIME BROADCAST
+            # 🔥 REAL-TIME BROADCAST (via bus → every API worker's /ws)
+            bus = get_bus()
             for s in signals:
-                await manager.broadcast({
-                    "type": "signal",
-                    "payload": {
-                        "symbol": s.symbol,
-                        "rule": s.rule,
-                        "time": s.time.isoformat(),
-                        "move_pct": s.move_pct
-                    }
-                })
+                bus.publish(signal_message(s))
 
     async def first_two_candles(self, inst, today):
         start = datetime(today.year, today.month, today.day, 9, 15)
         end   = datetime(today.year, today.month, today.day, 9, 25)
 
-        raw = self.provider.get_5m_candles(
-            "NSE", inst.token, start, end
+        raw = await asyncio.to_thread(
+            self.provider.get_5m_candles, "NSE", inst.token, start, end
         )
 
         if not raw:
@@ -103,49 +127,9 @@ class ScannerService:
         )
 
     def check_signal(self, symbol, candle, lvl, idx):
-        o, c = candle["open"], candle["close"]
-        move = (c - o) / o * 100
-
-        pdh, pdl = lvl.pdh, lvl.pdl
-        near = lambda p, l: abs(p - l) / l <= self.proximity
-
-        is_green = c > o
-        is_red = c < o
-
-        if is_red and abs(move) <= self.threshold and near(c, pdh):
-            return models.Signal(
-                symbol=symbol,
-                time=candle["timestamp"],
-                rule="PDH_REJECTION",
-                candle_index=idx,
-                move_pct=move
-            )
-
-        if is_green and abs(move) <= self.threshold and near(c, pdl):
-            return models.Signal(
-                symbol=symbol,
-                time=candle["timestamp"],
-                rule="PDL_REJECTION",
-                candle_index=idx,
-                move_pct=move
-            )
-
-        if is_green and move > self.threshold and c > pdh:
-            return models.Signal(
-                symbol=symbol,
-                time=candle["timestamp"],
-                rule="PDH_BREAKOUT",
-                candle_index=idx,
-                move_pct=move
-            )
-
-        if is_red and move < -self.threshold and c < pdl:
-            return models.Signal(
-                symbol=symbol,
-                time=candle["timestamp"],
-                rule="PDL_BREAKDOWN",
-                candle_index=idx,
-                move_pct=move
-            )
-
-        return None
+        ctx = StrategyContext(
+            symbol, candle["timestamp"], candle,
+            levels=lvl, candle_index=idx,
+        )
+        signals = self.engine.evaluate(ctx, first_match=True)
+        return signals[0] if signals else None
@@ -0,0 +1,364 @@
+"""
+Crash-safe snapshots of the in-memory live state, for warm restarts.
+
+Saved every `interval` seconds and on shutdown:
+  - CandleBuilder.live                    (forming candles)
+  - SignalDeduplicator._seen              (today's emitted rule keys)
+  - RealTimeScannerService.token_symbol_cache
+  - ScannerService._latest                (last batch-scanner signals)
+  - futures CandleBuilder.live            (forming bars incl. oi / oi_open)
+  - FuturesOIScanner basis EWMA           (mean, var, samples per symbol)
+
+File layout (little-endian): MAGIC, u16 version, f64 saved_at, then six
+sections of u32 count + records (live candles are fixed 73-byte records,
+futures bars 89 bytes, string columns are one NUL-separated UTF-8 blob
+per section), then a u32 CRC32 of everything before it. Only the current
+VERSION loads; an older file is ignored like a corrupt one (cold start).
+Files are written to a temp name, fsynced and renamed over the old one,
+so a crash leaves either the previous or the new snapshot, never a torn one.
+"""
+import asyncio
+import os
+import struct
+import time
+import zlib
+from datetime import date, datetime, timedelta
+from typing import Dict, List, Optional, Tuple
+
+from logzero import logger
+
+from app.db import models
+
+MAGIC = b"NSESNAP"
+VERSION = 2
+
+_HEAD = struct.Struct("<7sHd")
+_U32 = struct.Struct("<I")
+_U16 = struct.Struct("<H")
+_CANDLE = struct.Struct("<25sq5d")   # token (feed width), start (epoch µs), o, h, l, c, v
+_SIGNAL = struct.Struct("<qid")      # time (epoch µs), candle_index, move_pct
+_FUTURE = struct.Struct("<25sq7d")   # as _CANDLE, then oi, oi_open
+_BASIS = struct.Struct("<ddq")       # mean, var, samples
+
+BAR = timedelta(minutes=5)
+_EPOCH = datetime(1970, 1, 1)
+
+
+def _us(dt: datetime) -> int:
+    return (dt - _EPOCH) // timedelta(microseconds=1)
+
+
+def _dt(us: int) -> datetime:
+    return _EPOCH + timedelta(microseconds=us)
+
+
+def _str(s: str) -> bytes:
+    b = s.encode()
+    return _U16.pack(len(b)) + b
+
+
+def _blob(strings: List[str]) -> bytes:
+    """
+    NUL-separated UTF-8 with a u32 byte length: one encode for a section.
+    """
+    b = "\x00".join(strings).encode()
+    return _U32.pack(len(b)) + b
+
+
+class _Reader:
+    def __init__(self, buf: bytes, pos: int = 0):
+        self.buf = buf
+        self.pos = pos
+
+    def unpack(self, st: struct.Struct):
+        values = st.unpack_from(self.buf, self.pos)
+        self.pos += st.size
+        return values
+
+    def str(self) -> str:
+        (n,) = self.unpack(_U16)
+        s = self.buf[self.pos:self.pos + n].decode()
+        self.pos += n
+        return s
+
+    def blob(self) -> List[str]:
+        (n,) = self.unpack(_U32)
+        raw = self.buf[self.pos:self.pos + n]
+        self.pos += n
+        return raw.decode().split("\x00") if n else []
+
+
+# -------------------------------------------------
+def encode(live: List[tuple], seen, token_symbols: List[Tuple[str, str]],
+           latest: List[models.Signal], saved_at: float,
+           futures: List[tuple] = (), basis: List[tuple] = ()) -> bytes:
+    """
+    `live` rows are (token, start, open, high, low, close, volume);
+    `futures` rows add (oi, oi_open), `basis` rows are (symbol, mean,
+    var, samples).
+    """
+    parts = [_HEAD.pack(MAGIC, VERSION, saved_at)]
+
+    # almost every live candle shares the current bucket start
+    starts = {}
+    buf = bytearray(_CANDLE.size * len(live))
+    for i, (token, start, o, h, l, c, v) in enumerate(live):
+        us = starts.get(start)
+        if us is None:
+            us = starts[start] = _us(start)
+        _CANDLE.pack_into(buf, i * _CANDLE.size, token.encode(), us, o, h, l, c, v)
+    parts.append(_U32.pack(len(live)))
+    parts.append(bytes(buf))
+
+    parts.append(_U32.pack(len(seen)))
+    parts.append(_blob([x for symbol, rule, _ in seen for x in (symbol, rule)]))
+    parts.append(struct.pack(f"<{len(seen)}I", *(day.toordinal() for _, _, day in seen)))
+
+    parts.append(_U32.pack(len(token_symbols)))
+    parts.append(_blob([x for pair in token_symbols for x in pair]))
+
+    parts.append(_U32.pack(len(latest)))
+    for s in latest:
+        parts.append(_str(s.symbol) + _str(s.rule))
+        parts.append(_SIGNAL.pack(_us(s.time), s.candle_index or 0, s.move_pct or 0.0))
+
+    parts.append(_U32.pack(len(futures)))
+    for token, start, *values in futures:
+        parts.append(_FUTURE.pack(token.encode(), _us(start), *values))
+
+    parts.append(_U32.pack(len(basis)))
+    parts.append(_blob([symbol for symbol, *_ in basis]))
+    for _, mean, var, n in basis:
+        parts.append(_BASIS.pack(mean, var, n))
+
+    body = b"".join(parts)
+    return body + _U32.pack(zlib.crc32(body))
+
+
+def decode(buf: bytes) -> dict:
+    if len(buf) < _HEAD.size + _U32.size:
+        raise ValueError("snapshot truncated")
+    body, (crc,) = buf[:-_U32.size], _U32.unpack(buf[-_U32.size:])
+    if zlib.crc32(body) != crc:
+        raise ValueError("snapshot checksum mismatch")
+
+    r = _Reader(body)
+    magic, version, saved_at = r.unpack(_HEAD)
+    if magic != MAGIC or version != VERSION:
+        raise ValueError(f"unsupported snapshot {magic!r} v{version}")
+
+    live = {}
+    starts = {}
+    for _ in range(r.unpack(_U32)[0]):
+        token, start, o, h, l, c, v = r.unpack(_CANDLE)
+        token = token.rstrip(b"\x00").decode()
+        if start not in starts:
+            starts[start] = _dt(start)
+        live[token] = {
+            "token": token, "start": starts[start],
+            "open": o, "high": h, "low": l, "close": c, "volume": v,
+        }
+
+    n = r.unpack(_U32)[0]
+    names = r.blob()
+    days = r.unpack(struct.Struct(f"<{n}I"))
+    seen = {
+        (names[2 * i], names[2 * i + 1], date.fromordinal(days[i]))
+        for i in range(n)
+    }
+
+    n = r.unpack(_U32)[0]
+    names = r.blob()
+    token_symbols = {names[2 * i]: names[2 * i + 1] for i in range(n)}
+
+    latest = []
+    for _ in range(r.unpack(_U32)[0]):
+        symbol, rule = r.str(), r.str()
+        ts, idx, move = r.unpack(_SIGNAL)
+        latest.append(models.Signal(
+            symbol=symbol, rule=rule, time=_dt(ts), candle_index=idx, move_pct=move
+        ))
+
+    futures = {}
+    for _ in range(r.unpack(_U32)[0]):
+        token, start, o, h, l, c, v, oi, oi_open = r.unpack(_FUTURE)
+        token = token.rstrip(b"\x00").decode()
+        futures[token] = {
+            "token": token, "start": _dt(start),
+            "open": o, "high": h, "low": l, "close": c, "volume": v,
+            "oi": oi, "oi_open": oi_open,
+        }
+
+    r.unpack(_U32)
+    basis = [(symbol, *r.unpack(_BASIS)) for symbol in r.blob()]
+
+    return {
+        "saved_at": saved_at,
+        "live": live,
+        "seen": seen,
+        "token_symbols": token_symbols,
+        "latest": latest,
+        "futures": futures,
+        "basis": basis,
+    }
+
+
+# -------------------------------------------------
+class SnapshotService:
+    """
+    Periodic snapshot + warm start for the live pipeline.
+
+    `restore()` runs before the feed starts: candles still in the current
+    bucket go back into CandleBuilder.live; older ones mark tokens whose
+    missed buckets `replay_gap()` later fetches from the provider and
+    pushes through CandleBuilder.emit_closed (store + listeners).
+    """
+
+    def __init__(self, feed, scanner, history, path: str,
+                 interval: float = 10.0, replay_rate: float = 3.0):
+        self.feed = feed
+        self.scanner = scanner
+        self.history = history  # anything with get_5m_candles
+        self.path = path
+        self.interval = interval
+        self.replay_rate = replay_rate
+
+        self.gap: Dict[str, datetime] = {}  # token -> first missed bucket
+
+    # -------------------------------------------------
+    def save(self) -> int:
+        builder = self.feed.candle_builder
+        rt = self.feed.scanner
+
+        # list() copies in one C call, safe against the tick thread
+        live = [
+            (t, c["start"], c["open"], c["high"], c["low"], c["close"], c["volume"])
+            for t, c in list(builder.live.items())
+        ]
+        seen = list(rt.dedup._seen)
+        token_symbols = list(rt.token_symbol_cache.items())
+        latest = list(self.scanner._latest)
+
+        futures = [
+            (t, c["start"], c["open"], c["high"], c["low"], c["close"], c["volume"],
+             c["oi"], c["oi_open"])
+            for t, c in list(self.feed.futures_builder.live.items())
+            if "oi" in c
+        ]
+        basis = self.feed.futures.basis_state()
+
+        data = encode(live, seen, token_symbols, latest, time.time(), futures, basis)
+
+        tmp = self.path + ".tmp"
+        os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+        with open(tmp, "wb") as f:
+            f.write(data)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp, self.path)
+        return len(data)
+
+    def load(self) -> Optional[dict]:
+        if not os.path.exists(self.path):
+            return None
+        try:
+            with open(self.path, "rb") as f:
+                return decode(f.read())
+        except Exception:
+            logger.exception("Ignoring unreadable snapshot")
+            return None
+
+    # -------------------------------------------------
+    def restore(self, now: Optional[datetime] = None) -> bool:
+        snap = self.load()
+        if snap is None:
+            return False
+
+        now = now or datetime.now()
+        today = now.date()
+        current = now.replace(minute=now.minute - now.minute % 5,
+                              second=0, microsecond=0)
+
+        rt = self.feed.scanner
+        rt.token_symbol_cache.update(snap["token_symbols"])
+
+        if datetime.fromtimestamp(snap["saved_at"]).date() != today:
+            logger.info("Snapshot is from a previous session; live state not restored")
+            return False
+
+        rt.dedup._seen.update(k for k in snap["seen"] if k[2] == today)
+        self.scanner._latest = snap["latest"]
+
+        builder = self.feed.candle_builder
+        for token, candle in snap["live"].items():
+            if candle["start"] == current:
+                builder.live[token] = candle
+            elif candle["start"] < current:
+                self.gap[token] = candle["start"]
+
+        # futures bars from an earlier bucket are dropped: history has no OI
+        futures = self.feed.futures_builder
+        for token, candle in snap["futures"].items():
+            if candle["start"] == current:
+                futures.live[token] = candle
+        basis = self.feed.futures.restore_basis(snap["basis"])
+
+        logger.info(
+            f"♻️ Warm start: {len(snap['live']) - len(self.gap)} live candles, "
+            f"{len(self.gap)} tokens to replay, {len(rt.dedup._seen)} dedup keys, "
+            f"{basis} futures basis averages"
+        )
+        return True
+
+    def replay_gap(self, now: Optional[datetime] = None) -> int:
+        """
+        Fetch and emit the closed buckets missed while down (rate-limited).
+        """
+        if not self.gap:
+            return 0
+
+        now = now or datetime.now()
+        last_closed = now.replace(minute=now.minute - now.minute % 5,
+                                  second=0, microsecond=0) - BAR
+        builder = self.feed.candle_builder
+        emitted = 0
+
+        for token, since in list(self.gap.items()):
+            if since > last_closed:
+                continue
+            try:
+                rows = self.history.get_5m_candles("NSE", token, since, last_closed)
+            except Exception:
+                logger.exception(f"Gap replay failed for {token}")
+                continue
+
+            for row in rows:
+                start = datetime.fromisoformat(row[0].split("+")[0])
+                if not since <= start <= last_closed:
+                    continue
+                with builder.locks[token]:
+                    builder.emit_closed({
+                        "token": token,
+                        "start": start,
+                        "open": float(row[1]),
+                        "high": float(row[2]),
+                        "low": float(row[3]),
+                        "close": float(row[4]),
+                        "volume": float(row[5]),
+                    })
+                emitted += 1
+
+            time.sleep(1 / self.replay_rate)
+
+        self.gap.clear()
+        logger.info(f"♻️ Replayed {emitted} missed candles")
+        return emitted
+
+    # -------------------------------------------------
+    async def run_loop(self):
+        while True:
+            await asyncio.sleep(self.interval)
+            try:
+                await asyncio.to_thread(self.save)
+            except Exception:
+                logger.exception("Snapshot failed")
@@ -0,0 +1,303 @@
+from datetime import datetime
+from typing import Any, Callable, Dict, Iterable, List, Optional, Sequence
+
+from app.db import models
+
+
+# name -> Strategy subclass
+STRATEGIES: Dict[str, type] = {}
+
+# name -> fn(ctx) computing a shared input
+INPUTS: Dict[str, Callable[["StrategyContext"], Any]] = {}
+
+
+def register_strategy(cls):
+    """
+    Class decorator: makes a strategy selectable by name.
+    """
+    if not cls.name:
+        raise ValueError(f"{cls.__name__} has no name")
+    STRATEGIES[cls.name] = cls
+    return cls
+
+
+def register_input(name: str):
+    """
+    Decorator: registers a derived input that strategies can declare.
+    """
+    def deco(fn):
+        INPUTS[name] = fn
+        return fn
+    return deco
+
+
+class StrategyContext:
+    """
+    Everything a strategy can read for one (symbol, candle).
+    Each derived input is computed on first access and then shared
+    by every strategy evaluated against this context.
+    """
+
+    __slots__ = ("symbol", "time", "candle", "levels",
+                 "indicators", "candle_index", "_cache")
+
+    def __init__(self, symbol: str, time: datetime, candle: dict,
+                 levels=None, indicators=None, candle_index: int = 0):
+        self.symbol = symbol
+        self.time = time
+        self.candle = candle
+        self.levels = levels
+        self.indicators = indicators
+        self.candle_index = candle_index
+        self._cache: Dict[str, Any] = {}
+
+    def get(self, name: str):
+        try:
+            return self._cache[name]
+        except KeyError:
+            value = self._cache[name] = INPUTS[name](self)
+            return value
+
+
+# -------------------------------------------------
+# Shared inputs
+# -------------------------------------------------
+@register_input("candle")
+def _candle(ctx):
+    return ctx.candle
+
+
+@register_input("levels")
+def _levels(ctx):
+    return ctx.levels
+
+
+@register_input("indicators")
+def _indicators(ctx):
+    return ctx.indicators
+
+
+@register_input("move_pct")
+def _move_pct(ctx):
+    o, c = ctx.candle["open"], ctx.candle["close"]
+    return (c - o) / o * 100
+
+
+@register_input("direction")
+def _direction(ctx):
+    """
+    +1 green, -1 red, 0 doji
+    """
+    o, c = ctx.candle["open"], ctx.candle["close"]
+    return (c > o) - (c < o)
+
+
+# -------------------------------------------------
+# Strategies
+# -------------------------------------------------
+class Strategy:
+    """
+    Base class for a rule.
+
+    Subclasses set `name`, the `inputs` they read from the context and
+    their default `params`. `evaluate` returns True when the rule fires.
+    `side` is the implied trade side (+1 long, -1 short), used to score
+    outcomes; not to be confused with the "direction" input (candle colour).
+    """
+
+    name: str = ""
+    side: int = 1
+    inputs: Sequence[str] = ()
+    params: Dict[str, Any] = {}
+
+    def __init__(self, **params):
+        values = dict(self.params)
+        for key, value in params.items():
+            if key in values:
+                values[key] = value
+        for key, value in values.items():
+            setattr(self, key, value)
+        self.setup()
+
+    def setup(self):
+        """
+        Hook to precompute derived parameters once.
+        """
+
+    def evaluate(self, ctx: StrategyContext) -> bool:
+        raise NotImplementedError
+
+
+@register_strategy
+class PDHRejection(Strategy):
+    name = "PDH_REJECTION"
+    side = -1
+    inputs = ("levels", "move_pct", "direction")
+    params = {"threshold": 3.0, "proximity": 0.3}
+
+    def setup(self):
+        self._near = self.proximity / 100
+
+    def evaluate(self, ctx):
+        pdh = ctx.levels.pdh
+        return (
+            ctx.get("direction") < 0
+            and abs(ctx.get("move_pct")) <= self.threshold
+            and abs(ctx.candle["close"] - pdh) / pdh <= self._near
+        )
+
+
+@register_strategy
+class PDLRejection(Strategy):
+    name = "PDL_REJECTION"
+    side = 1
+    inputs = ("levels", "move_pct", "direction")
+    params = {"threshold": 3.0, "proximity": 0.3}
+
+    def setup(self):
+        self._near = self.proximity / 100
+
+    def evaluate(self, ctx):
+        pdl = ctx.levels.pdl
+        return (
+            ctx.get("direction") > 0
+            and abs(ctx.get("move_pct")) <= self.threshold
+            and abs(ctx.candle["close"] - pdl) / pdl <= self._near
+        )
+
+
+@register_strategy
+class PDHBreakout(Strategy):
+    name = "PDH_BREAKOUT"
+    side = 1
+    inputs = ("levels", "move_pct", "direction")
+    params = {"threshold": 3.0}
+
+    def evaluate(self, ctx):
+        return (
+            ctx.get("direction") > 0
+            and ctx.get("move_pct") > self.threshold
+            and ctx.candle["close"] > ctx.levels.pdh
+        )
+
+
+@register_strategy
+class PDLBreakdown(Strategy):
+    name = "PDL_BREAKDOWN"
+    side = -1
+    inputs = ("levels", "move_pct", "direction")
+    params = {"threshold": 3.0}
+
+    def evaluate(self, ctx):
+        return (
+            ctx.get("direction") < 0
+            and ctx.get("move_pct") < -self.threshold
+            and ctx.candle["close"] < ctx.levels.pdl
+        )
+
+
+@register_strategy
+class ORBreakout(Strategy):
+    """
+    Close above the opening range on a volume spike, above VWAP.
+    """
+
+    name = "OR_BREAKOUT"
+    side = 1
+    inputs = ("indicators", "direction")
+    params = {"volume_z": 2.0}
+
+    def evaluate(self, ctx):
+        ind = ctx.get("indicators")
+        return (
+            ctx.get("direction") > 0
+            and ind.or_high is not None
+            and ind.volume_zscore is not None
+            and ind.volume_zscore >= self.volume_z
+            and ctx.candle["close"] > ind.or_high
+            and ctx.candle["close"] > ind.vwap
+        )
+
+
+@register_strategy
+class ORBreakdown(Strategy):
+    """
+    Close below the opening range on a volume spike, below VWAP.
+    """
+
+    name = "OR_BREAKDOWN"
+    side = -1
+    inputs = ("indicators", "direction")
+    params = {"volume_z": 2.0}
+
+    def evaluate(self, ctx):
+        ind = ctx.get("indicators")
+        return (
+            ctx.get("direction") < 0
+            and ind.or_low is not None
+            and ind.volume_zscore is not None
+            and ind.volume_zscore >= self.volume_z
+            and ctx.candle["close"] < ind.or_low
+            and ctx.candle["close"] < ind.vwap
+        )
+
+
+# -------------------------------------------------
+# Engine
+# -------------------------------------------------
+class StrategyEngine:
+    """
+    Evaluates a set of registered strategies against candle contexts.
+
+    `params` are shared: each strategy picks up only the keys it declares.
+    Strategies whose declared inputs are missing (e.g. no levels yet)
+    are skipped for that context. With `first_match` only the first
+    strategy (in registry order) that fires yields a signal.
+    """
+
+    def __init__(self, names: Optional[Iterable[str]] = None,
+                 params: Optional[Dict[str, Any]] = None):
+        names = list(names) if names is not None else list(STRATEGIES)
+        params = params or {}
+
+        unknown = [n for n in names if n not in STRATEGIES]
+        if unknown:
+            raise ValueError(f"Unknown strategies: {unknown}")
+
+        self.strategies: List[Strategy] = [
+            STRATEGIES[n](**params) for n in names
+        ]
+
+        # inputs that can be absent and gate a strategy
+        self._optional = {"levels", "indicators"}
+
+    def evaluate(self, ctx: StrategyContext,
+                 first_match: bool = False) -> List[models.Signal]:
+        signals = []
+        for strategy in self.strategies:
+            if any(
+                ctx.get(i) is None
+                for i in strategy.inputs if i in self._optional
+            ):
+                continue
+
+            if strategy.evaluate(ctx):
+                signals.append(
+                    models.Signal(
+                        symbol=ctx.symbol,
+                        time=ctx.time,
+                        rule=strategy.name,
+                        candle_index=ctx.candle_index,
+                        move_pct=ctx.get("move_pct"),
+                    )
+                )
+                if first_match:
+                    break
+        return signals
+
+    def evaluate_bucket(self, contexts: Iterable[StrategyContext],
+                        first_match: bool = False) -> List[models.Signal]:
+        signals = []
+        for ctx in contexts:
+            signals.extend(self.evaluate(ctx, first_match))
+        return signals
@@ -0,0 +1,243 @@
+"""
+HTTP + /ws load against a real uvicorn server (RUN_MODE=api).
+
+Worker threads hammer the read endpoints with keep-alive sessions while
+a publisher pushes signal messages through the bus to connected /ws
+clients. Reports request throughput and p50/p99 latency per endpoint,
+and publish→receive latency for the websocket fan-out. Load generator
+and server share one process, so absolute numbers are pessimistic; use
+--url against a separately started server for HTTP-only runs.
+
+    python -m bench.bench_api --clients 16 --ws-clients 200 --seconds 15
+    python -m bench.bench_api --url http://127.0.0.1:8000   # external server (HTTP only)
+"""
+import argparse
+import json
+import os
+import socket
+import tempfile
+import time
+from datetime import datetime, timedelta
+from threading import Event, Lock, Thread
+
+_tmpdir = tempfile.mkdtemp(prefix="bench_api_")
+# assigned, never inherited: seeding must not touch an exported DATABASE_URL
+os.environ["DATABASE_URL"] = f"sqlite:///{os.path.join(_tmpdir, 'bench.db')}"
+os.environ["RUN_MODE"] = "api"
+for var in ("SMARTAPI_KEY", "SMARTAPI_CLIENT_ID", "SMARTAPI_PIN", "SMARTAPI_TOTP_SECRET"):
+    os.environ.setdefault(var, "bench")
+
+import logzero
+import requests
+import websocket
+
+from app.bus import get_bus
+from app.db import models
+from app.db.migrate import run_migrations
+from app.db.session import SessionLocal
+from bench.report import latency_summary, max_rss_mb, save_result
+
+ENDPOINTS = (
+    "/health",
+    "/dashboard",
+    "/signals/?limit=100",
+    "/signals/latest?limit=20",
+    "/instruments/fno",
+    "/market/candles?symbol=SYN0&limit=500",
+)
+
+
+def seed_database(symbols: int = 50, days: int = 5):
+    run_migrations()
+    start = datetime(2024, 1, 1, 9, 15)
+    with SessionLocal() as db:
+        db.bulk_insert_mappings(models.Instrument, [
+            {"symbol": f"SYN{i}", "token": str(100000 + i), "name": f"SYN{i}",
+             "exchange": "NFO", "segment": "FNO", "active": True}
+            for i in range(symbols)
+        ])
+        db.bulk_insert_mappings(models.Candle5m, [
+            {
+                "symbol": f"SYN{i}",
+                "start_time": start + timedelta(days=d, minutes=5 * k),
+                "open": 100.0, "high": 101.0, "low": 99.0, "close": 100.5,
+                "volume": 1000.0,
+            }
+            for i in range(symbols) for d in range(days) for k in range(75)
+        ])
+        db.bulk_insert_mappings(models.Signal, [
+            {"symbol": f"SYN{i % symbols}", "time": start + timedelta(minutes=i),
+             "rule": "PDH_BREAKOUT", "candle_index": 0, "move_pct": 1.0}
+            for i in range(2000)
+        ])
+        db.commit()
+
+
+def free_port() -> int:
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def start_server(port: int):
+    import uvicorn
+
+    from app.main import app
+
+    server = uvicorn.Server(uvicorn.Config(
+        app, host="127.0.0.1", port=port, log_level="warning", ws_ping_interval=None
+    ))
+    thread = Thread(target=server.run, daemon=True)
+    thread.start()
+    while not server.started:
+        time.sleep(0.05)
+    return server, thread
+
+
+# -------------------------------------------------
+def http_worker(base: str, stop: Event, out: dict, lock: Lock):
+    session = requests.Session()
+    local = {path: [] for path in ENDPOINTS}
+    errors = 0
+    i = 0
+    while not stop.is_set():
+        path = ENDPOINTS[i % len(ENDPOINTS)]
+        i += 1
+        t0 = time.perf_counter()
+        try:
+            ok = session.get(base + path, timeout=10).status_code == 200
+        except requests.RequestException:
+            ok = False
+        if ok:
+            local[path].append(time.perf_counter() - t0)
+        else:
+            errors += 1
+    with lock:
+        for path, values in local.items():
+            out.setdefault(path, []).extend(values)
+        out["_errors"] = out.get("_errors", 0) + errors
+
+
+def ws_client(url: str, ready: Event, stop: Event, out: list, lock: Lock):
+    conn = websocket.create_connection(url, timeout=1)
+    ready.set()
+    local = []
+    while not stop.is_set():
+        try:
+            msg = conn.recv()
+        except websocket.WebSocketTimeoutException:
+            continue
+        except Exception:
+            break
+        now = time.perf_counter()
+        sent = json.loads(msg).get("bench_sent")
+        if sent is not None:
+            local.append(now - sent)
+    conn.close()
+    with lock:
+        out.extend(local)
+
+
+def publisher(rate: float, stop: Event, counter: list):
+    bus = get_bus()
+    interval = 1 / rate
+    n = 0
+    while not stop.is_set():
+        bus.publish({
+            "type": "signal",
+            "payload": {"symbol": f"SYN{n % 50}", "rule": "PDH_BREAKOUT",
+                        "time": datetime.now().isoformat(), "move_pct": 1.0},
+            "bench_sent": time.perf_counter(),
+        })
+        n += 1
+        time.sleep(interval)
+    counter.append(n)
+
+
+# -------------------------------------------------
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--clients", type=int, default=16)
+    parser.add_argument("--ws-clients", type=int, default=100)
+    parser.add_argument("--publish-rate", type=float, default=20, help="signals per second")
+    parser.add_argument("--seconds", type=float, default=10)
+    parser.add_argument("--url", default=None, help="existing server; skips /ws load")
+    opts = parser.parse_args()
+
+    logzero.loglevel(logzero.WARNING)
+
+    server = None
+    if opts.url:
+        base = opts.url.rstrip("/")
+    else:
+        seed_database()
+        port = free_port()
+        server, thread = start_server(port)
+        base = f"http://127.0.0.1:{port}"
+
+    stop = Event()
+    lock = Lock()
+    http_results: dict = {}
+    ws_latency: list = []
+    published: list = []
+    threads = []
+
+    if server:
+        for _ in range(opts.ws_clients):
+            ready = Event()
+            t = Thread(target=ws_client, args=(
+                base.replace("http", "ws") + "/ws", ready, stop, ws_latency, lock
+            ))
+            t.start()
+            ready.wait(5)
+            threads.append(t)
+        threads.append(Thread(target=publisher, args=(opts.publish_rate, stop, published)))
+
+    threads += [
+        Thread(target=http_worker, args=(base, stop, http_results, lock))
+        for _ in range(opts.clients)
+    ]
+
+    t0 = time.perf_counter()
+    for t in threads:
+        if not t.is_alive():
+            t.start()
+    time.sleep(opts.seconds)
+    stop.set()
+    for t in threads:
+        t.join()
+    elapsed = time.perf_counter() - t0
+
+    if server:
+        server.should_exit = True
+        thread.join(10)
+
+    all_requests = [v for k, vals in http_results.items() if k != "_errors" for v in vals]
+    metrics = {
+        "requests_per_sec": len(all_requests) / elapsed,
+        "http_errors": http_results.get("_errors", 0),
+        **latency_summary(all_requests, "http"),
+    }
+    for path in ENDPOINTS:
+        name = path.split("?")[0].strip("/").replace("/", "_") or "root"
+        summary = latency_summary(http_results.get(path, []), name)
+        metrics[f"{name}_p50_ms"] = summary[f"{name}_p50_ms"]
+        metrics[f"{name}_p99_ms"] = summary[f"{name}_p99_ms"]
+    if server:
+        metrics["ws_published"] = published[0] if published else 0
+        metrics["ws_delivered"] = len(ws_latency)
+        metrics.update(latency_summary(ws_latency, "ws_fanout"))
+    metrics["max_rss_mb"] = max_rss_mb()
+
+    params = {
+        "clients": opts.clients,
+        "ws_clients": opts.ws_clients if server else 0,
+        "publish_rate": opts.publish_rate,
+        "seconds": opts.seconds,
+        "target": "external" if opts.url else "local",
+    }
+    return save_result("api", params, metrics)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,207 @@
+"""
+End-to-end feed pipeline under a synthetic market open.
+
+Replays seeded GBM ticks (see bench.ticks) through
+WebSocketProvider._handle_binary_tick → CandleBuilder → IndicatorEngine →
+RealTimeScannerService against a throwaway SQLite database (or --db URL)
+and reports tick throughput, close→signal latency and memory.
+
+    python -m bench.bench_pipeline --tokens 2000 --minutes 30
+    python -m bench.report pipeline     # history
+"""
+import argparse
+import os
+import tempfile
+import time
+from datetime import timedelta
+
+
+def parse_args():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--tokens", type=int, default=2000)
+    parser.add_argument("--minutes", type=int, default=30)
+    parser.add_argument("--ticks-per-minute", type=float, default=4)
+    parser.add_argument("--burst-minutes", type=int, default=5)
+    parser.add_argument("--burst-factor", type=float, default=5)
+    parser.add_argument("--sigma", type=float, default=0.003, help="per-minute volatility")
+    parser.add_argument("--threshold", type=float, default=0.5, help="breakout move %%")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--db", default=None, help="database URL (default: temp SQLite file)")
+    return parser.parse_args()
+
+
+args = parse_args() if __name__ == "__main__" else None
+
+_tmpdir = tempfile.mkdtemp(prefix="bench_pipeline_")
+BENCH_DB = f"sqlite:///{os.path.join(_tmpdir, 'bench.db')}"
+# assigned, never inherited: an exported DATABASE_URL must not be seeded / cleared
+os.environ["DATABASE_URL"] = (args and args.db) or BENCH_DB
+os.environ["CANDLE_SPILL_PATH"] = os.path.join(_tmpdir, "candle_spill.jsonl")
+os.environ["FUTURES_SPILL_PATH"] = os.path.join(_tmpdir, "futures_spill.jsonl")
+os.environ["SNAPSHOT_PATH"] = os.path.join(_tmpdir, "live_state.snap")
+for var in ("SMARTAPI_KEY", "SMARTAPI_CLIENT_ID", "SMARTAPI_PIN", "SMARTAPI_TOTP_SECRET"):
+    os.environ.setdefault(var, "bench")
+
+import logzero
+
+from app.bus import InMemoryBus, set_bus
+from app.db import models
+from app.db.migrate import run_migrations
+from app.db.session import SessionLocal, get_engine
+from app.providers.ws_provider import WebSocketProvider
+from app.services.levels_service import LevelsService
+from app.services.realtime_scanner_service import RealTimeScannerService
+from app.services.strategy_engine import StrategyEngine
+from bench.report import latency_summary, max_rss_mb, save_result
+from bench.ticks import TickGenerator
+
+
+def seed_database(gen: TickGenerator, band: float = 0.004):
+    """
+    One NSE instrument per synthetic token and today's PDH/PDL placed
+    `band` around the opening price, so breakouts actually happen.
+
+    Only the benchmark's own temp database is ever cleared; a --db
+    database must not contain signals, candles or levels yet.
+    """
+    run_migrations()
+    with SessionLocal() as db:
+        if os.environ["DATABASE_URL"] == BENCH_DB:
+            db.query(models.Signal).delete()
+            db.query(models.Candle5m).delete()
+            db.query(models.DailyLevel).delete()
+            db.query(models.Instrument).filter(models.Instrument.symbol.like("SYN%")).delete(
+                synchronize_session=False
+            )
+        elif any(
+            db.query(model).first() is not None
+            for model in (models.Signal, models.Candle5m, models.DailyLevel)
+        ):
+            raise SystemExit(
+                "refusing to run against a non-empty --db database; "
+                "point --db at a fresh one"
+            )
+        db.bulk_insert_mappings(models.Instrument, [
+            {"symbol": s, "token": t, "name": s, "exchange": "NSE", "segment": "EQ", "active": True}
+            for t, s in zip(gen.tokens, gen.symbols)
+        ])
+        db.bulk_insert_mappings(models.DailyLevel, [
+            {
+                "symbol": s,
+                "trade_date": gen.start.date(),
+                "pdh": float(p) * (1 + band),
+                "pdl": float(p) * (1 - band),
+                "pdc": float(p),
+            }
+            for s, p in zip(gen.symbols, gen.open_prices)
+        ])
+        db.commit()
+
+
+def build_feed(gen: TickGenerator, threshold: float):
+    feed = WebSocketProvider(levels=LevelsService(provider=None))
+    feed.token_symbol_map.update(zip(gen.tokens, gen.symbols))
+    feed.scanner.token_symbol_cache.update(feed.token_symbol_map)
+    feed.scanner.engine = StrategyEngine(
+        RealTimeScannerService.RULES, params={"threshold": threshold}
+    )
+    return feed
+
+
+def run(opts) -> dict:
+    logzero.loglevel(logzero.WARNING + 10)  # signal warnings would dominate the timing
+
+    gen = TickGenerator(
+        n_tokens=opts.tokens,
+        seed=opts.seed,
+        minutes=opts.minutes,
+        ticks_per_minute=opts.ticks_per_minute,
+        burst_minutes=opts.burst_minutes,
+        burst_factor=opts.burst_factor,
+        sigma_per_minute=opts.sigma,
+    )
+    seed_database(gen)
+
+    t0 = time.perf_counter()
+    ticks = list(gen.ticks())
+    generate_seconds = time.perf_counter() - t0
+
+    feed = build_feed(gen, opts.threshold)
+    builder = feed.candle_builder
+
+    # ---- latency probes ----
+    closed_at = {}
+    evaluated, to_signal = [], []
+
+    def record_close(candle):
+        symbol = feed.token_symbol_map[candle["token"]]
+        closed_at[(symbol, candle["start"].isoformat())] = candle["closed_at"]
+
+    def record_evaluated(candle):
+        evaluated.append(time.perf_counter() - candle["closed_at"])
+
+    def record_signal(message):
+        if message.get("type") == "signal":
+            p = message["payload"]
+            to_signal.append(time.perf_counter() - closed_at[(p["symbol"], p["time"])])
+
+    builder.close_listeners.insert(0, record_close)
+    builder.add_close_listener(record_evaluated)
+    bus = InMemoryBus()
+    bus.subscribe(record_signal)
+    set_bus(bus)
+
+    # ---- replay ----
+    now = [gen.start]
+    feed.clock = lambda: now[0]
+    burst_end = gen.start + timedelta(minutes=opts.burst_minutes)
+    burst_ticks, burst_seconds = 0, 0.0
+    rss_before = max_rss_mb()
+
+    t0 = time.perf_counter()
+    for ts, packet in ticks:
+        now[0] = ts
+        feed._handle_binary_tick(packet)
+        if ts < burst_end:
+            burst_ticks += 1
+            burst_seconds = time.perf_counter() - t0
+    replay_seconds = time.perf_counter() - t0
+
+    t0 = time.perf_counter()
+    builder.stop()
+    flush_seconds = time.perf_counter() - t0
+
+    with SessionLocal() as db:
+        stored = db.query(models.Candle5m).count()
+
+    metrics = {
+        "ticks": len(ticks),
+        "ticks_per_sec": len(ticks) / replay_seconds,
+        "burst_ticks_per_sec": burst_ticks / burst_seconds if burst_seconds else 0.0,
+        "generate_seconds": generate_seconds,
+        "replay_seconds": replay_seconds,
+        "final_flush_seconds": flush_seconds,
+        "candles_closed": len(evaluated),
+        "candles_stored": stored,
+        "signals": len(to_signal),
+        **latency_summary(evaluated, "close_to_evaluated"),
+        **latency_summary(to_signal, "close_to_signal"),
+        "max_rss_mb": max_rss_mb(),
+        "rss_growth_mb": max_rss_mb() - rss_before,
+    }
+    return metrics
+
+
+def main():
+    opts = args or parse_args()
+    params = {
+        k: getattr(opts, k)
+        for k in ("tokens", "minutes", "ticks_per_minute", "burst_minutes",
+                  "burst_factor", "sigma", "threshold", "seed")
+    }
+    params["db"] = get_engine().url.get_backend_name()
+    return save_result("pipeline", params, run(opts))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,119 @@
+"""
+Throughput of /market/candles for large responses.
+
+Compares the old path (ORM objects through jsonable_encoder) with the
+column-only query + ORJSONResponse path used by the router.
+
+    python -m bench.bench_serialization --rows 10000 --repeat 20
+"""
+import argparse
+import os
+import time
+from datetime import datetime, timedelta
+
+os.environ.setdefault("DATABASE_URL", "sqlite://")
+for var in ("SMARTAPI_KEY", "SMARTAPI_CLIENT_ID", "SMARTAPI_PIN", "SMARTAPI_TOTP_SECRET"):
+    os.environ.setdefault(var, "bench")
+
+from fastapi import FastAPI, Depends, Query
+from fastapi.testclient import TestClient
+from sqlalchemy import create_engine
+from sqlalchemy.orm import Session, sessionmaker
+from sqlalchemy.pool import StaticPool
+
+from app.db.session import Base
+from app.db import models
+from app.routers import market
+
+
+def build_app(rows: int) -> FastAPI:
+    engine = create_engine(
+        "sqlite://",
+        connect_args={"check_same_thread": False},
+        poolclass=StaticPool,
+    )
+    Base.metadata.create_all(engine)
+    factory = sessionmaker(bind=engine, future=True)
+
+    start = datetime(2024, 1, 1, 9, 15)
+    with factory() as db:
+        db.bulk_insert_mappings(models.Candle5m, [
+            {
+                "symbol": "BENCH",
+                "start_time": start + timedelta(minutes=5 * i),
+                "open": 100.0 + i % 7,
+                "high": 101.0 + i % 7,
+                "low": 99.0 + i % 7,
+                "close": 100.5 + i % 7,
+                "volume": float(1000 + i),
+            }
+            for i in range(rows)
+        ])
+        db.commit()
+
+    def get_db():
+        db = factory()
+        try:
+            yield db
+        finally:
+            db.close()
+
+    app = FastAPI()
+
+    # ---- baseline: ORM objects + jsonable_encoder ----
+    @app.get("/orm/candles")
+    def orm_candles(symbol: str = Query(...), limit: int = Query(100),
+                    db: Session = Depends(get_db)):
+        return (
+            db.query(models.Candle5m)
+            .filter(models.Candle5m.symbol == symbol)
+            .order_by(models.Candle5m.start_time.desc())
+            .limit(limit)
+            .all()
+        )
+
+    app.include_router(market.router)
+    app.dependency_overrides[market.get_db] = get_db
+    return app
+
+
+def run(client: TestClient, path: str, rows: int, repeat: int) -> dict:
+    params = {"symbol": "BENCH", "limit": rows}
+    client.get(path, params=params)  # warm up
+
+    t0 = time.perf_counter()
+    for _ in range(repeat):
+        resp = client.get(path, params=params)
+        assert resp.status_code == 200 and len(resp.json()) == rows
+    elapsed = time.perf_counter() - t0
+
+    return {
+        "path": path,
+        "ms_per_request": elapsed / repeat * 1000,
+        "rows_per_second": rows * repeat / elapsed,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--rows", type=int, default=10_000)
+    parser.add_argument("--repeat", type=int, default=20)
+    args = parser.parse_args()
+
+    client = TestClient(build_app(args.rows))
+
+    results = [
+        run(client, "/orm/candles", args.rows, args.repeat),
+        run(client, "/market/candles", args.rows, args.repeat),
+    ]
+    for r in results:
+        print(
+            f"{r['path']:<18} {r['ms_per_request']:8.2f} ms/req "
+            f"{r['rows_per_second']:12,.0f} rows/s"
+        )
+    print(f"speedup: {results[0]['ms_per_request'] / results[1]['ms_per_request']:.1f}x")
+    return results
+
+
+if __name__ == "__main__":
+    main()
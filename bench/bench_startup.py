@@ -0,0 +1,136 @@
+"""
+Cold import and startup time, each measured in a fresh interpreter.
+
+  - import: `import <module>` with no DATABASE_URL / SmartAPI variables set
+    (modules must import without credentials)
+  - startup: uvicorn process spawn -> first 200 from /health, for
+    RUN_MODE=api and RUN_MODE=all; in "all" mode SmartAPI is the local
+    fake with `--login-latency` added to every call, which must not delay
+    the first response since login runs in the background
+
+    python -m bench.bench_startup --runs 10
+"""
+import argparse
+import os
+import socket
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+import requests
+
+from bench.report import latency_summary, save_result
+
+ROOT = Path(__file__).resolve().parents[1]
+MODULES = ("app.config", "app.db.models", "app.main", "app.runtime")
+CREDENTIALS = (
+    "DATABASE_URL", "SMARTAPI_KEY", "SMARTAPI_CLIENT_ID",
+    "SMARTAPI_PIN", "SMARTAPI_TOTP_SECRET",
+)
+
+
+def clean_env(**extra) -> dict:
+    env = {k: v for k, v in os.environ.items() if k not in CREDENTIALS}
+    env["PYTHONPATH"] = str(ROOT)
+    env.update(extra)
+    return env
+
+
+def import_seconds(module: str) -> float:
+    code = (
+        "import time; t = time.perf_counter(); "
+        f"import {module}; print(time.perf_counter() - t)"
+    )
+    out = subprocess.check_output(
+        [sys.executable, "-c", code], cwd=ROOT, env=clean_env(), text=True
+    )
+    return float(out.strip().splitlines()[-1])
+
+
+def free_port() -> int:
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def startup_seconds(env: dict, timeout: float = 30) -> float:
+    port = free_port()
+    url = f"http://127.0.0.1:{port}/health"
+    t0 = time.perf_counter()
+    proc = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "app.main:app",
+         "--port", str(port), "--log-level", "warning"],
+        cwd=ROOT, env=env,
+        stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL,
+    )
+    try:
+        while time.perf_counter() - t0 < timeout:
+            try:
+                if requests.get(url, timeout=1).status_code == 200:
+                    return time.perf_counter() - t0
+            except requests.RequestException:
+                pass
+            if proc.poll() is not None:
+                raise RuntimeError(f"server exited with {proc.returncode}")
+            time.sleep(0.01)
+        raise TimeoutError("server did not answer /health")
+    finally:
+        proc.terminate()
+        proc.wait(10)
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--runs", type=int, default=10)
+    parser.add_argument("--login-latency", type=float, default=1.0,
+                        help="seconds added to every fake SmartAPI call")
+    args = parser.parse_args()
+
+    metrics = {}
+    for module in MODULES:
+        metrics.update(latency_summary(
+            [import_seconds(module) for _ in range(args.runs)],
+            "import_" + module.rsplit(".", 1)[-1],
+        ))
+
+    tmpdir = tempfile.mkdtemp(prefix="bench_startup_")
+    db_env = clean_env(
+        DATABASE_URL=f"sqlite:///{os.path.join(tmpdir, 'bench.db')}",
+        SMARTAPI_KEY="bench", SMARTAPI_CLIENT_ID="bench",
+        SMARTAPI_PIN="bench", SMARTAPI_TOTP_SECRET="JBSWY3DPEHPK3PXP",
+        CANDLE_SPILL_PATH=os.path.join(tmpdir, "spill.jsonl"),
+        SNAPSHOT_PATH=os.path.join(tmpdir, "live_state.snap"),
+    )
+    subprocess.check_call([sys.executable, "-m", "app.db.migrate"], cwd=ROOT, env=db_env)
+
+    metrics.update(latency_summary(
+        [startup_seconds(dict(db_env, RUN_MODE="api")) for _ in range(args.runs)],
+        "startup_api",
+    ))
+
+    fake_port = free_port()
+    fake = subprocess.Popen(
+        [sys.executable, "-m", "tests.fake_smartapi",
+         "--port", str(fake_port), "--latency", str(args.login_latency)],
+        cwd=ROOT, env=db_env,
+        stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL,
+    )
+    try:
+        all_env = dict(db_env, RUN_MODE="all",
+                       SMARTAPI_ROOT=f"http://127.0.0.1:{fake_port}")
+        metrics.update(latency_summary(
+            [startup_seconds(all_env) for _ in range(args.runs)],
+            "startup_all",
+        ))
+    finally:
+        fake.terminate()
+        fake.wait(10)
+
+    params = {"runs": args.runs, "login_latency": args.login_latency}
+    return save_result("startup", params, metrics)
+
+
+if __name__ == "__main__":
+    main()
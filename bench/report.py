@@ -0,0 +1,101 @@
+"""
+Shared helpers for the benchmarks: percentiles, memory and result history.
+
+Every run is appended to bench/results/<name>.jsonl together with the git
+revision and parameters; the previous run with the same parameters is
+printed next to the new numbers so regressions are visible.
+"""
+import json
+import os
+import resource
+import subprocess
+import sys
+import time
+from pathlib import Path
+from typing import Dict, List, Optional, Sequence
+
+RESULTS_DIR = Path(__file__).resolve().parent / "results"
+
+
+def percentile(values: Sequence[float], p: float) -> float:
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    k = (len(ordered) - 1) * p / 100
+    lo = int(k)
+    hi = min(lo + 1, len(ordered) - 1)
+    return ordered[lo] + (ordered[hi] - ordered[lo]) * (k - lo)
+
+
+def latency_summary(seconds: Sequence[float], prefix: str) -> Dict[str, float]:
+    """
+    count / p50 / p99 / max in milliseconds.
+    """
+    return {
+        f"{prefix}_count": len(seconds),
+        f"{prefix}_p50_ms": percentile(seconds, 50) * 1000,
+        f"{prefix}_p99_ms": percentile(seconds, 99) * 1000,
+        f"{prefix}_max_ms": max(seconds) * 1000 if seconds else 0.0,
+    }
+
+
+def max_rss_mb() -> float:
+    rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # kilobytes on Linux, bytes on macOS
+    return rss / (1024 * 1024) if sys.platform == "darwin" else rss / 1024
+
+
+def git_revision() -> Optional[str]:
+    try:
+        return subprocess.check_output(
+            ["git", "rev-parse", "--short", "HEAD"],
+            cwd=Path(__file__).resolve().parent,
+            stderr=subprocess.DEVNULL,
+            text=True,
+        ).strip()
+    except Exception:
+        return None
+
+
+def history(name: str) -> List[dict]:
+    path = RESULTS_DIR / f"{name}.jsonl"
+    if not path.exists():
+        return []
+    with path.open() as f:
+        return [json.loads(line) for line in f if line.strip()]
+
+
+def save_result(name: str, params: dict, metrics: dict) -> dict:
+    """
+    Append a run to the history and print it against the last comparable run.
+    """
+    previous = [r for r in history(name) if r["params"] == params]
+    record = {
+        "name": name,
+        "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "revision": git_revision(),
+        "params": params,
+        "metrics": metrics,
+    }
+
+    RESULTS_DIR.mkdir(exist_ok=True)
+    with (RESULTS_DIR / f"{name}.jsonl").open("a") as f:
+        f.write(json.dumps(record) + "\n")
+
+    last = previous[-1] if previous else None
+    print(f"\n{name} @ {record['revision'] or '?'}")
+    if last:
+        print(f"  vs {last['timestamp']} @ {last['revision'] or '?'}")
+    for key, value in metrics.items():
+        line = f"  {key:<28} {value:14,.3f}"
+        before = last["metrics"].get(key) if last else None
+        if before:
+            line += f"   ({(value - before) / before * 100:+.1f}%)"
+        print(line)
+    return record
+
+
+if __name__ == "__main__":
+    # python -m bench.report <name>: print the stored history
+    for rec in history(sys.argv[1]):
+        print(rec["timestamp"], rec["revision"], json.dumps(rec["metrics"]))
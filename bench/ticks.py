@@ -0,0 +1,85 @@
+"""
+Seeded synthetic tick stream in the SmartStream LTP packet layout.
+
+Prices follow geometric Brownian motion per token; the tick rate is
+multiplied during the opening burst (09:15 + `burst_minutes`), which is
+where the feed and the first bucket close are under the most pressure.
+"""
+import struct
+from datetime import datetime, timedelta
+from typing import Iterator, List, Tuple
+
+import numpy as np
+
+MODE_LTP = 1
+EXCHANGE_NSE = 1
+LTP_PACKET = struct.Struct("<BB25sII")
+
+
+def pack_ltp(token: str, ltp: float, volume: int) -> bytes:
+    """
+    Packet read by WebSocketProvider._handle_binary_tick.
+    """
+    return LTP_PACKET.pack(
+        MODE_LTP, EXCHANGE_NSE, token.encode(), int(round(ltp * 100)), volume
+    )
+
+
+class TickGenerator:
+    def __init__(
+        self,
+        n_tokens: int = 2000,
+        seed: int = 42,
+        start: datetime = datetime(2024, 1, 2, 9, 15),
+        minutes: int = 30,
+        ticks_per_minute: float = 4,
+        burst_minutes: int = 5,
+        burst_factor: float = 5,
+        sigma_per_minute: float = 0.003,
+        first_token: int = 100000,
+    ):
+        self.rng = np.random.default_rng(seed)
+        self.tokens = [str(first_token + i) for i in range(n_tokens)]
+        self.start = start
+        self.minutes = minutes
+        self.ticks_per_minute = ticks_per_minute
+        self.burst_minutes = burst_minutes
+        self.burst_factor = burst_factor
+        self.sigma = sigma_per_minute
+
+        self.open_prices = np.round(self.rng.uniform(50, 5000, n_tokens), 2)
+
+    @property
+    def symbols(self) -> List[str]:
+        return [f"SYN{t}" for t in self.tokens]
+
+    def _rate(self, minute: int) -> float:
+        burst = self.burst_factor if minute < self.burst_minutes else 1
+        return self.ticks_per_minute * burst
+
+    def ticks(self) -> Iterator[Tuple[datetime, bytes]]:
+        """
+        (timestamp, packet) in time order, one second per step.
+        """
+        n = len(self.tokens)
+        prices = self.open_prices.copy()
+        dt = 1 / 60  # minutes per step
+        drift = -0.5 * self.sigma ** 2 * dt
+        scale = self.sigma * np.sqrt(dt)
+
+        for second in range(self.minutes * 60):
+            p = min(self._rate(second // 60) / 60, 1.0)
+            active = np.flatnonzero(self.rng.random(n) < p)
+
+            # GBM step for every token so untraded names keep drifting
+            prices *= np.exp(drift + scale * self.rng.standard_normal(n))
+            volumes = self.rng.integers(1, 500, active.size)
+
+            ts = self.start + timedelta(seconds=second)
+            for i, vol in zip(active.tolist(), volumes.tolist()):
+                yield ts, pack_ltp(self.tokens[i], float(prices[i]), vol)
+
+        # one tick per token after the window closes the last bucket
+        end = self.start + timedelta(minutes=self.minutes)
+        for i, token in enumerate(self.tokens):
+            yield end, pack_ltp(token, float(prices[i]), 1)
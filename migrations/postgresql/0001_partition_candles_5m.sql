@@ -0,0 +1,57 @@
+-- Convert the legacy candles_5m table (surrogate id, btree indexes) into a
+-- monthly RANGE-partitioned table keyed by (symbol, start_time) with a BRIN
+-- index on start_time. No-op when candles_5m is already partitioned.
+DO $$
+DECLARE
+    m date;
+BEGIN
+    IF EXISTS (
+        SELECT 1 FROM pg_partitioned_table p
+        JOIN pg_class c ON c.oid = p.partrelid
+        WHERE c.relname = 'candles_5m'
+    ) THEN
+        RETURN;
+    END IF;
+
+    IF to_regclass('candles_5m') IS NOT NULL THEN
+        ALTER TABLE candles_5m RENAME TO candles_5m_legacy;
+        ALTER TABLE candles_5m_legacy RENAME CONSTRAINT candles_5m_pkey TO candles_5m_legacy_pkey;
+    END IF;
+
+    CREATE TABLE candles_5m (
+        symbol VARCHAR NOT NULL,
+        start_time TIMESTAMP WITHOUT TIME ZONE NOT NULL,
+        open FLOAT,
+        high FLOAT,
+        low FLOAT,
+        close FLOAT,
+        volume FLOAT,
+        PRIMARY KEY (symbol, start_time)
+    ) PARTITION BY RANGE (start_time);
+
+    CREATE INDEX ix_candles_5m_start_time_brin ON candles_5m USING brin (start_time);
+    CREATE TABLE candles_5m_default PARTITION OF candles_5m DEFAULT;
+
+    IF to_regclass('candles_5m_legacy') IS NOT NULL THEN
+        FOR m IN
+            SELECT DISTINCT date_trunc('month', start_time)::date
+            FROM candles_5m_legacy
+            WHERE start_time IS NOT NULL
+        LOOP
+            EXECUTE format(
+                'CREATE TABLE IF NOT EXISTS %I PARTITION OF candles_5m FOR VALUES FROM (%L) TO (%L)',
+                'candles_5m_' || to_char(m, 'YYYY_MM'), m, (m + interval '1 month')::date
+            );
+        END LOOP;
+
+        -- keep the last write for any duplicated (symbol, start_time)
+        INSERT INTO candles_5m (symbol, start_time, open, high, low, close, volume)
+        SELECT DISTINCT ON (symbol, start_time)
+               symbol, start_time, open, high, low, close, volume
+        FROM candles_5m_legacy
+        WHERE symbol IS NOT NULL AND start_time IS NOT NULL
+        ORDER BY symbol, start_time, id DESC;
+
+        DROP TABLE candles_5m_legacy;
+    END IF;
+END $$;
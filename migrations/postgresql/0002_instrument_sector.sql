@@ -0,0 +1,2 @@
+-- Sector grouping for market breadth (app/services/breadth_service.py).
+ALTER TABLE instruments ADD COLUMN IF NOT EXISTS sector VARCHAR;
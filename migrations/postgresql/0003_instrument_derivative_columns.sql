@@ -0,0 +1,5 @@
+-- Derivative contract fields (option chain / futures scanners).
+ALTER TABLE instruments ADD COLUMN IF NOT EXISTS expiry DATE;
+ALTER TABLE instruments ADD COLUMN IF NOT EXISTS strike FLOAT;
+ALTER TABLE instruments ADD COLUMN IF NOT EXISTS option_type VARCHAR;
+CREATE INDEX IF NOT EXISTS ix_instruments_expiry ON instruments (expiry);
@@ -0,0 +1,6 @@
+-- 60m horizon bar time; ret_60m / hit_60m were filled from the 15:25 bar
+-- for signals after 14:25, i.e. from a shorter horizon. Clear those.
+ALTER TABLE signal_outcomes ADD COLUMN IF NOT EXISTS t_60m TIMESTAMP;
+UPDATE signal_outcomes SET t_60m = signal_time + INTERVAL '60 minutes' WHERE t_60m IS NULL;
+UPDATE signal_outcomes SET ret_60m = NULL, hit_60m = NULL
+WHERE horizon_end < t_60m;
@@ -0,0 +1,40 @@
+"""
+Every test runs against a throwaway SQLite database with dummy SmartAPI
+credentials; nothing here can reach a real database or broker.
+"""
+import os
+import tempfile
+
+_tmpdir = tempfile.mkdtemp(prefix="nse_fno_tests_")
+os.environ["DATABASE_URL"] = f"sqlite:///{os.path.join(_tmpdir, 'test.db')}"
+os.environ["SMARTAPI_KEY"] = "test"
+os.environ["SMARTAPI_CLIENT_ID"] = "test"
+os.environ["SMARTAPI_PIN"] = "0000"
+os.environ["SMARTAPI_TOTP_SECRET"] = "JBSWY3DPEHPK3PXP"
+os.environ["SMARTAPI_ROOT"] = "http://127.0.0.1:9"
+os.environ["BUS_BACKEND"] = "memory"
+os.environ["RUN_MODE"] = "api"
+os.environ["CANDLE_SPILL_PATH"] = os.path.join(_tmpdir, "candle_spill.jsonl")
+os.environ["FUTURES_SPILL_PATH"] = os.path.join(_tmpdir, "futures_spill.jsonl")
+os.environ["SNAPSHOT_PATH"] = os.path.join(_tmpdir, "live_state.snap")
+
+import pytest
+
+from app.db.migrate import run_migrations
+
+
+@pytest.fixture(scope="session", autouse=True)
+def schema():
+    run_migrations()
+
+
+@pytest.fixture
+def db():
+    from app.db.session import SessionLocal
+
+    session = SessionLocal()
+    try:
+        yield session
+    finally:
+        session.rollback()
+        session.close()
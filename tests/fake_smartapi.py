@@ -0,0 +1,181 @@
+"""
+Local stand-in for the SmartAPI REST endpoints used by SmartAPIProvider
+(tests and bench/bench_startup.py).
+
+    python -m tests.fake_smartapi --port 8765
+    SMARTAPI_ROOT=http://127.0.0.1:8765 ...
+
+Serves login / token refresh / 5m candle history with deterministic
+prices, speaks HTTP/1.1 keep-alive and counts logins, refreshes, requests
+and TCP connections so callers can check session and connection reuse.
+"""
+import argparse
+import base64
+import json
+import random
+import time
+import zlib
+from datetime import datetime, timedelta
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from threading import Lock, Thread
+
+from logzero import logger
+
+from app.providers.smartapi_provider import ROUTES
+
+IST = "+05:30"
+
+
+def make_jwt(ttl: float, n: int) -> str:
+    def b64(obj):
+        return base64.urlsafe_b64encode(json.dumps(obj).encode()).rstrip(b"=").decode()
+
+    return ".".join([
+        b64({"alg": "HS512"}),
+        b64({"sub": "FAKE", "n": n, "exp": int(time.time() + ttl)}),
+        "sig",
+    ])
+
+
+def fake_candles(token: str, start: datetime, end: datetime) -> list:
+    """
+    Deterministic random-walk 5m bars within market hours.
+    """
+    rows = []
+    t = start.replace(second=0, microsecond=0)
+    t -= timedelta(minutes=t.minute % 5)
+    while t <= end:
+        if t.weekday() < 5 and (9, 15) <= (t.hour, t.minute) <= (15, 25):
+            rnd = random.Random(f"{token}:{t.isoformat()}")
+            base = 100 + (zlib.crc32(token.encode()) % 1000) + rnd.uniform(-2, 2)
+            o = round(base, 2)
+            c = round(base * (1 + rnd.uniform(-0.01, 0.01)), 2)
+            h = round(max(o, c) * (1 + rnd.uniform(0, 0.005)), 2)
+            l = round(min(o, c) * (1 - rnd.uniform(0, 0.005)), 2)
+            rows.append([t.isoformat() + IST, o, h, l, c, rnd.randint(1000, 100000)])
+        t += timedelta(minutes=5)
+    return rows
+
+
+class FakeSmartAPI:
+    def __init__(self, host="127.0.0.1", port=0, token_ttl=3600, latency=0.0):
+        self.token_ttl = token_ttl
+        self.latency = latency
+        self.stats = {"logins": 0, "refreshes": 0, "candle_requests": 0, "connections": 0,
+                      "failed": 0}
+        # HTTP statuses to answer the next requests with (e.g. 503)
+        self.fail_with = []
+        self.valid_jwts = set()
+        self._lock = Lock()
+
+        fake = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+
+            def setup(self):
+                super().setup()
+                with fake._lock:
+                    fake.stats["connections"] += 1
+
+            def log_message(self, *args):
+                pass
+
+            def do_POST(self):
+                body = self.rfile.read(int(self.headers.get("Content-Length", 0)) or 0)
+                payload = json.loads(body or b"{}")
+                if fake.latency:
+                    time.sleep(fake.latency)
+                status, data = fake.fail() or fake.handle(
+                    self.path, payload, self.headers.get("Authorization")
+                )
+                raw = json.dumps(data).encode()
+                self.send_response(status)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(raw)))
+                self.end_headers()
+                self.wfile.write(raw)
+
+        self.server = ThreadingHTTPServer((host, port), Handler)
+        self.server.daemon_threads = True
+        self._thread = None
+
+    @property
+    def url(self) -> str:
+        host, port = self.server.server_address[:2]
+        return f"http://{host}:{port}"
+
+    # -------------------------------------------------
+    def _issue(self) -> dict:
+        with self._lock:
+            n = self.stats["logins"] + self.stats["refreshes"]
+            jwt = make_jwt(self.token_ttl, n)
+            self.valid_jwts.add(jwt)
+        return {"jwtToken": jwt, "refreshToken": f"refresh-{n}", "feedToken": f"feed-{n}"}
+
+    def fail(self):
+        with self._lock:
+            if not self.fail_with:
+                return None
+            self.stats["failed"] += 1
+            return self.fail_with.pop(0), {"status": False, "message": "Service Unavailable"}
+
+    def revoke_all(self):
+        with self._lock:
+            self.valid_jwts.clear()
+
+    def handle(self, path: str, payload: dict, auth: str):
+        if path == ROUTES["login"]:
+            with self._lock:
+                self.stats["logins"] += 1
+            return 200, {"status": True, "message": "SUCCESS", "data": self._issue()}
+
+        jwt = (auth or "").removeprefix("Bearer ")
+        if jwt not in self.valid_jwts:
+            return 200, {"status": False, "message": "Invalid Token", "errorcode": "AG8001"}
+
+        if path == ROUTES["token"]:
+            with self._lock:
+                self.stats["refreshes"] += 1
+            return 200, {"status": True, "message": "SUCCESS", "data": self._issue()}
+
+        if path == ROUTES["candles"]:
+            with self._lock:
+                self.stats["candle_requests"] += 1
+            start = datetime.strptime(payload["fromdate"], "%Y-%m-%d %H:%M")
+            end = datetime.strptime(payload["todate"], "%Y-%m-%d %H:%M")
+            return 200, {
+                "status": True,
+                "message": "SUCCESS",
+                "data": fake_candles(payload["symboltoken"], start, end),
+            }
+
+        return 404, {"status": False, "message": "Not found"}
+
+    # -------------------------------------------------
+    def start(self) -> "FakeSmartAPI":
+        self._thread = Thread(target=self.server.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self.server.shutdown()
+        self.server.server_close()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--token-ttl", type=float, default=3600)
+    parser.add_argument("--latency", type=float, default=0.0)
+    args = parser.parse_args()
+
+    fake = FakeSmartAPI(port=args.port, token_ttl=args.token_ttl, latency=args.latency)
+    logger.info(f"Fake SmartAPI on {fake.url}")
+    fake.server.serve_forever()
@@ -0,0 +1,51 @@
+from datetime import date, datetime
+
+from app.db import models
+from app.db.session import SessionLocal
+from app.services.breadth_service import BreadthService
+
+DAY = date(2024, 3, 4)
+
+
+def close(svc, token, price, minute=20):
+    svc.on_candle_close({
+        "token": token, "start": datetime(2024, 3, 4, 10, minute), "close": price,
+    })
+
+
+def test_levels_written_after_boot_are_picked_up(db):
+    svc = BreadthService(settle_seconds=60)
+    svc.load(SessionLocal, {"1": "BRA", "2": "BRB"})
+
+    db.add(models.DailyLevel(symbol="BRA", trade_date=DAY, pdc=100, pdh=105, pdl=95))
+    db.commit()
+
+    svc.refresh_levels(DAY)
+    assert svc.missing_levels == 1
+
+    close(svc, "1", 110)
+    close(svc, "2", 90)
+    svc.stop()
+    snap = svc.compute()
+    assert snap["reporting"] == 1 and snap["pct_above_pdh"] == 100.0
+
+    # the scanner stores BRB's levels later in the day
+    db.add(models.DailyLevel(symbol="BRB", trade_date=DAY, pdc=100, pdh=105, pdl=95))
+    db.commit()
+    svc.publish()
+
+    assert svc.missing_levels == 0
+    snap = svc.compute()
+    assert snap["reporting"] == 2
+    assert (snap["advancers"], snap["decliners"]) == (1, 1)
+    assert snap["pct_below_pdl"] == 50.0
+
+
+def test_candle_close_does_not_touch_the_database():
+    svc = BreadthService(settle_seconds=60)
+    svc.load(SessionLocal, {"1": "BRC"})
+    svc._db_factory = None  # any query from the tick path would now fail
+
+    close(svc, "1", 100)
+    svc.stop()
+    assert svc.close[0] == 100
@@ -0,0 +1,32 @@
+import time
+
+from app.bus import InMemoryBus, PostgresBus
+
+
+def test_in_memory_round_trip_survives_a_failing_handler():
+    bus = InMemoryBus()
+    got = []
+
+    def broken(message):
+        raise RuntimeError("boom")
+
+    bus.subscribe(broken)
+    bus.subscribe(got.append)
+    bus.publish({"type": "signal", "payload": {"symbol": "X"}})
+    bus.unsubscribe(got.append)
+    bus.publish({"type": "signal", "payload": {"symbol": "Y"}})
+
+    assert got == [{"type": "signal", "payload": {"symbol": "X"}}]
+
+
+def test_postgres_publish_never_blocks_or_raises():
+    # nothing listens on port 9: every NOTIFY fails on the sender thread
+    bus = PostgresBus("postgresql://nobody@127.0.0.1:9/none", max_pending=2)
+
+    t0 = time.perf_counter()
+    for _ in range(5):
+        bus.publish({"type": "candle", "payload": {}})
+    assert time.perf_counter() - t0 < 0.5
+
+    bus.close(timeout=10)
+    assert bus._sender is None
@@ -0,0 +1,47 @@
+from app.cache import ResponseCache
+
+
+class FakeRequest:
+    headers = {}
+
+
+def test_payload_built_across_an_invalidation_is_not_stored():
+    cache = ResponseCache()
+
+    def build():
+        # the scanner commits and invalidates while this read runs
+        cache.invalidate("signals")
+        return ["stale"]
+
+    body = cache.respond(FakeRequest(), "signals:latest", build, 60, ("signals",)).body
+    assert body == b'["stale"]'
+    assert cache.get("signals:latest") is None
+
+    cache.respond(FakeRequest(), "signals:latest", lambda: ["fresh"], 60, ("signals",))
+    assert cache.get("signals:latest").body == b'["fresh"]'
+
+
+def test_payload_built_across_a_clear_is_not_stored():
+    cache = ResponseCache()
+
+    def build():
+        # untagged and never-invalidated tags must be covered as well
+        cache.clear()
+        return ["stale"]
+
+    cache.respond(FakeRequest(), "stats", build, 60, ("signal_stats",))
+    cache.respond(FakeRequest(), "untagged", build, 60)
+    assert cache.get("stats") is None and cache.get("untagged") is None
+
+    cache.respond(FakeRequest(), "stats", lambda: ["fresh"], 60, ("signal_stats",))
+    assert cache.get("stats").body == b'["fresh"]'
+
+
+def test_etag_match_returns_304():
+    cache = ResponseCache()
+    etag = cache.put("k", {"a": 1}, 60).etag
+
+    class Conditional:
+        headers = {"if-none-match": etag}
+
+    assert cache.respond(Conditional(), "k", dict, 60).status_code == 304
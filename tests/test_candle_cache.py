@@ -0,0 +1,59 @@
+from datetime import date, datetime, timedelta
+
+from app.providers.smartapi_provider import SmartAPIError
+from app.services.candle_cache_service import CachedCandleProvider
+
+# a recent weekday: older bars are never kept in memory
+DAY = date.today() - timedelta(days=1)
+while DAY.weekday() >= 5:
+    DAY -= timedelta(days=1)
+FROM = datetime.combine(DAY, datetime.min.time()).replace(hour=10)
+TO = FROM + timedelta(minutes=10)
+
+
+class FlakyProvider:
+    def __init__(self, answers):
+        self.answers = list(answers)
+        self.calls = 0
+
+    def fetch_5m_candles(self, exchange, token, from_dt, to_dt):
+        self.calls += 1
+        answer = self.answers.pop(0)
+        if isinstance(answer, Exception):
+            raise answer
+        return answer
+
+
+def row(minute):
+    return [f"{DAY}T10:{minute:02d}:00+05:30", 1, 2, 0.5, 1.5, 100]
+
+
+def test_failed_fetch_is_not_remembered_as_empty():
+    provider = FlakyProvider([SmartAPIError("AB1004: rate limit"),
+                              [row(0), row(5), row(10)]])
+    cache = CachedCandleProvider(provider)
+
+    assert cache.get_5m_candles("NSE", "CC1", FROM, TO) == []
+    assert len(cache.get_5m_candles("NSE", "CC1", FROM, TO)) == 3
+    assert provider.calls == 2
+
+
+def test_empty_success_is_remembered_until_ttl():
+    provider = FlakyProvider([[row(0)], [row(5)]])
+    cache = CachedCandleProvider(provider, empty_ttl=900)
+
+    assert len(cache.get_5m_candles("NSE", "CC2", FROM, TO)) == 1
+    assert len(cache.get_5m_candles("NSE", "CC2", FROM, TO)) == 1
+    assert provider.calls == 1
+
+    cache._empty = {k: 0.0 for k in cache._empty}
+    assert len(cache.get_5m_candles("NSE", "CC2", FROM, TO)) == 2
+    assert provider.calls == 2
+
+
+def test_evict_before_drops_old_bars_and_tokens():
+    cache = CachedCandleProvider(FlakyProvider([[row(0), row(5), row(10)]]))
+    cache.get_5m_candles("NSE", "CC3", FROM, TO)
+
+    cache.evict_before(FROM + timedelta(days=1))
+    assert cache._bars == {} and cache._empty == {}
@@ -0,0 +1,60 @@
+import time
+from datetime import datetime
+
+from app.db import models
+from app.services.candle_builder import CandleBuilder
+from app.services.candle_flusher import CandleFlusher
+
+START = datetime(2024, 3, 4, 10, 0)
+
+
+def candle(token, close):
+    return {"token": token, "start": START, "open": 1.0, "high": 2.0,
+            "low": 0.5, "close": close, "volume": 10.0}
+
+
+def wait_for(cond, timeout=5.0):
+    deadline = time.monotonic() + timeout
+    while not cond() and time.monotonic() < deadline:
+        time.sleep(0.01)
+    return cond()
+
+
+def test_failed_batches_spill_and_replay_once_writes_succeed(tmp_path):
+    written = []
+    down = True
+
+    def write(batch):
+        if down:
+            raise ConnectionError("database down")
+        written.extend(batch)
+
+    flusher = CandleFlusher(write, str(tmp_path / "spill.jsonl"), min_batch=2,
+                            max_wait=0.05, max_retries=1, backoff=0.05, max_backoff=0.05)
+    flusher.put(candle("A", 1.0))
+    flusher.put(candle("B", 1.0))
+
+    assert wait_for(lambda: flusher.spill_pending == 2)
+    assert (tmp_path / "spill.jsonl").exists()
+
+    down = False
+    assert wait_for(lambda: flusher.spill_pending == 0)
+    flusher.stop()
+
+    assert sorted(c["token"] for c in written) == ["A", "B"]
+    assert written[0]["start"] == START
+    assert not (tmp_path / "spill.jsonl.replay").exists()
+
+
+def test_sqlite_upsert_replaces_the_bar(db, tmp_path):
+    db.add(models.Instrument(token="UPS1", symbol="UPSERT", name="UPSERT",
+                             exchange="NSE", segment="EQ"))
+    db.commit()
+
+    builder = CandleBuilder(spill_path=str(tmp_path / "spill.jsonl"))
+    builder._write_candles_to_db([candle("UPS1", 1.5)])
+    builder._write_candles_to_db([candle("UPS1", 1.8)])
+    builder.stop()
+
+    rows = db.query(models.Candle5m).filter(models.Candle5m.symbol == "UPSERT").all()
+    assert [(r.start_time, r.close) for r in rows] == [(START, 1.8)]
@@ -0,0 +1,84 @@
+import io
+from datetime import date, datetime
+
+import pyarrow as pa
+import pyarrow.ipc
+import pyarrow.parquet as pq
+import pytest
+from fastapi.testclient import TestClient
+
+from app.db import models
+from app.db.session import SessionLocal
+from app.main import create_app
+from app.services.export_service import export_to_file, stream_export
+
+DAY = date(2023, 2, 1)
+
+
+@pytest.fixture(scope="module", autouse=True)
+def candles():
+    db = SessionLocal()
+    for symbol, minute, close in (("EXPB", 15, 50.0), ("EXPA", 20, 101.0), ("EXPA", 15, 100.0)):
+        db.add(models.Candle5m(symbol=symbol, start_time=datetime(2023, 2, 1, 9, minute),
+                               open=close, high=close, low=close, close=close, volume=1))
+    # outside the range
+    db.add(models.Candle5m(symbol="EXPA", start_time=datetime(2023, 2, 2, 9, 15),
+                           open=1, high=1, low=1, close=1, volume=1))
+    db.commit()
+    db.close()
+
+
+def read(data: bytes, fmt: str) -> pa.Table:
+    if fmt == "parquet":
+        return pq.read_table(io.BytesIO(data))
+    return pa.ipc.open_stream(data).read_all()
+
+
+def rows(table: pa.Table):
+    return list(zip(table.column("symbol").to_pylist(), table.column("close").to_pylist()))
+
+
+EXPECTED = [("EXPA", 100.0), ("EXPA", 101.0), ("EXPB", 50.0)]
+
+
+@pytest.mark.parametrize("fmt", ["parquet", "arrow"])
+def test_stream_export(fmt):
+    chunks = list(stream_export(SessionLocal, "candles_5m", DAY, DAY,
+                                ["EXPA", "EXPB"], fmt, batch_size=2))
+
+    table = read(b"".join(chunks), fmt)
+    assert rows(table) == EXPECTED
+    assert table.schema.field("start_time").type == pa.timestamp("us")
+    # one chunk per record batch, plus the footer
+    assert len(chunks) == 3
+
+
+@pytest.mark.parametrize("fmt", ["parquet", "arrow"])
+def test_export_to_file(db, tmp_path, fmt):
+    path = tmp_path / f"candles.{fmt}"
+    with open(path, "wb") as f:
+        n = export_to_file(db, "candles_5m", DAY, DAY, f, ["EXPA", "EXPB"], fmt, batch_size=2)
+
+    assert n == 3
+    table = read(path.read_bytes(), fmt)
+    assert rows(table) == EXPECTED
+    if fmt == "parquet":
+        assert pq.ParquetFile(path).num_row_groups == 2
+
+
+def test_export_endpoint():
+    client = TestClient(create_app())
+
+    resp = client.get("/export/candles_5m", params={
+        "start": "2023-02-01", "end": "2023-02-01", "symbols": "expa", "format": "arrow",
+    })
+    assert resp.status_code == 200
+    assert resp.headers["content-type"] == "application/vnd.apache.arrow.stream"
+    assert 'filename="candles_5m_2023-02-01_2023-02-01.arrow"' in resp.headers["content-disposition"]
+    assert rows(read(resp.content, "arrow")) == EXPECTED[:2]
+
+    resp = client.get("/export/nope", params={"start": "2023-02-01", "end": "2023-02-01"})
+    assert resp.status_code == 404
+
+    resp = client.get("/export/candles_5m", params={"start": "2023-02-02", "end": "2023-02-01"})
+    assert resp.status_code == 400
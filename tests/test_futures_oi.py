@@ -0,0 +1,96 @@
+from datetime import date, datetime
+
+import numpy as np
+
+from app.db import models
+from app.services.candle_builder import CandleBuilder
+from app.services.futures_oi_service import LONG_BUILDUP, SHORT_BUILDUP, FuturesOIScanner
+from app.services.snapshot_service import decode, encode
+
+
+def at(minute, second=0):
+    return datetime(2024, 3, 4, 10, minute, second)
+
+
+def scanner(symbols):
+    s = FuturesOIScanner()
+    n = len(symbols)
+    s.index = {f"F{i}": i for i in range(n)}
+    s.symbols = list(symbols)
+    s.expiries = [date(2024, 3, 28)] * n
+    for name in ("close", "prev_close", "oi", "oi_change", "spot"):
+        setattr(s, name, np.full(n, np.nan))
+    s.basis_mean, s.basis_var = np.zeros(n), np.zeros(n)
+    s.basis_n = np.zeros(n, dtype=np.int64)
+    return s
+
+
+def test_clock_close_includes_contracts_that_did_not_tick_again(tmp_path):
+    s = scanner(["LIQ", "THIN"])
+    builder = CandleBuilder(on_candle_close=s.on_candle_close,
+                            spill_path=str(tmp_path / "spill.jsonl"))
+
+    # both trade in 10:00; only LIQ trades again in 10:05
+    builder.update_tick("F0", 100.0, 0, ts=at(0), oi=1000)
+    builder.update_tick("F0", 101.0, 0, ts=at(4), oi=1050)
+    builder.update_tick("F1", 200.0, 0, ts=at(1), oi=500)
+    builder.update_tick("F1", 198.0, 0, ts=at(3), oi=520)
+    builder.update_tick("F0", 101.0, 0, ts=at(5, 1), oi=1050)
+
+    assert builder.close_before(at(5)) == 1
+    hits = {h["symbol"]: h["rule"] for h in s.scan()}
+    builder.stop()
+
+    assert hits == {"LIQ": LONG_BUILDUP, "THIN": SHORT_BUILDUP}
+    assert builder.carry_oi == {"F1": 520}
+
+
+def test_carried_oi_starts_the_next_bar(tmp_path):
+    builder = CandleBuilder(spill_path=str(tmp_path / "spill.jsonl"))
+    builder.update_tick("F0", 100.0, 0, ts=at(0), oi=1000)
+    builder.close_before(at(5))
+    builder.update_tick("F0", 100.0, 0, ts=at(7), oi=1100)
+    builder.stop()
+
+    assert builder.live["F0"]["oi_open"] == 1000
+
+
+def test_snapshot_keeps_futures_bars_and_basis():
+    bar = ("F0", at(5), 1.0, 2.0, 0.5, 1.5, 10.0, 1100.0, 1000.0)
+    data = encode([], set(), [], [], 0.0, [bar], [("LIQ", 0.4, 0.01, 12)])
+    snap = decode(data)
+
+    assert snap["futures"]["F0"]["oi_open"] == 1000.0
+    assert snap["futures"]["F0"]["start"] == at(5)
+    assert snap["basis"] == [("LIQ", 0.4, 0.01, 12)]
+
+    s = scanner(["LIQ"])
+    assert s.restore_basis(snap["basis"]) == 1
+    assert s.basis_n[0] == 12
+
+
+def test_futures_bars_do_not_overwrite_cash_bars(db, tmp_path):
+    # a master where the future's symbol is just the underlying's
+    db.add_all([
+        models.Instrument(symbol="COLLX", token="cash-collx", name="COLLX",
+                          exchange="NSE", segment="FNO"),
+        models.Instrument(symbol="COLLX", token="fut-collx", name="COLLX",
+                          exchange="NFO", segment="FUT", expiry=date(2024, 3, 28)),
+    ])
+    db.commit()
+
+    builder = CandleBuilder(spill_path=str(tmp_path / "spill.jsonl"))
+    builder.stop()
+    bar = {"start": at(0), "open": 1.0, "high": 1.0, "low": 1.0, "volume": 1}
+    builder._write_candles_to_db([
+        dict(bar, token="cash-collx", close=100.0),
+        dict(bar, token="fut-collx", close=100.6),
+    ])
+
+    stored = dict(
+        db.query(models.Candle5m.symbol, models.Candle5m.close)
+        .filter(models.Candle5m.start_time == at(0))
+        .filter(models.Candle5m.symbol.like("COLLX%"))
+        .all()
+    )
+    assert stored == {"COLLX": 100.0, "COLLX28MAR24FUT": 100.6}
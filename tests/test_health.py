@@ -0,0 +1,55 @@
+import time
+from datetime import datetime
+
+from fastapi.testclient import TestClient
+
+from app.config import settings
+from app.main import create_app
+from app.metrics import FEED_LAST_TICK
+from app.routers import health
+
+
+def test_api_worker_health_ignores_the_feed():
+    # conftest runs in RUN_MODE=api: no feed in this process, never stale
+    with TestClient(create_app()) as client:
+        body = client.get("/health").json()
+
+    assert body["status"] == "ok"
+    assert body["mode"] == "api"
+    assert "feed" not in body
+
+
+def test_market_open_skips_weekends():
+    assert health.market_open(datetime(2024, 3, 4, 11, 0))         # Monday
+    assert not health.market_open(datetime(2024, 3, 4, 8, 59))
+    assert not health.market_open(datetime(2024, 3, 4, 15, 31))
+    assert not health.market_open(datetime(2024, 3, 9, 11, 0))     # Saturday
+    assert not health.market_open(datetime(2024, 3, 10, 11, 0))    # Sunday
+
+
+def test_feed_health_goes_stale_without_ticks(monkeypatch):
+    monkeypatch.setattr(settings, "RUN_MODE", "all")
+    monkeypatch.setattr(health, "market_open", lambda now: True)
+    client = TestClient(create_app())
+
+    FEED_LAST_TICK.set(time.time() - health.STALE_AFTER - 5)
+    body = client.get("/health").json()
+    assert body["status"] == "degraded" and body["feed"]["stale"]
+    assert "candle_flush" in body["queues"]
+
+    FEED_LAST_TICK.set(time.time())
+    assert client.get("/health").json()["status"] == "ok"
+
+    monkeypatch.setattr(health, "market_open", lambda now: False)
+    FEED_LAST_TICK.set(0)
+    assert client.get("/health").json()["status"] == "ok"
+
+
+def test_metrics_exposition():
+    FEED_LAST_TICK.set(1234.5)
+    resp = TestClient(create_app()).get("/metrics")
+
+    assert resp.status_code == 200
+    assert resp.headers["content-type"].startswith("text/plain")
+    assert "# TYPE feed_last_tick_timestamp gauge" in resp.text
+    assert "feed_last_tick_timestamp 1234.5" in resp.text
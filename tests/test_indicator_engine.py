@@ -0,0 +1,53 @@
+import random
+import statistics
+
+import pytest
+
+from app.services.indicator_engine import RollingWindow
+
+
+def naive(values, size):
+    window = values[-size:]
+    std = statistics.pstdev(window) if len(window) >= 2 else None
+    return statistics.fmean(window), std
+
+
+@pytest.mark.parametrize("size", [1, 2, 5, 20])
+def test_matches_naive_recompute(size):
+    rng = random.Random(size)
+    w = RollingWindow(size)
+    seen = []
+    for _ in range(500):
+        x = rng.uniform(-50, 50)
+        w.push(x)
+        seen.append(x)
+
+        mean, std = naive(seen, size)
+        assert w.mean == pytest.approx(mean, rel=1e-9, abs=1e-9)
+        if std is None:
+            assert w.std is None
+        else:
+            assert w.std == pytest.approx(std, rel=1e-7, abs=1e-9)
+        assert w.full == (len(seen) >= size)
+
+
+def test_large_level_small_spread_is_stable():
+    # prices around 1e6 with paise-sized moves: E[x^2] - E[x]^2 cancels badly here
+    rng = random.Random(7)
+    w = RollingWindow(20)
+    seen = []
+    for _ in range(5000):
+        x = 1_000_000 + rng.uniform(-0.05, 0.05)
+        w.push(x)
+        seen.append(x)
+
+    _, std = naive(seen, 20)
+    assert w.std == pytest.approx(std, rel=1e-6)
+
+
+def test_constant_series_has_zero_std():
+    w = RollingWindow(10)
+    for _ in range(37):
+        w.push(123456.789)
+    assert w.mean == pytest.approx(123456.789)
+    assert w.std == pytest.approx(0.0, abs=1e-9)
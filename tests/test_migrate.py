@@ -0,0 +1,68 @@
+import pytest
+from sqlalchemy import create_engine, inspect
+
+from app.db.migrate import MIGRATIONS_DIR, migration_scripts, run_migrations
+
+
+def test_postgres_scripts_are_found():
+    scripts = migration_scripts("postgresql")
+    assert scripts
+    assert all(p.parent == MIGRATIONS_DIR / "postgresql" for p in scripts)
+    assert [p.name for p in scripts] == sorted(p.name for p in scripts)
+
+
+def test_unknown_dialect_fails_loudly():
+    with pytest.raises(RuntimeError):
+        migration_scripts("mysql")
+
+
+def test_sqlite_builds_schema_from_models(tmp_path):
+    engine = create_engine(f"sqlite:///{tmp_path / 'm.db'}")
+    run_migrations(engine)
+    run_migrations(engine)  # idempotent
+
+    columns = {c["name"] for c in inspect(engine).get_columns("instruments")}
+    assert {"sector", "expiry", "strike", "option_type"} <= columns
+    assert {"symbol", "start_time"} == {
+        c["name"] for c in inspect(engine).get_columns("candles_5m") if c["primary_key"]
+    }
+
+
+def test_postgres_scripts_add_every_instrument_column():
+    """
+    create_all never alters an existing table: each Instrument column
+    added after the baseline needs an ADD COLUMN script.
+    """
+    sql = "\n".join(p.read_text() for p in migration_scripts("postgresql"))
+    for column in ("sector", "expiry", "strike", "option_type"):
+        assert f"ADD COLUMN IF NOT EXISTS {column} " in sql
+
+
+def test_percent_signs_reach_the_driver_unchanged(tmp_path, monkeypatch):
+    """
+    0001 builds partition DDL with format('%I ... %L'); the script must be
+    executed without parameter processing.
+    """
+    from app.db import migrate
+
+    sql = "CREATE TABLE pct_check (v VARCHAR DEFAULT 'a%Ib%Lc%%d')"
+    (tmp_path / "scripts").mkdir()
+    (tmp_path / "scripts" / "0001_pct.sql").write_text(sql)
+    monkeypatch.setattr(migrate, "MIGRATIONS_DIR", tmp_path)
+    monkeypatch.setitem(migrate.SCRIPT_DIRS, "sqlite", "scripts")
+
+    engine = create_engine(f"sqlite:///{tmp_path / 'm.db'}")
+    sent = []
+    real = engine.dialect.do_execute_no_params
+    monkeypatch.setattr(
+        engine.dialect, "do_execute_no_params",
+        lambda cursor, statement, context=None: (
+            sent.append(statement), real(cursor, statement, context)
+        ),
+    )
+
+    run_migrations(engine)
+    assert sent == [sql]
+    with engine.connect() as conn:
+        conn.exec_driver_sql("INSERT INTO pct_check DEFAULT VALUES")
+        assert conn.exec_driver_sql("SELECT v FROM pct_check").scalar() == "a%Ib%Lc%%d"
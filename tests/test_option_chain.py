@@ -0,0 +1,157 @@
+import math
+from datetime import date, timedelta
+
+import numpy as np
+import pytest
+
+from app.db import models
+from app.services import option_chain_service as ocs
+from app.services.option_chain_service import (
+    OptionChain,
+    OptionChainService,
+    bs_price,
+    greeks,
+    implied_vol,
+    spot_bucket,
+)
+
+EXPIRY = date.today() + timedelta(days=30)
+
+
+def test_prices_match_reference_values():
+    # Hull, Options Futures and Other Derivatives, example 15.6
+    call = bs_price(42.0, 40.0, 0.5, 0.1, 0.2, True)
+    put = bs_price(42.0, 40.0, 0.5, 0.1, 0.2, False)
+    assert float(call) == pytest.approx(4.76, abs=0.005)
+    assert float(put) == pytest.approx(0.81, abs=0.005)
+
+
+def test_greeks_match_reference_values():
+    # Hull example 19.1 / 19.4 / 19.6 / 19.7: S=49, K=50, r=5%, sigma=20%, 20 weeks
+    g = greeks(49.0, 50.0, 0.3846, 0.05, 0.2, True)
+    assert float(g["delta"]) == pytest.approx(0.522, abs=0.001)
+    assert float(g["gamma"]) == pytest.approx(0.066, abs=0.001)
+    assert float(g["vega"]) == pytest.approx(12.1 / 100, abs=0.001)
+    assert float(g["theta"]) == pytest.approx(-4.31 / 365, abs=0.01 / 365)
+
+
+def test_implied_vol_round_trip():
+    K = np.array([80.0, 95.0, 100.0, 105.0, 120.0, 100.0])
+    is_call = np.array([True, True, True, False, False, False])
+    sigma = np.array([0.35, 0.25, 0.2, 0.22, 0.3, 0.45])
+    prices = bs_price(100.0, K, 0.25, 0.065, sigma, is_call)
+
+    iv = implied_vol(prices, 100.0, K, 0.25, 0.065, is_call)
+    np.testing.assert_allclose(iv, sigma, atol=1e-5)
+
+
+def test_implied_vol_rejects_prices_outside_bounds():
+    iv = implied_vol(np.array([0.5, 150.0]), 100.0, np.array([90.0, 100.0]),
+                     0.25, 0.065, np.array([True, True]))
+    assert np.isnan(iv).all()
+
+
+# -------------------------------------------------
+# snapshot cache
+# -------------------------------------------------
+def chain():
+    strikes = np.array([90.0, 100.0, 110.0])
+    c = OptionChain("OCX", EXPIRY, strikes, ["c1", "c2", "c3"], ["p1", "p2", "p3"])
+    for i, k in enumerate(strikes):
+        c.set_quote(True, i, float(bs_price(100.0, k, 30 / 365, 0.065, 0.2, True)), 100)
+        c.set_quote(False, i, float(bs_price(100.0, k, 30 / 365, 0.065, 0.2, False)), 200)
+    return c
+
+
+def counting(c, monkeypatch, during=None):
+    calls = []
+    compute = c.compute
+
+    def spy(*args, **kwargs):
+        calls.append(1)
+        if during:
+            during()
+        return compute(*args, **kwargs)
+
+    monkeypatch.setattr(c, "compute", spy)
+    return calls
+
+
+def test_snapshot_is_cached_within_a_spot_bucket(monkeypatch):
+    c = chain()
+    calls = counting(c, monkeypatch)
+    spot = math.exp(9210 * ocs.SPOT_BUCKET)   # centre of a bucket (~100)
+
+    first = c.snapshot(spot, 0.065)
+    assert c.snapshot(spot, 0.065) is first
+    assert spot_bucket(spot * 1.0001) == spot_bucket(spot)
+    assert c.snapshot(spot * 1.0001, 0.065) is first
+    assert len(calls) == 1
+
+    c.snapshot(spot * 1.01, 0.065)
+    assert len(calls) == 2
+
+
+def test_quote_invalidates_snapshot(monkeypatch):
+    c = chain()
+    calls = counting(c, monkeypatch)
+
+    c.snapshot(100.0, 0.065)
+    c.set_quote(True, 1, 5.0, 150)
+    snap = c.snapshot(100.0, 0.065)
+
+    assert len(calls) == 2
+    assert snap["call"]["ltp"][1] == 5.0
+    assert snap["call"]["oi"][1] == 150
+
+
+def test_quote_during_compute_is_not_lost(monkeypatch):
+    c = chain()
+    c.snapshot(100.0, 0.065)
+    c.set_quote(True, 0, 11.0, None)
+    calls = counting(c, monkeypatch, during=lambda: c.set_quote(True, 0, 12.0, None))
+
+    snap = c.snapshot(100.0, 0.065)
+    assert snap["call"]["ltp"][0] == 11.0
+    assert c.dirty
+
+    monkeypatch.undo()
+    assert c.snapshot(100.0, 0.065)["call"]["ltp"][0] == 12.0
+    assert len(calls) == 1
+
+
+# -------------------------------------------------
+# strike window
+# -------------------------------------------------
+def test_window_is_recentred_on_first_spot(db):
+    strikes = range(100, 210, 10)
+    for k in strikes:
+        for side in ("CE", "PE"):
+            db.add(models.Instrument(
+                symbol=f"OCX{k}{side}", token=f"ocx-{k}-{side}", name="OCX",
+                exchange="NFO", segment="OPT", expiry=EXPIRY,
+                strike=float(k), option_type=side,
+            ))
+    db.commit()
+
+    svc = OptionChainService(strikes_each_side=1)
+    svc.load(db, ["OCX"])
+    assert svc.chains["OCX"][0].strikes.tolist() == [140.0, 150.0, 160.0]
+
+    swaps = []
+    svc.on_resubscribe = lambda added, removed: swaps.append((added, removed))
+    svc.update_spot("OCX", 112.0)
+
+    assert svc.chains["OCX"][0].strikes.tolist() == [100.0, 110.0, 120.0]
+    added, removed = swaps[0]
+    assert "ocx-110-CE" in added and "ocx-150-PE" in removed
+    assert sorted(svc.subscription_tokens()) == sorted(
+        f"ocx-{k}-{s}" for k in (100, 110, 120) for s in ("CE", "PE")
+    )
+    assert not svc.on_tick("ocx-150-CE", 3.0)
+    assert svc.on_tick("ocx-110-CE", 3.0)
+
+    # re-centred once only
+    svc.update_spot("OCX", 190.0)
+    assert len(swaps) == 1
+    assert svc.chains["OCX"][0].strikes.tolist() == [100.0, 110.0, 120.0]
@@ -0,0 +1,68 @@
+from datetime import datetime, timedelta
+
+from app.db import models
+from app.services.outcome_service import OutcomeService
+
+
+def bars(db, symbol, first, last, close=101.0):
+    t = first
+    while t <= last:
+        db.add(models.Candle5m(symbol=symbol, start_time=t, open=100, high=102,
+                               low=99, close=close, volume=1))
+        t += timedelta(minutes=5)
+
+
+def outcome(db, signal_time, symbol):
+    bars(db, symbol, signal_time, signal_time, close=100.0)
+    bars(db, symbol, signal_time + timedelta(minutes=5),
+         min(signal_time + timedelta(minutes=60), signal_time.replace(hour=15, minute=25)))
+    sig = models.Signal(symbol=symbol, time=signal_time, rule="PDH_BREAK",
+                        candle_index=1, move_pct=1.0)
+    db.add(sig)
+    db.commit()
+
+    OutcomeService().update(db, now=signal_time.replace(hour=15, minute=40))
+    return db.get(models.SignalOutcome, sig.id)
+
+
+def test_full_horizon_fills_ret_60m(db):
+    o = outcome(db, datetime(2024, 3, 5, 10, 0), "OUTA")
+    assert o.closed and o.ret_60m is not None and o.hit_60m is not None
+
+
+def test_horizon_cut_by_the_close_leaves_ret_60m_null(db):
+    o = outcome(db, datetime(2024, 3, 5, 14, 50), "OUTB")
+    assert o.closed
+    assert o.ret_15m is not None and o.ret_30m is not None
+    assert o.ret_60m is None and o.hit_60m is None
+
+
+def test_outcome_takes_the_strategy_side(db):
+    t = datetime(2024, 3, 6, 10, 0)
+    bars(db, "OUTC", t, t)
+    sig = models.Signal(symbol="OUTC", time=t, rule="PDL_BREAKDOWN",
+                        candle_index=1, move_pct=-3.5)
+    db.add(sig)
+    db.commit()
+
+    OutcomeService().open_new(db, now=t + timedelta(minutes=1))
+    db.flush()
+    assert db.get(models.SignalOutcome, sig.id).direction == -1
+
+
+def test_open_new_ignores_signals_older_than_stale_after(db):
+    t = datetime(2024, 3, 7, 10, 0)
+    bars(db, "OUTD", t, t)
+    sig = models.Signal(symbol="OUTD", time=t, rule="PDH_BREAKOUT",
+                        candle_index=1, move_pct=3.5)
+    db.add(sig)
+    db.commit()
+
+    svc = OutcomeService(stale_after=timedelta(days=1))
+    svc.open_new(db, now=t + timedelta(days=2))
+    db.flush()
+    assert db.get(models.SignalOutcome, sig.id) is None
+
+    svc.open_new(db, now=t + timedelta(hours=1))
+    db.flush()
+    assert db.get(models.SignalOutcome, sig.id) is not None
@@ -0,0 +1,65 @@
+from datetime import date, datetime, timedelta
+
+import pytest
+from sqlalchemy import create_engine
+from sqlalchemy.orm import Session
+
+from app.db import models
+from app.db.migrate import run_migrations
+from app.services.retention_service import RetentionService
+
+TODAY = date(2023, 6, 20)
+
+
+@pytest.fixture
+def db(tmp_path):
+    # own database: compaction resumes from the newest candles_1d row
+    engine = create_engine(f"sqlite:///{tmp_path / 'retention.db'}")
+    run_migrations(engine)
+    with Session(engine) as session:
+        yield session
+
+
+def bar(symbol, start, o, h, l, c, v=10):
+    return models.Candle5m(symbol=symbol, start_time=start, open=o, high=h,
+                           low=l, close=c, volume=v)
+
+
+def test_compact_then_purge(db):
+    old = datetime(2023, 1, 10, 9, 15)
+    recent = datetime(2023, 6, 19, 9, 15)
+    db.add_all([
+        bar("RET", old, 100, 104, 99, 101),
+        bar("RET", old + timedelta(minutes=5), 101, 106, 98, 103),
+        bar("RET", recent, 200, 201, 199, 200),
+    ])
+    db.add(models.Signal(symbol="RET", time=datetime(2022, 1, 3, 9, 20),
+                         rule="PDH_BREAKOUT", candle_index=1, move_pct=3.5))
+    db.add(models.Signal(symbol="RET", time=recent, rule="PDH_BREAKOUT",
+                         candle_index=1, move_pct=3.5))
+    db.commit()
+
+    RetentionService(keep_5m_days=90, keep_signal_days=365).run_once(db, TODAY)
+
+    daily = (db.query(models.CandleDaily)
+             .filter(models.CandleDaily.symbol == "RET")
+             .order_by(models.CandleDaily.trade_date).all())
+    first = daily[0]
+    assert (first.open, first.high, first.low, first.close, first.volume) == (100, 106, 98, 103, 20)
+    assert str(first.trade_date) == "2023-01-10"
+
+    left = db.query(models.Candle5m).filter(models.Candle5m.symbol == "RET").all()
+    assert [c.start_time for c in left] == [recent]
+    signals = db.query(models.Signal).filter(models.Signal.symbol == "RET").all()
+    assert [s.time for s in signals] == [recent]
+
+
+def test_compact_is_incremental(db):
+    svc = RetentionService()
+    db.add(bar("INC", datetime(2023, 6, 1, 9, 15), 1, 2, 0.5, 1.5))
+    db.add(bar("INC", datetime(2023, 6, 2, 9, 15), 2, 3, 1.5, 2.5))
+    db.commit()
+
+    assert svc.compact(db, date(2023, 6, 2)) == 1
+    assert svc.compact(db, date(2023, 6, 2)) == 0  # already compacted
+    assert svc.compact(db, date(2023, 6, 3)) == 1  # only the new day
@@ -0,0 +1,42 @@
+from datetime import datetime
+
+from fastapi.testclient import TestClient
+
+from app.cache import response_cache
+from app.db import models
+from app.main import create_app
+from app.schemas.candles import Candle5mOut
+from app.schemas.signals import SignalOut
+
+
+def test_raw_responses_match_their_documented_schema(db):
+    db.add(models.Signal(symbol="RTX", time=datetime(2024, 3, 4, 10, 5),
+                         rule="PDH_BREAK", candle_index=1, move_pct=1.2))
+    db.add(models.Candle5m(symbol="RTX", start_time=datetime(2024, 3, 4, 10, 5),
+                           open=1, high=2, low=0.5, close=1.5, volume=10))
+    db.commit()
+    response_cache.clear()
+
+    with TestClient(create_app()) as client:
+        signals = client.get("/signals/").json()
+        candles = client.get("/market/candles", params={"symbol": "RTX"}).json()
+        schema = client.get("/openapi.json").json()
+
+    # the session database is shared: other tests' signals may be listed too
+    assert "RTX" in [SignalOut.model_validate(s).symbol for s in signals]
+    assert [Candle5mOut.model_validate(c).close for c in candles] == [1.5]
+
+    ok = schema["paths"]["/signals/"]["get"]["responses"]["200"]["content"]
+    assert ok["application/json"]["schema"]["items"]["$ref"].endswith("/SignalOut")
+
+
+def test_api_import_does_not_load_the_feed_stack():
+    import subprocess
+    import sys
+
+    code = (
+        "import sys, app.main; "
+        "print(','.join(m for m in ('numpy', 'requests', 'websocket') if m in sys.modules))"
+    )
+    out = subprocess.check_output([sys.executable, "-c", code], text=True)
+    assert out.strip() == ""
@@ -0,0 +1,46 @@
+import asyncio
+import time
+from datetime import date
+from types import SimpleNamespace
+
+from app.services.scanner_service import ScannerService
+
+
+class SlowProvider:
+    def get_5m_candles(self, exchange, token, start, end):
+        time.sleep(0.2)  # blocking HTTP / first login
+        return [["2024-03-04T09:15:00+05:30", 100, 101, 99, 100.5, 10]]
+
+
+class SlowLevels:
+    def ensure_daily_levels(self, db, symbol, token, date_):
+        time.sleep(0.2)
+        return SimpleNamespace(pdh=200.0, pdl=50.0, pdc=100.0)
+
+
+def test_scan_once_keeps_the_event_loop_free():
+    scanner = ScannerService(SlowProvider(), SlowLevels())
+    scanner._force_date = date(2024, 3, 4)
+    scanner.universe = SimpleNamespace(get_fno_universe=lambda db: [
+        SimpleNamespace(symbol="SCN", token="1"),
+    ])
+
+    async def run():
+        gaps = []
+
+        async def heartbeat():
+            last = time.perf_counter()
+            while True:
+                await asyncio.sleep(0.01)
+                now = time.perf_counter()
+                gaps.append(now - last)
+                last = now
+
+        beat = asyncio.create_task(heartbeat())
+        await scanner.scan_once(db=None)
+        beat.cancel()
+        return gaps
+
+    gaps = asyncio.run(run())
+    assert len(gaps) > 10
+    assert max(gaps) < 0.15
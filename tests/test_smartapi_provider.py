@@ -0,0 +1,81 @@
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+
+import pytest
+import requests
+
+from app.providers.smartapi_provider import SmartAPIProvider
+from tests.fake_smartapi import FakeSmartAPI
+
+FROM = datetime(2024, 3, 4, 9, 15)
+TO = datetime(2024, 3, 4, 10, 0)
+
+
+@pytest.fixture
+def fake():
+    with FakeSmartAPI(latency=0.05) as server:
+        yield server
+
+
+def fetch_many(provider, n=16):
+    with ThreadPoolExecutor(n) as pool:
+        return list(pool.map(
+            lambda i: provider.get_5m_candles("NSE", str(i), FROM, TO), range(n)
+        ))
+
+
+def test_concurrent_callers_share_one_login(fake):
+    provider = SmartAPIProvider(root=fake.url)
+    results = fetch_many(provider)
+    provider.close()
+
+    assert all(len(rows) == 10 for rows in results)
+    assert fake.stats["logins"] == 1
+
+
+def test_session_and_connections_are_reused(fake):
+    provider = SmartAPIProvider(root=fake.url, pool_size=4)
+    for _ in range(3):
+        fetch_many(provider, n=4)
+    provider.close()
+
+    assert fake.stats["logins"] == 1
+    assert fake.stats["candle_requests"] == 12
+    assert fake.stats["connections"] <= 4
+
+
+def test_revoked_token_triggers_a_single_relogin(fake):
+    provider = SmartAPIProvider(root=fake.url)
+    provider._ensure_login()
+    fake.revoke_all()
+
+    results = fetch_many(provider)
+    provider.close()
+
+    assert all(len(rows) == 10 for rows in results)
+    assert fake.stats["logins"] == 2
+
+
+def test_token_near_expiry_is_refreshed_not_relogged(fake):
+    fake.token_ttl = 300  # inside the 600s refresh margin from the start
+    provider = SmartAPIProvider(root=fake.url)
+    provider._ensure_login()
+
+    fetch_many(provider, n=4)
+    provider.close()
+
+    assert fake.stats["logins"] == 1
+    assert fake.stats["refreshes"] >= 1
+
+
+def test_post_is_not_retried_on_gateway_errors(fake):
+    provider = SmartAPIProvider(root=fake.url)
+    provider.fetch_5m_candles("NSE", "1", FROM, TO)
+
+    fake.fail_with = [503, 503, 503]
+    with pytest.raises(requests.HTTPError):
+        provider.fetch_5m_candles("NSE", "1", FROM, TO)
+    provider.close()
+
+    # a retried POST could repeat a non-idempotent call server side
+    assert fake.stats["failed"] == 1
@@ -0,0 +1,123 @@
+import struct
+import zlib
+from datetime import datetime, timedelta
+from types import SimpleNamespace
+
+import numpy as np
+import pytest
+
+from app.db import models
+from app.services.candle_builder import CandleBuilder
+from app.services.futures_oi_service import FuturesOIScanner
+from app.services.signal_deduplicator import SignalDeduplicator
+from app.services.snapshot_service import MAGIC, SnapshotService, decode, encode
+
+NOW = datetime.now().replace(hour=10, minute=7, second=30, microsecond=0)
+CURRENT = NOW.replace(minute=5, second=0)
+
+
+class History:
+    def __init__(self, rows):
+        self.rows = rows
+        self.calls = []
+
+    def get_5m_candles(self, exchange, token, start, end):
+        self.calls.append((token, start, end))
+        return self.rows
+
+
+def feed(tmp_path, name):
+    futures = FuturesOIScanner()
+    futures.symbols = ["SNAPF"]
+    futures.basis_mean, futures.basis_var = np.zeros(1), np.zeros(1)
+    futures.basis_n = np.zeros(1, dtype=np.int64)
+    return SimpleNamespace(
+        candle_builder=CandleBuilder(spill_path=str(tmp_path / f"{name}.jsonl")),
+        futures_builder=CandleBuilder(spill_path=str(tmp_path / f"{name}-fut.jsonl")),
+        futures=futures,
+        scanner=SimpleNamespace(dedup=SignalDeduplicator(), token_symbol_cache={}),
+    )
+
+
+def candle(token, start, close):
+    return {"token": token, "start": start, "open": 100.0, "high": 101.0,
+            "low": 99.0, "close": close, "volume": 10.0}
+
+
+def service(tmp_path, f, history=None):
+    return SnapshotService(f, SimpleNamespace(_latest=[]), history,
+                           str(tmp_path / "live_state.snap"), replay_rate=1000)
+
+
+def test_save_restore_replay(tmp_path):
+    before = feed(tmp_path, "before")
+    before.candle_builder.live["SNAPA"] = candle("SNAPA", CURRENT, 100.5)
+    before.candle_builder.live["SNAPB"] = candle("SNAPB", CURRENT - 2 * timedelta(minutes=5), 50.0)
+    before.futures_builder.live["SNAPF"] = dict(candle("SNAPF", CURRENT, 101.0),
+                                                oi=1100.0, oi_open=1000.0)
+    before.scanner.dedup._seen.add(("SNAPA", "PDH_BREAKOUT", NOW.date()))
+    before.scanner.token_symbol_cache["SNAPA"] = "SNAPSYM"
+    before.futures.restore_basis([("SNAPF", 0.4, 0.01, 12)])
+    snapper = service(tmp_path, before)
+    snapper.scanner._latest = [models.Signal(symbol="SNAPSYM", rule="PDH_BREAKOUT",
+                                             time=CURRENT, candle_index=1, move_pct=3.2)]
+    assert snapper.save() > 0
+
+    after = feed(tmp_path, "after")
+    history = History([
+        ["%s+05:30" % (CURRENT - 2 * timedelta(minutes=5)).isoformat(), 1, 2, 0.5, 1.5, 7],
+        ["%s+05:30" % (CURRENT - timedelta(minutes=5)).isoformat(), 1.5, 2, 1, 1.8, 9],
+        ["%s+05:30" % CURRENT.isoformat(), 1.8, 2, 1, 1.9, 3],  # still forming: skipped
+    ])
+    replayed = []
+    after.candle_builder.add_close_listener(replayed.append)
+    restorer = service(tmp_path, after, history)
+
+    assert restorer.restore(now=NOW)
+    assert after.candle_builder.live["SNAPA"]["close"] == 100.5
+    assert "SNAPB" not in after.candle_builder.live
+    assert after.futures_builder.live["SNAPF"]["oi_open"] == 1000.0
+    assert ("SNAPA", "PDH_BREAKOUT", NOW.date()) in after.scanner.dedup._seen
+    assert after.scanner.token_symbol_cache == {"SNAPA": "SNAPSYM"}
+    assert [s.rule for s in restorer.scanner._latest] == ["PDH_BREAKOUT"]
+    assert after.futures.basis_n[0] == 12
+
+    assert restorer.replay_gap(now=NOW) == 2
+    assert [(c["token"], c["start"], c["close"]) for c in replayed] == [
+        ("SNAPB", CURRENT - 2 * timedelta(minutes=5), 1.5),
+        ("SNAPB", CURRENT - timedelta(minutes=5), 1.8),
+    ]
+    assert history.calls == [("SNAPB", CURRENT - 2 * timedelta(minutes=5),
+                              CURRENT - timedelta(minutes=5))]
+    assert restorer.gap == {}
+
+    for f in (before, after):
+        f.candle_builder.stop()
+        f.futures_builder.stop()
+
+
+def test_bad_checksum_is_rejected(tmp_path):
+    data = bytearray(encode([("SNAPA", CURRENT, 1.0, 2.0, 0.5, 1.5, 10.0)],
+                            set(), [], [], NOW.timestamp(), [], []))
+    data[20] ^= 0xFF
+    with pytest.raises(ValueError, match="checksum"):
+        decode(bytes(data))
+
+    f = feed(tmp_path, "crc")
+    snapper = service(tmp_path, f)
+    with open(snapper.path, "wb") as fh:
+        fh.write(data)
+    assert snapper.load() is None
+    assert not snapper.restore(now=NOW)
+    assert f.candle_builder.live == {}
+    f.candle_builder.stop()
+    f.futures_builder.stop()
+
+
+def test_older_versions_are_rejected():
+    body = bytearray(encode([], set(), [], [], NOW.timestamp(), [], []))[:-4]
+    struct.pack_into("<H", body, len(MAGIC), 1)
+    data = bytes(body) + struct.pack("<I", zlib.crc32(bytes(body)))
+
+    with pytest.raises(ValueError, match="unsupported snapshot"):
+        decode(data)
@@ -0,0 +1,54 @@
+from datetime import datetime, time
+
+from app.services.indicator_engine import TokenIndicators
+from app.services.strategy_engine import Strategy, StrategyContext, StrategyEngine
+
+
+class Levels:
+    pdh, pdl = 100.0, 90.0
+
+
+class AnyGreen(Strategy):
+    # deliberately not registered: overlaps PDH_BREAKOUT
+    name = "ANY_GREEN"
+    inputs = ("direction",)
+
+    def evaluate(self, ctx):
+        return ctx.get("direction") > 0
+
+
+def breakout():
+    candle = {"open": 100.0, "high": 106.0, "low": 100.0, "close": 105.0}
+    return StrategyContext("SYM", datetime(2024, 3, 4, 9, 15), candle,
+                           levels=Levels(), candle_index=1)
+
+
+def test_first_match_emits_one_rule_per_candle():
+    engine = StrategyEngine(["PDH_BREAKOUT"])
+    engine.strategies.append(AnyGreen())
+
+    assert [s.rule for s in engine.evaluate_bucket([breakout()])] == [
+        "PDH_BREAKOUT", "ANY_GREEN"
+    ]
+    assert [s.rule for s in engine.evaluate_bucket([breakout()], first_match=True)] == [
+        "PDH_BREAKOUT"
+    ]
+
+
+def test_opening_range_breakout_reads_live_indicators():
+    ind = TokenIndicators(ema_fast=9, ema_slow=21, sma_period=20, atr_period=14,
+                          volume_window=3, or_end=time(9, 30))
+    for minute, v in ((15, 100), (20, 120), (25, 110), (30, 90)):
+        ind.update(datetime(2024, 3, 4, 9, minute), 100.0, 102.0, 99.0, 101.0, v)
+
+    candle = {"open": 101.0, "high": 104.0, "low": 101.0, "close": 103.5, "volume": 600}
+    ind.update(datetime(2024, 3, 4, 9, 35), 101.0, 104.0, 101.0, 103.5, 600)
+    assert ind.or_high == 102.0 and ind.volume_zscore > 2
+
+    engine = StrategyEngine(["OR_BREAKOUT", "OR_BREAKDOWN"])
+    ctx = StrategyContext("SYM", datetime(2024, 3, 4, 9, 35), candle, indicators=ind)
+    assert [s.rule for s in engine.evaluate(ctx)] == ["OR_BREAKOUT"]
+
+    # no indicator state yet: the strategies are skipped, not crashed
+    bare = StrategyContext("SYM", datetime(2024, 3, 4, 9, 35), candle)
+    assert engine.evaluate(bare) == []